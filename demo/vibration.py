@@ -14,6 +14,7 @@ import os
 
 # Add paths to import our hardware modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))  # src.hardware.* imports
 
 try:
     from hardware.vibration_controller import VibrationController, trigger_vibration_alarm, vibrate_once
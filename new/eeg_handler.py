@@ -5,7 +5,11 @@ import threading
 import queue  # Thread-safe queue for communication
 from enum import Enum
 from typing import Optional, List, Any, Callable
+import os
+import sys
 from feature_extract import exfeature
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # 공유 모듈(src/)은 저장소 루트에서 import
+from src.processing.quality import RollingQuality
 import numpy as np
 
 # ThinkGear Protocol Constants (이전 코드와 동일)
@@ -32,6 +36,7 @@ class ThinkGearParser:
         self.payload_bytes_received = 0
         self.payload_sum = 0
         self.payload = bytearray(MAX_PAYLOAD_LENGTH + 1)
+        self._payload_view = memoryview(self.payload)  # 패킷마다 재사용하는 버퍼의 뷰 (복사 없음)
         self.checksum = 0
 
     def parse_byte(self, byte: int) -> int:
@@ -55,18 +60,30 @@ class ThinkGearParser:
         return return_value
 
     def _parse_packet_payload(self):
+        # 1바이트 값과 2바이트 raw 샘플은 int로, 나머지는 재사용 버퍼의 memoryview로 넘깁니다.
+        # memoryview는 콜백 동안만 유효하므로 보관하려면 bytes(value)로 복사해야 합니다.
+        handler = self.data_handler
+        if handler is None: return
+        payload = self.payload
+        length = self.payload_length
+        # 초당 512개 오는 raw 패킷 [0x80, 0x02, high, low]는 바로 처리합니다.
+        if length == 4 and payload[0] == CODE_RAW_SIGNAL and payload[1] == 2:
+            handler(CODE_RAW_SIGNAL, (payload[2] << 8) | payload[3]); return
         i = 0
-        while i < self.payload_length:
-            extended_code_level = 0
-            while self.payload[i] == EXCODE_BYTE: extended_code_level += 1; i += 1
-            code = self.payload[i]; i += 1
-            num_bytes = self.payload[i] if code >= 0x80 else 1
-            if code >= 0x80: i+=1
-            if i + num_bytes <= self.payload_length:
-                value = self.payload[i:i + num_bytes]
-                if self.data_handler: self.data_handler(code, value)
-                i += num_bytes
-            else: break
+        while i < length:
+            while i < length and payload[i] == EXCODE_BYTE: i += 1
+            if i >= length: break
+            code = payload[i]; i += 1
+            if code >= 0x80:
+                if i >= length: break
+                num_bytes = payload[i]; i += 1
+            else: num_bytes = 1
+            if i + num_bytes > length: break
+            if code < 0x80: value = payload[i]
+            elif code == CODE_RAW_SIGNAL and num_bytes == 2: value = (payload[i] << 8) | payload[i + 1]
+            else: value = self._payload_view[i:i + num_bytes]
+            handler(code, value)
+            i += num_bytes
 
 
 class EEGReader:
@@ -89,7 +106,9 @@ class EEGReader:
 
         # Data buffers
         self._raw_buffer = []
-        self._quality_buffer = []
+        # poor signal 값은 초당 1개이므로 epoch 길이만큼의 윈도우로 증분 집계합니다.
+        self._quality = RollingQuality(window=duration_sec)
+        self.last_epoch_quality: Optional[dict] = None  # 마지막 epoch의 품질 요약 (score 0~1 포함)
         
         # Thread-safe queue for results
         self.data_queue = queue.Queue()
@@ -108,16 +127,16 @@ class EEGReader:
             self.serial_conn.close()
             print("Disconnected from serial port.")
 
-    def _handle_data(self, code: int, value: bytearray):
+    def _handle_data(self, code: int, value):
         """Callback function to handle incoming data from the parser."""
-        if code == CODE_RAW_SIGNAL and len(value) == 2:
-            raw_val = (value[0] << 8) | value[1]
+        if code == CODE_RAW_SIGNAL and isinstance(value, int):
+            raw_val = value
             if raw_val > 32768:
                 raw_val -= 65536
             self._raw_buffer.append(raw_val)
         
-        elif code == CODE_POOR_SIGNAL and len(value) == 1:
-            self._quality_buffer.append(value[0])
+        elif code == CODE_POOR_SIGNAL:
+            self._quality.add(value)
     # eeg_handler.py의 EEGReader 클래스 내부
 
     def _data_collection_loop(self):
@@ -130,29 +149,31 @@ class EEGReader:
         try: # 전체 루프를 try 블록으로 감싸서 모든 오류를 잡습니다.
             while self.running:
                 # 1. 시리얼 포트에서 데이터 읽기 시도
-                if self.serial_conn and self.serial_conn.in_waiting > 0:
-                    byte = self.serial_conn.read(1)[0]
+                # read()는 데이터가 올 때까지 (최대 timeout 1초) 커널에서 대기하므로
+                # in_waiting을 1ms마다 폴링하며 CPU를 낭비하지 않습니다.
+                data = self.serial_conn.read(self.serial_conn.in_waiting or 1)
+                for byte in data:
                     self.parser.parse_byte(byte)
-                else:
-                    time.sleep(0.001)
 
                 # 2. 30초 분량 데이터가 모였는지 확인 (기존 로직)
                 if len(self._raw_buffer) >= self.target_sample_count:
                     print(f"--- 30초 epoch 수집 완료. 처리 중... ---")
                     
                     result: Optional[List[int]] = None
-                    # 신호 품질 확인
-                    if self._quality_buffer and all(q == 0 for q in self._quality_buffer):
-                        print("신호 품질: 양호. 데이터 처리합니다.")
-                        result = list(self._raw_buffer)
+                    # 신호 품질 확인 (epoch 동안 나쁜 값이 하나도 없어야 양호)
+                    quality = self._quality.close_epoch()
+                    self.last_epoch_quality = quality
+                    if quality['samples'] and quality['bad'] == 0:
+                        print(f"신호 품질: 양호 (점수 {quality['score']:.2f}). 데이터 처리합니다.")
+                        result = self._raw_buffer[:self.target_sample_count]
                     else:
-                        print("신호 품질: 불량. 데이터를 폐기합니다.")
+                        print(f"신호 품질: 불량 (점수 {quality['score']:.2f}). 데이터를 폐기합니다.")
                         result = None
                     
                     self.data_queue.put(result)
                     
-                    self._raw_buffer.clear()
-                    self._quality_buffer.clear()
+                    # 청크 단위로 읽으므로 epoch 경계를 넘은 샘플은 다음 epoch으로 넘깁니다.
+                    del self._raw_buffer[:self.target_sample_count]
 
         except Exception as e:
             # 스레드 안에서 발생하는 모든 오류를 여기서 잡아서 출력합니다.
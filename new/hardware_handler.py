@@ -1,11 +1,14 @@
-import RPi.GPIO as GPIO
+import os
+import sys
 import time
 from enum import Enum
-from luma.core.interface.serial import i2c
-from luma.core.render import canvas
-from luma.oled.device import ssd1306
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # 공유 모듈(src/)은 저장소 루트에서 import
+from src.hardware.backend import GPIO
 from PIL import Image, ImageDraw, ImageFont
 import threading
+from src.hardware.gpio_input import InputManager, BUTTON_PRESS, BUTTON_RELEASE
+from src.hardware.quadrature import RotationAccelerator
+from src.display.resources import get_font, get_luma_device, get_panel_state, get_canvas, FONT_REGULAR, FONT_BOLD
 
 #set up pins
 BUZZER_PIN = 27
@@ -33,116 +36,95 @@ class PressType(Enum):
 #         self.last_state = current_state
 #         return was_pressed
 class Button:
-    """짧게 누르기와 길게 누르기를 감지하는 버튼 클래스"""
+    """짧게 누르기와 길게 누르기를 감지하는 버튼 클래스 (엣지 인터럽트 이벤트 기반)"""
     def __init__(self, pin, long_press_duration=2.0):
         self.pin = pin
         self.long_press_duration = long_press_duration # 길게 누르기 시간 (기본값 2초)
-        self.debounce_time = 0.2 # 디바운싱 시간 (기본값 0.2초)
+        self.debounce_time = 0.2 # 새 입력을 받기까지의 최소 간격 (기본값 0.2초)
         self._last_event_time = 0          # 마지막으로 유효한 이벤트가 발생한 시간
-        
-        GPIO.setup(self.pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
-        self._last_state = GPIO.input(self.pin)
+        # 핀 설정과 채터링 제거(debounce)는 입력 레이어가 담당합니다.
+        self._inputs = InputManager()
+        self._inputs.add_button('button', self.pin)
+
         self._press_start_time = 0
         self._long_press_triggered = False
 
     def get_event(self):
-        """버튼의 상태를 확인하여 NO_PRESS, SHORT_PRESS, LONG_PRESS 이벤트를 반환합니다."""
-        event = PressType.NO_PRESS
-        current_state = GPIO.input(self.pin)
-        now = time.time() # 현재 시간을 한 번만 호출하여 사용
-
-        # 버튼이 막 눌렸을 때 (Falling edge)
-        if current_state == 0 and self._last_state == 1:
-            # 마지막 이벤트로부터 충분한 시간이 지났을 때만 새 입력을 시작
-            if now - self._last_event_time > self.debounce_time:
-                self._press_start_time = now
+        """큐에 쌓인 버튼 이벤트를 처리하여 NO_PRESS, SHORT_PRESS, LONG_PRESS 이벤트를 반환합니다."""
+        while True:
+            event = self._inputs.get(timeout=0)
+            if event is None:
+                break
+
+            # 버튼이 막 눌렸을 때 (Falling edge)
+            if event.kind == BUTTON_PRESS:
+                # 마지막 이벤트로부터 충분한 시간이 지났을 때만 새 입력을 시작
+                if event.timestamp - self._last_event_time > self.debounce_time:
+                    self._press_start_time = event.timestamp
+                    self._long_press_triggered = False
+
+            # 버튼에서 손을 뗐을 때 (Rising edge)
+            elif event.kind == BUTTON_RELEASE and self._press_start_time > 0:
+                triggered = self._long_press_triggered
+                self._press_start_time = 0
                 self._long_press_triggered = False
+                if not triggered:
+                    self._last_event_time = event.timestamp # 유효 이벤트 시간 기록
+                    # 확인하기 전에 길게 누르고 뗀 경우도 LONG_PRESS로 처리
+                    return PressType.LONG_PRESS if event.value >= self.long_press_duration else PressType.SHORT_PRESS
 
         # 버튼이 계속 눌리고 있을 때
-        elif current_state == 0 and self._last_state == 0 and self._press_start_time > 0:
-            if not self._long_press_triggered:
-                press_duration = now - self._press_start_time
-                if press_duration >= self.long_press_duration:
-                    event = PressType.LONG_PRESS
-                    self._long_press_triggered = True
-                    self._last_event_time = now # 유효 이벤트 시간 기록
-
-        # 버튼에서 손을 뗐을 때 (Rising edge)
-        elif current_state == 1 and self._last_state == 0 and self._press_start_time > 0:
-            if not self._long_press_triggered:
-                event = PressType.SHORT_PRESS
+        if self._press_start_time > 0 and not self._long_press_triggered:
+            now = time.monotonic()
+            if now - self._press_start_time >= self.long_press_duration:
+                self._long_press_triggered = True
                 self._last_event_time = now # 유효 이벤트 시간 기록
-            
-            # 다음 입력을 위해 상태 초기화
-            self._press_start_time = 0
-            self._long_press_triggered = False
+                return PressType.LONG_PRESS
 
-        self._last_state = current_state
-        return event
+        return PressType.NO_PRESS
+
+    def stop(self):
+        """엣지 감지를 해제합니다."""
+        self._inputs.close()
 
 
 class RotaryEncoder:
     """
-    인터럽트 대신 폴링(Polling) 방식을 사용하여 로터리 엔코더의 입력을 감지하는 클래스.
-    백그라운드 스레드를 사용하여 메인 프로그램의 동작을 방해하지 않습니다.
+    폴링 스레드 대신 두 핀의 엣지 인터럽트(GPIO.add_event_detect)와 쿼드러처 전이 테이블로
+    로터리 엔코더의 입력을 감지하는 클래스.
+    회전 이벤트는 입력 레이어의 큐에 쌓이고, get_change()가 호출될 때 합산됩니다.
     """
-    def __init__(self, clk_pin, dt_pin):
+    def __init__(self, clk_pin, dt_pin, steps_per_detent=2, trace=None):
         self.clk_pin = clk_pin
         self.dt_pin = dt_pin
 
-        # GPIO 핀 설정
-        GPIO.setup(self.clk_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        GPIO.setup(self.dt_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-
-        # 상태 저장을 위한 변수들
-        self.change_value = 0
-        self.clk_last_state = GPIO.input(self.clk_pin)
-        self.lock = threading.Lock() # 스레드 간 데이터 충돌 방지를 위한 Lock
-        self.running = True
-
-        # 백그라운드에서 핀 상태를 계속 확인할 스레드 생성 및 시작
-        # daemon=True로 설정하여 메인 프로그램 종료 시 스레드도 함께 종료되도록 함
-        self.poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
-        self.poll_thread.start()
-
-    def _poll_loop(self):
-        """백그라운드 스레드에서 실행될 메인 루프"""
-        while self.running:
-            # 현재 CLK 핀 상태 읽기
-            clk_state = GPIO.input(self.clk_pin)
-
-            # CLK 핀의 상태가 이전과 다를 경우 (즉, 변화가 감지된 경우)
-            if clk_state != self.clk_last_state:
-                # DT 핀의 상태를 읽어서 회전 방향 판단
-                dt_state = GPIO.input(self.dt_pin)
-                
-                # Lock을 사용하여 안전하게 self.change_value 수정
-                with self.lock:
-                    if dt_state != clk_state:
-                        self.change_value += 1  # 시계 방향
-                    else:
-                        self.change_value -= 1  # 반시계 방향
-            
-            # 현재 CLK 상태를 마지막 상태로 저장
-            self.clk_last_state = clk_state
-            
-            # CPU 사용량을 100%로 만들지 않기 위해 아주 잠깐 대기 (필수)
-            time.sleep(0.001) # 1ms
+        # 기존 폴링 방식처럼 CLK의 상승/하강 엣지마다 한 칸 (반 주기 디텐트)
+        self._inputs = InputManager(maxsize=256)
+        self._encoder = self._inputs.add_encoder('encoder', self.clk_pin, self.dt_pin,
+                                                 steps_per_detent=steps_per_detent, trace=trace)
+        # 빠르게 돌리면 한 칸에 10~30분씩 이동
+        self.accelerator = RotationAccelerator(base_step=1)
 
-    def get_change(self):
+    @property
+    def errors(self):
+        """놓친 엣지로 인한 무효 전이 횟수"""
+        return self._encoder.decoder.errors
+
+    def get_change(self, accelerate=False):
         """
         main.py에서 호출하는 함수.
         누적된 값(회전 정도)을 반환하고 0으로 초기화합니다.
+        accelerate=True이면 회전 속도에 따라 한 칸을 최대 30으로 키웁니다 (분 단위 설정용).
         """
-        with self.lock:
-            value = self.change_value
-            self.change_value = 0
-        return value
+        events = self._inputs.drain()
+        if accelerate:
+            return sum(self.accelerator.step(event.value, event.timestamp) for event in events)
+        return sum(event.value for event in events)
 
     def stop(self):
-        """백그라운드 스레드를 안전하게 종료하기 위한 함수"""
-        self.running = False
+        """엣지 감지를 해제하기 위한 함수"""
+        self._inputs.close()
 
 class Buzzer:
     def __init__(self, pin, reset_pin):
@@ -176,17 +158,18 @@ class OLED:
         - port: 라즈베리파이의 I2C 포트 번호 (보통 1)
         - address: OLED의 I2C 주소 (보통 0x3C)
         """
-
         try:
-            # 1. I2C 통신 인터페이스를 설정합니다.
-            self.serial = i2c(port=port, address=address)
-            # 2. 통신 인터페이스를 사용하여 스크린 장치 드라이버를 설정합니다.
-            self.device = ssd1306(self.serial)
+            # 1~2. I2C 통신 인터페이스와 스크린 장치 드라이버를 설정합니다. (BRAINALARM_HW=fake이면 메모리 장치)
+            # 같은 포트/주소의 장치는 프로세스에서 한 번만 초기화됩니다 (resources.py).
+            self.device = get_luma_device(port=port, address=address)
+            # 이전 프레임과 같으면 I2C 전송을 건너뛰고, 바뀐 페이지/열 범위만 전송합니다.
+            self.frames, self.panel = get_panel_state(self.device)
+            # 매 프레임 다시 쓰는 백버퍼: Image/ImageDraw는 한 번만 할당합니다.
+            self.buffer, self.buffer_draw = get_canvas(f"luma-{port}-{address:#x}", self.device.size, self.device.mode)
             
-            # 3. Pillow 라이브러리를 사용하여 폰트를 로드합니다.
-            # (경로는 실제 폰트 파일 위치에 맞게 수정해야 합니다.)
-            self.font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 10)
-            self.font_large = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
+            # 3. Pillow 라이브러리를 사용하여 폰트를 로드합니다. (한 번 로드한 폰트는 공유)
+            self.font_small = get_font(FONT_REGULAR, 10)
+            self.font_large = get_font(FONT_BOLD, 20)
             print("OLED 스크린이 성공적으로 초기화되었습니다.")
         except Exception as e:
             print(f"OLED 초기화 실패: {e}")
@@ -202,13 +185,22 @@ class OLED:
         """스크린을 깨끗하게 지웁니다."""
         if not self.device: return
         self.device.clear()
+        self.frames.invalidate()
+        self.panel.invalidate()
 
     def display(self, draw_function):
         """
         가장 핵심적인 그리기 함수입니다.
         'draw'라는 도화지 객체를 제공하고, 외부에서 받은 'draw_function'이
         이 도화지에 그림을 그리면, 최종 결과를 스크린에 표시합니다.
+        도화지는 매번 새로 만들지 않고 같은 백버퍼를 지우고 다시 씁니다 (렌더 스레드에서만 호출).
+        직전에 보낸 프레임과 같으면 스크린으로 보내지 않습니다.
         """
         if not self.device: return
-        with canvas(self.device) as draw:
-            draw_function(draw, self) # draw 객체와 oled 객체 자신을 전달
+        # 지난 프레임이 그린 영역만 제자리에서 지웁니다.
+        inked = self.buffer.getbbox()
+        if inked:
+            self.buffer_draw.rectangle((inked[0], inked[1], inked[2] - 1, inked[3] - 1), fill=0)
+        draw_function(self.buffer_draw, self) # draw 객체와 oled 객체 자신을 전달
+        if self.frames.changed(self.buffer):
+            self.panel.show(self.buffer)
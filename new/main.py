@@ -1,16 +1,20 @@
 # main.py
 import time
+import copy
+import sys
 from datetime import datetime, timedelta, timezone
-import RPi.GPIO as GPIO
 import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # 공유 모듈(src/)은 저장소 루트에서 import
+from src.hardware.backend import GPIO
 import joblib
-from state_manager import StateManager
+from state_manager import StateManager, State, EditMode
 
 # --- 필요한 모듈 임포트 ---
 # 각 파일에 실제 하드웨어 제어 클래스가 구현되어 있어야 합니다.
 from hardware_handler import Buzzer, Button, RotaryEncoder, OLED, PressType
 from eeg_handler import EEGReader
 from ui_renderer import UIRenderer
+from src.display.render_service import RenderService
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, 'models/sleep_stage_classifier.joblib')
 sleep_stage_model = joblib.load(MODEL_PATH)
@@ -49,6 +53,10 @@ def main():
     
     # EEG 분석기와 UI 렌더러 객체도 생성합니다.
     renderer = UIRenderer()
+    # 화면은 렌더 스레드가 초당 최대 10번 그립니다. 메인 루프는 상태를 게시만 하므로 I2C 전송에 막히지 않고,
+    # 프레임 사이에 몰린 엔코더 입력은 한 번의 그리기로 합쳐집니다.
+    display = RenderService(lambda state: renderer.render(oled, state), fps=10, name='ui-display')
+    display.start()
 
     last_beep_time = 0
     beep_state = False
@@ -75,7 +83,10 @@ def main():
                 # 길게 누르면 'Reset' 기능 수행
                 state_manager.handle_reset_press()
             
-            encoder_change = rotary_encoder.get_change()
+            # 분 단위로 목표 시각을 맞출 때만 빠른 회전을 가속합니다.
+            accelerate = (state_manager.current_state == State.SET_TARGET_TIME
+                          and state_manager.edit_mode == EditMode.MINUTE)
+            encoder_change = rotary_encoder.get_change(accelerate=accelerate)
             if encoder_change != 0:
                 state_manager.handle_rotation(encoder_change)
 
@@ -130,8 +141,8 @@ def main():
                 eeg_processor.stop_collection()
             
             # --- 2.4. 화면 출력 (Output Rendering) ---
-            # 현재 상태에 맞는 화면을 그려달라고 Renderer에게 요청합니다.
-            renderer.render(oled, state_manager)
+            # 현재 상태의 사본을 렌더 스레드에 넘깁니다 (그리는 동안 메인 루프가 상태를 바꿔도 안전).
+            display.publish(copy.copy(state_manager))
             print(datetime.now(kst).time(), state_manager.target_time.time())
             # --- 2.5. 처리 속도 조절 (Loop Delay) ---
             time.sleep(0.05)
@@ -143,10 +154,15 @@ def main():
         # 3. 종료 단계 (Cleanup)
         # =================================================================
         # 프로그램이 어떤 이유로든 종료될 때 항상 실행됩니다.
+        display.stop(flush=False)
+        print(f"렌더 스레드: {RenderService.format(display.snapshot())}")
         if eeg_processor.is_running(): # EEG 스레드가 여전히 실행 중이면 종료
             eeg_processor.stop_collection()
         eeg_processor.disconnect()
         buzzer.stop()
+        if oled.device:
+            stats = oled.frames.snapshot()
+            print(f"화면 프레임: {stats['rendered']}회 렌더링, {stats['transmitted']}회 전송, {stats['skipped']}회 생략")
         if 'rotary_encoder' in locals() and rotary_encoder is not None:
             rotary_encoder.stop()
         GPIO.cleanup() # 모든 GPIO 설정을 깨끗하게 초기화합니다.
@@ -2,14 +2,34 @@
 from datetime import datetime, timezone, timedelta
 from state_manager import State # State Enum 임포트
 from PIL import Image, ImageDraw, ImageFont
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # 공유 모듈(src/)은 저장소 루트에서 import
+from src.display.glyphs import CLOCK_CHARS
+from src.display.resources import get_glyphs
 
 
 kst = timezone(timedelta(hours=9))
 
 class UIRenderer:
+    # 화면에 쓰이는 글자와 문구 (크기별)
+    GLYPH_TEXT = {
+        'large': (CLOCK_CHARS + ' ', ('WAKE UP!', ' min ')),
+        'small': (CLOCK_CHARS + ' ()', ('Alarm: ', 'min', 'Set Window', 'Set Target Time')),
+    }
+
     def __init__(self):
         # UI에 필요한 리소스(예: 아이콘 이미지)가 있다면 여기서 로드합니다.
-        pass
+        self._glyphs = {} # 폰트별 글리프 캐시 (프로세스 전체 캐시에서 가져옴)
+
+    def _glyphs_for(self, oled, size):
+        """oled의 'large'/'small' 폰트에 대한 GlyphFont를 반환합니다."""
+        font = oled._get_font(size)
+        glyphs = self._glyphs.get(font)
+        if glyphs is None:
+            chars, words = self.GLYPH_TEXT[size]
+            glyphs = self._glyphs[font] = get_glyphs(font, chars, words)
+        return glyphs
 
 
     def render(self, oled, state_manager):
@@ -40,8 +60,8 @@ class UIRenderer:
 
     def _draw_alarm_screen(self, draw, oled):
         now_str = datetime.now(kst).strftime('%H:%M:%S')
-        draw.text((12, 10), "WAKE UP!", font=oled._get_font('large'), fill="white")
-        draw.text((40, 40), now_str, font=oled._get_font('small'), fill="white")
+        self._glyphs_for(oled, 'large').draw_text(draw, (12, 10), "WAKE UP!", fill="white")
+        self._glyphs_for(oled, 'small').draw_text(draw, (40, 40), now_str, fill="white")
         # wake_up_text = "WAKE UP!"
         # wake_up_font = oled._get_font('large')
         # wake_up_bbox = draw.textbbox((0, 0), wake_up_text, font=wake_up_font)
@@ -63,13 +83,13 @@ class UIRenderer:
         target_str = state_manager.target_time.strftime('%H:%M')
         duration = state_manager.window_duration_minutes
 
-        draw.text((13, 13), now_str, font=oled._get_font('large'), fill="white")
-        draw.text((12, 45), f"Alarm: {target_str} ({duration}min)", font=oled._get_font('small'), fill="white")
+        self._glyphs_for(oled, 'large').draw_text(draw, (13, 13), now_str, fill="white")
+        self._glyphs_for(oled, 'small').draw_text(draw, (12, 45), f"Alarm: {target_str} ({duration}min)", fill="white")
 
     def _draw_set_duration_screen(self, draw, oled, state_manager):
         duration = state_manager.temp_window_duration_minutes
-        draw.text((10, 10), "Set Window", font=oled._get_font('small'), fill="white")
-        draw.text((20, 30), f" {duration:02d} min ", font=oled._get_font('large'), fill="white")
+        self._glyphs_for(oled, 'small').draw_text(draw, (10, 10), "Set Window", fill="white")
+        self._glyphs_for(oled, 'large').draw_text(draw, (20, 30), f" {duration:02d} min ", fill="white")
 
     def _draw_set_target_time_screen(self, draw, oled, state_manager):
         temp_time = state_manager.temp_target_time
@@ -82,5 +102,5 @@ class UIRenderer:
         else: # MINUTE
             draw.rectangle((68, 28, 96, 52), outline="white", fill="black")
 
-        draw.text((10, 10), "Set Target Time", font=oled._get_font('small'), fill="white")
-        draw.text((32, 30), f"{hour_str}:{minute_str}", font=oled._get_font('large'), fill="white")
\ No newline at end of file
+        self._glyphs_for(oled, 'small').draw_text(draw, (10, 10), "Set Target Time", fill="white")
+        self._glyphs_for(oled, 'large').draw_text(draw, (32, 30), f"{hour_str}:{minute_str}", fill="white")
\ No newline at end of file
@@ -3,7 +3,11 @@ import time
 import pandas as pd
 import joblib
 from src.display.oled_time_setter2 import OLEDTimeSetter
-from src.alarm.smart_alarm import SmartAlarm
+from src.alarm.smart_alarm import SmartAlarm, PREROLL_SEC
+from src.processing.timing import GAP_POLICIES, GAP_INTERPOLATE
+from src.processing.tgam_features import FEATURE_TIERS, TIER_FULL
+from src.processing.artifact_gate import ARTIFACT_POLICIES, ARTIFACT_REJECT
+from src.processing.governor import DEFAULT_DEADLINE_SEC
 import argparse
 import os
 import sys
@@ -11,58 +15,88 @@ from src.hardware.vibration_controller import VibrationController
 from pytz import timezone
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, 'models/sleep_stage_classifier.joblib')
+TGAM_MODEL_PATH = os.path.join(BASE_DIR, 'models/tgam_stage_classifier.joblib')
 
 
-temp = datetime.datetime.now(timezone('Asia/Seoul'))
-system = OLEDTimeSetter(temp)
-system.run()
+def main():
+    # spawn 컨텍스트의 추출 워커 프로세스는 이 파일을 __mp_main__으로 다시 import합니다.
+    # 설정 화면/GPIO 초기화/알람 실행이 워커에서 다시 돌지 않도록 모든 실행 코드는 main() 안에 둡니다.
+    temp = datetime.datetime.now(timezone('Asia/Seoul'))
+    system = OLEDTimeSetter(temp)
+    system.run()
 
-# 사용자 설정
-if system.set_time_fixed:
-    h_24 = system.set_hour
-    m = system.set_minute
-    is_pm = system.set_is_pm
-    h_24 = h_24 % 24
+    # 사용자 설정
+    if system.set_time_fixed:
+        h_24 = system.set_hour
+        m = system.set_minute
+        is_pm = system.set_is_pm
+        h_24 = h_24 % 24
 
 
 
-    # ✅ 3. 변환된 24시간제 시간으로 datetime.time 객체 생성
-    # 튜플이 아닌, 각 값을 인자로 전달합니다.
-    now = datetime.datetime.now(timezone('Asia/Seoul'))
-    wake_time_hm = datetime.time(h_24, m)
-    wake_time = datetime.datetime.combine(datetime.datetime.now(timezone('Asia/Seoul')).date(), wake_time_hm)
-    wake_time = timezone('Asia/Seoul').localize(wake_time)
-    if wake_time < now:
-        wake_time = wake_time + datetime.timedelta(days=1)
-    wake_window_min = system.wake_window_minutes  # 예정 시각 -wake_window_min만큼에서 N2 수면 단계 감지 시 알람 작동
-    start_time = wake_time - datetime.timedelta(minutes= wake_window_min)
-    parser = argparse.ArgumentParser(description='EEG Data Reader for ThinkGear Protocol')
-    parser.add_argument('--port', '-p', default='/dev/rfcomm0', 
-                    help='Serial port (default: /dev/rfcomm0)')
-    parser.add_argument('--baudrate', '-b', type=int, default=57600,
-                    help='Baud rate (default: 57600)')
-    parser.add_argument('--mode', '-m', choices=['hex', 'monitor'], default='hex',
-                    help='Operation mode: hex (raw hex display) or monitor (parsed data)')
+        # ✅ 3. 변환된 24시간제 시간으로 datetime.time 객체 생성
+        # 튜플이 아닌, 각 값을 인자로 전달합니다.
+        now = datetime.datetime.now(timezone('Asia/Seoul'))
+        wake_time_hm = datetime.time(h_24, m)
+        wake_time = datetime.datetime.combine(datetime.datetime.now(timezone('Asia/Seoul')).date(), wake_time_hm)
+        wake_time = timezone('Asia/Seoul').localize(wake_time)
+        if wake_time < now:
+            wake_time = wake_time + datetime.timedelta(days=1)
+        wake_window_min = system.wake_window_minutes  # 예정 시각 -wake_window_min만큼에서 N2 수면 단계 감지 시 알람 작동
+        start_time = wake_time - datetime.timedelta(minutes= wake_window_min)
+        parser = argparse.ArgumentParser(description='EEG Data Reader for ThinkGear Protocol')
+        parser.add_argument('--port', '-p', default='/dev/rfcomm0', 
+                        help='Serial port (default: /dev/rfcomm0)')
+        parser.add_argument('--baudrate', '-b', type=int, default=57600,
+                        help='Baud rate (default: 57600)')
+        parser.add_argument('--mode', '-m', choices=['hex', 'monitor'], default='hex',
+                        help='Operation mode: hex (raw hex display) or monitor (parsed data)')
+        parser.add_argument('--gap-policy', choices=GAP_POLICIES, default=GAP_INTERPOLATE,
+                        help='Handling of lost samples: interpolate, zero_fill or reject the epoch (default: interpolate)')
+        parser.add_argument('--preroll', type=int, default=PREROLL_SEC,
+                        help=f'Seconds of EEG acquisition before the wake window opens (default: {PREROLL_SEC}, 0 disables)')
+        parser.add_argument('--feature-tier', choices=FEATURE_TIERS, default=TIER_FULL,
+                        help='full: exfeature() per epoch, tgam: on-chip band powers/eSense only for low-CPU devices (default: full)')
+        parser.add_argument('--artifact-policy', choices=ARTIFACT_POLICIES, default=ARTIFACT_REJECT,
+                        help='Epochs failing the artifact gate: reject before feature extraction, flag, or off (default: reject)')
+        parser.add_argument('--isolate-extraction', action='store_true',
+                        help='Run feature extraction in a separate worker process fed through shared memory')
+        parser.add_argument('--incremental', action='store_true',
+                        help='Compute epoch features from 5 s sub-blocks as samples arrive (ignored with --isolate-extraction)')
+        parser.add_argument('--deadline', type=float, default=0,
+                        help=f'Per-epoch feature extraction deadline in seconds; enables the compute governor, later epochs step down '
+                             f'to cheaper tiers, decided by the TGAM model only (e.g. {DEFAULT_DEADLINE_SEC:.0f}, default: 0 = off)')
+        parser.add_argument('--tgam-model', default=TGAM_MODEL_PATH,
+                        help='Light model trained on TGAM on-chip features, used as fallback (loaded if the file exists)')
     
-    args = parser.parse_args()
+        args = parser.parse_args()
     
 
-    # 모델 로드
-    sleep_stage_model = joblib.load(MODEL_PATH)
+        # 모델 로드
+        sleep_stage_model = joblib.load(MODEL_PATH)
+        tgam_model = joblib.load(args.tgam_model) if os.path.exists(args.tgam_model) else None
+        if args.feature_tier != TIER_FULL and tgam_model is None:
+            print(f"TGAM 모델을 찾을 수 없습니다: {args.tgam_model}")
+            sys.exit(1)
 
-    system2 = OLEDTimeSetter(wake_time)
+        system2 = OLEDTimeSetter(wake_time)
 
 
 
-    # 실행--> UTC + 9기준으로 입력됨
-    alarm_system = SmartAlarm(sleep_stage_model, start_time, wake_time, wake_window_min, args, system2)
+        # 실행--> UTC + 9기준으로 입력됨
+        alarm_system = SmartAlarm(sleep_stage_model, start_time, wake_time, wake_window_min, args, system2,
+                                  preroll_sec=args.preroll, tgam_model=tgam_model)
 
 
-    try:
-        alarm_system.start()
-        alarm_system.join()
-    except KeyboardInterrupt:
-        print("\n사용자에 의해 프로그램이 중단되었습니다.")
-    finally:
-        alarm_system.stop()
-        print("프로그램을 종료합니다.")
\ No newline at end of file
+        try:
+            alarm_system.start()
+            alarm_system.join()
+        except KeyboardInterrupt:
+            print("\n사용자에 의해 프로그램이 중단되었습니다.")
+        finally:
+            alarm_system.stop()
+            print("프로그램을 종료합니다.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Per-packet allocations of ThinkGear payload parsing: slice copies vs memoryview/offsets.
+
+Parses the same synthetic TGAM stream with
+  - legacy:   the previous _parse_packet_payload (payload[i:i + n] -> new bytearray per value)
+  - current:  ThinkGearParser (ints for 1-byte codes and raw samples, memoryview slices otherwise)
+and counts the memory blocks allocated by parsing with tracemalloc. The handler keeps every value
+it receives so each allocation stays visible to tracemalloc; raw samples are kept inside the
+small-int cache (0..255) so the decoded sample values themselves are not counted.
+
+Usage:
+    python scripts/bench_alloc.py [--seconds 10] [--chunk 64]
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+import time
+import argparse
+import tracemalloc
+from bench_dispatch import make_packet
+from src.hardware.thinkgear import (
+    ThinkGearParser, ParserType, EXCODE_BYTE,
+    CODE_RAW_SIGNAL, CODE_ATTENTION, CODE_MEDITATION, CODE_POOR_SIGNAL, CODE_EEG_POWER,
+)
+
+
+class LegacyParser(ThinkGearParser):
+    """ThinkGearParser with the payload walk as it was before (one slice copy per value)."""
+
+    def _parse_packet_payload(self):
+        i = 0
+        while i < self.payload_length:
+            extended_code_level = 0
+            while i < self.payload_length and self.payload[i] == EXCODE_BYTE:
+                extended_code_level += 1
+                i += 1
+            if i >= self.payload_length:
+                break
+            code = self.payload[i]
+            i += 1
+            if code >= 0x80:
+                if i >= self.payload_length:
+                    break
+                num_bytes = self.payload[i]
+                i += 1
+            else:
+                num_bytes = 1
+            if i + num_bytes <= self.payload_length:
+                value = self.payload[i:i + num_bytes]
+                if self.data_handler:
+                    self.data_handler(extended_code_level, code, num_bytes, value)
+                i += num_bytes
+            else:
+                break
+
+
+def small_value_stream(seconds):
+    """512 raw packets + 1 poor-signal/eSense/EEG-power packet per second, raw values in 0..255."""
+    second = bytearray()
+    for i in range(512):
+        second += make_packet([CODE_RAW_SIGNAL, 2, 0, i & 0xFF])
+    power = [CODE_EEG_POWER, 24] + [(i * 11) & 0xFF for i in range(24)]
+    second += make_packet([CODE_POOR_SIGNAL, 0, CODE_ATTENTION, 50, CODE_MEDITATION, 60] + power)
+    return bytes(second) * seconds
+
+
+def measure(parser_class, stream, chunk):
+    """
+    Returns:
+        tuple: (packets parsed, blocks allocated, bytes allocated, seconds)
+    """
+    kept = []
+    append = kept.append
+    parser = parser_class(ParserType.PACKETS, lambda level, code, num_bytes, value: append(value))
+    chunks = [stream[i:i + chunk] for i in range(0, len(stream), chunk)]
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    for data in chunks:
+        parser.parse_chunk(data)
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del kept[:]
+    return parser.packets_ok, blocks, size, elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Count ThinkGear payload parsing allocations with tracemalloc')
+    arg_parser.add_argument('--seconds', '-s', type=int, default=10,
+                            help='Seconds of synthetic stream to parse (default: 10)')
+    arg_parser.add_argument('--chunk', '-c', type=int, default=64,
+                            help='Bytes per simulated serial read (default: 64)')
+    args = arg_parser.parse_args()
+
+    stream = small_value_stream(args.seconds)
+    print(f"{args.seconds}s of stream ({len(stream)} bytes, {args.chunk} B chunks)")
+    for name, parser_class in (('legacy', LegacyParser), ('current', ThinkGearParser)):
+        packets, blocks, size, elapsed = measure(parser_class, stream, args.chunk)
+        print(f"  {name:8s}: {packets} packets, {blocks / packets:5.2f} blocks/packet, "
+              f"{size / packets:6.1f} B/packet, {elapsed / packets * 1e6:5.2f} us/packet (traced)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Per-sample overhead of ThinkGear value handling: legacy if/elif chain vs dispatch table.
+
+Feeds a synthetic TGAM stream (512 raw packets + 1 eSense/EEG-power packet per second)
+through ThinkGearParser once with a recording handler, then replays the recorded handler calls,
+chunk by chunk, into:
+  - noop:     an empty handler (the cost of the replay loop itself)
+  - legacy:   the original EEGReader._handle_data_value (if/elif chain, strftime per value)
+  - dispatch: the current EEGReader handler (dict dispatch, timestamp once per chunk)
+and reports the handler overhead per raw sample. Parsing is timed separately and
+left out of the comparison: its run-to-run jitter is larger than the difference being measured.
+
+Every variant is timed with timeit.repeat and the fastest pass is kept, so one-off stalls
+(warm-up, the scheduler) do not end up in the result. The variants take turns, one pass each
+per round, so a slow stretch on the machine hits all of them alike. stdout is redirected while
+timing: the reader's handlers print (e.g. the 30 s signal quality recheck) and the terminal
+write would otherwise be measured as handler cost.
+
+Usage:
+    python scripts/bench_dispatch.py [--seconds 60] [--chunk 64] [--repeat 5]
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+import io
+import time
+import timeit
+import argparse
+import contextlib
+from src.hardware.thinkgear import (
+    ThinkGearParser, ParserType,
+    CODE_RAW_SIGNAL, CODE_ATTENTION, CODE_MEDITATION, CODE_BLINK_STRENGTH, CODE_POOR_SIGNAL,
+)
+
+
+def make_packet(payload):
+    return bytes([0xAA, 0xAA, len(payload)]) + bytes(payload) + bytes([(~sum(payload)) & 0xFF])
+
+
+def synthetic_stream(seconds):
+    """One second = 512 raw packets followed by one poor-signal/eSense/EEG-power packet."""
+    second = bytearray()
+    for i in range(512):
+        raw = (i * 37) & 0xFFFF
+        second += make_packet([CODE_RAW_SIGNAL, 2, raw >> 8, raw & 0xFF])
+    power = [0x83, 24] + [(i * 11) & 0xFF for i in range(24)]
+    second += make_packet([CODE_POOR_SIGNAL, 0, CODE_ATTENTION, 50, CODE_MEDITATION, 60] + power)
+    return bytes(second) * seconds
+
+
+class LegacyHandler:
+    """EEGReader._handle_data_value as it was before the dispatch table (epoch extraction left out)."""
+
+    def __init__(self):
+        self.samples = []
+
+    def __call__(self, extended_code_level, code, num_bytes, value):
+        timestamp = time.strftime("%H:%M:%S")
+
+        if code == CODE_POOR_SIGNAL:
+            signal_quality = value[0] if isinstance(value, (bytes, bytearray)) else value
+        elif code == CODE_ATTENTION:
+            attention = value[0] if isinstance(value, (bytes, bytearray)) else value
+        elif code == CODE_MEDITATION:
+            meditation = value[0] if isinstance(value, (bytes, bytearray)) else value
+        elif code == CODE_BLINK_STRENGTH:
+            blink = value[0] if isinstance(value, (bytes, bytearray)) else value
+        elif code == CODE_RAW_SIGNAL:
+            if isinstance(value, (bytes, bytearray)) and len(value) >= 2:
+                raw_val = (value[0] << 8) | value[1]
+            else:
+                raw_val = value
+            if raw_val > 32768:
+                raw_val -= 65536
+            self.samples.append(raw_val)
+        elif code == 0x83:
+            pass
+        else:
+            value_hex = ' '.join([f'{b:02X}' for b in value])
+
+
+def parse_pass(parser, stream, chunk):
+    """One pass of the parser over the whole stream in serial-read sized chunks."""
+    def one_pass():
+        for i in range(0, len(stream), chunk):
+            parser.parse_chunk(stream[i:i + chunk])
+    return one_pass
+
+
+def record_calls(stream, chunk):
+    """The parser's handler calls grouped per chunk. Views into the payload buffer are copied."""
+    chunks = []
+    calls = []
+
+    def recorder(extended_code_level, code, num_bytes, value):
+        if not isinstance(value, int):
+            value = bytes(value)
+        calls.append((extended_code_level, code, num_bytes, value))
+    parser = ThinkGearParser(ParserType.PACKETS, recorder)
+    for i in range(0, len(stream), chunk):
+        parser.parse_chunk(stream[i:i + chunk])
+        chunks.append(calls)
+        calls = []
+    return chunks
+
+
+def replay_pass(handler, chunks, after_chunk=None):
+    """One pass of `handler` over the recorded calls, with `after_chunk` at every chunk end."""
+    def one_pass():
+        for calls in chunks:
+            for args in calls:
+                handler(*args)
+            if after_chunk:
+                after_chunk()
+    return one_pass
+
+
+def best_times(passes, repeat):
+    """Fastest seconds per pass over `repeat` rounds; every round runs each pass once, in turn."""
+    best = [float('inf')] * len(passes)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            for i, one_pass in enumerate(passes):
+                best[i] = min(best[i], min(timeit.repeat(one_pass, number=1, repeat=1)))
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark ThinkGear value dispatch overhead')
+    arg_parser.add_argument('--seconds', '-s', type=int, default=60,
+                            help='Seconds of synthetic stream to parse (default: 60)')
+    arg_parser.add_argument('--chunk', '-c', type=int, default=64,
+                            help='Bytes per simulated serial read (default: 64)')
+    arg_parser.add_argument('--repeat', '-r', type=int, default=5,
+                            help='Timed passes per variant; the fastest is reported (default: 5)')
+    args = arg_parser.parse_args()
+
+    stream = synthetic_stream(args.seconds)
+    samples = 512 * args.seconds
+    chunks = record_calls(stream, args.chunk)
+
+    parse = parse_pass(ThinkGearParser(ParserType.PACKETS, lambda *a: None), stream, args.chunk)
+    noop_pass = replay_pass(lambda *a: None, chunks)
+
+    legacy = LegacyHandler()
+    legacy_pass = replay_pass(legacy, chunks, after_chunk=legacy.samples.clear)
+
+    from src.hardware.eeg import EEGReader
+    with contextlib.redirect_stdout(io.StringIO()):
+        reader = EEGReader(port='bench')
+
+    def after_chunk():
+        reader.last_byte_time = time.monotonic()  # once per chunk, as in the reader loops
+        reader._chunk_samples.clear()
+    dispatch_pass = replay_pass(reader.parser.data_handler, chunks, after_chunk=after_chunk)
+
+    parse_time, noop, legacy_time, dispatch_time = best_times(
+        (parse, noop_pass, legacy_pass, dispatch_pass), args.repeat)
+
+    print(f"{args.seconds}s of stream ({samples} raw samples, {len(stream)} bytes, {args.chunk} B chunks, "
+          f"best of {args.repeat})")
+    print(f"  parse only : {parse_time / samples * 1e6:6.2f} us/sample (not part of the comparison)")
+    for name, elapsed in (('legacy', legacy_time), ('dispatch', dispatch_time)):
+        print(f"  {name:9s}  : {(elapsed - noop) / samples * 1e6:6.2f} us/sample handler overhead")
+
+
+if __name__ == '__main__':
+    main()
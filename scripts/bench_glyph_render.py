@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Render time per frame: TrueType text (draw.text + textbbox) vs the pre-rasterized glyph cache.
+
+Renders every screen of OLEDTimeSetter (src/display) and of the new/ UIRenderer into an
+in-memory image, first with the glyph caches bypassed (every string laid out and rasterized by
+FreeType, as before) and then with them, and reports the mean time per frame. Each cached frame
+is compared with the TrueType frame pixel for pixel.
+
+Usage:
+    python scripts/bench_glyph_render.py [--frames 500]
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(1, os.path.join(PROJECT_ROOT, 'new'))
+os.environ['BRAINALARM_HW'] = 'fake'
+import time
+import argparse
+import datetime
+from PIL import Image, ImageDraw
+from src.alarm.clock import KST
+from src.display.glyphs import GlyphFont
+from src.display.oled_time_setter2 import OLEDTimeSetter
+
+
+class _TrueType(GlyphFont):
+    """GlyphFont with nothing cached: draw.text() and a FreeType bbox on every call."""
+
+    def __init__(self, font):
+        super().__init__(font, '', ())
+
+    def textbbox(self, text):
+        return self.font.getbbox(text, mode='1')
+
+
+def _bypass(glyph_fonts):
+    return {name: _TrueType(glyphs.font) for name, glyphs in glyph_fonts.items()}
+
+
+def setter_screens(setter):
+    """(screen name, draw function) pairs for OLEDTimeSetter."""
+    def screen(mode, draw):
+        def render():
+            setter.interface_mode = mode
+            draw()
+        return render
+    return [('setter WINDOW', screen('WINDOW', setter.draw_window_interface)),
+            ('setter TIME', screen('TIME', setter.draw_time_interface)),
+            ('setter CLOCK', screen('CLOCK', setter.draw_clock_interface))]
+
+
+def bench_setter(frames):
+    setter = OLEDTimeSetter(KST.localize(datetime.datetime(2024, 1, 2, 7, 0)))
+    names = ('time_glyphs', 'ampm_glyphs', 'window_glyphs', 'alarmtime_glyphs')
+    cached = {name: getattr(setter, name) for name in names}
+    results = []
+    for name, render in setter_screens(setter):
+        timings = {}
+        images = {}
+        for label, fonts in (('truetype', _bypass(cached)), ('cached', cached)):
+            for attr, glyphs in fonts.items():
+                setattr(setter, attr, glyphs)
+            start = time.perf_counter()
+            for _ in range(frames):
+                setter.draw.rectangle((0, 0, 128, 64), outline=0, fill=0)
+                render()
+            timings[label] = (time.perf_counter() - start) / frames
+            images[label] = setter.image.tobytes()
+        results.append((name, timings, images['truetype'] == images['cached']))
+    return results
+
+
+def bench_renderer(frames):
+    from hardware_handler import OLED
+    from ui_renderer import UIRenderer
+    from state_manager import StateManager, State
+
+    class _Silent:
+        def on(self):
+            pass
+
+        def off(self):
+            pass
+
+        def stop(self):
+            pass
+
+    oled = OLED()
+    state = StateManager(_Silent())
+    renderer = UIRenderer()
+    screens = [('ui DISPLAY_TIME', State.DISPLAY_TIME, False), ('ui SET_WINDOW', State.SET_WINDOW_DURATION, False),
+               ('ui SET_TARGET_TIME', State.SET_TARGET_TIME, False), ('ui ALARM', State.DISPLAY_TIME, True)]
+    for size in UIRenderer.GLYPH_TEXT:
+        renderer._glyphs_for(oled, size)
+    cached = dict(renderer._glyphs)
+    results = []
+    for name, screen_state, alarm in screens:
+        state.current_state = screen_state
+        state.alarm_active = alarm
+        timings = {}
+        images = {}
+        for label, fonts in (('truetype', {font: _TrueType(font) for font in cached}), ('cached', cached)):
+            renderer._glyphs = fonts
+            image = Image.new('1', (128, 64))
+            draw = ImageDraw.Draw(image)
+            start = time.perf_counter()
+            for _ in range(frames):
+                draw.rectangle((0, 0, 128, 64), fill=0)
+                renderer._draw_scene(draw, oled, state)
+            timings[label] = (time.perf_counter() - start) / frames
+            images[label] = image.tobytes()
+        results.append((name, timings, images['truetype'] == images['cached']))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-frame render time: TrueType text vs glyph cache')
+    parser.add_argument('--frames', type=int, default=500, help='Frames per screen and mode (default: 500)')
+    args = parser.parse_args()
+
+    results = bench_setter(args.frames) + bench_renderer(args.frames)
+    print(f"\n{'screen':20s} {'truetype ms':>12s} {'cached ms':>10s} {'speedup':>8s}  identical")
+    for name, timings, identical in results:
+        print(f"{name:20s} {timings['truetype'] * 1000:12.3f} {timings['cached'] * 1000:10.3f} "
+              f"{timings['truetype'] / timings['cached']:7.1f}x  {'yes' if identical else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+CPU usage of GPIO input handling: 1 ms polling thread vs edge-callback input layer.
+
+Runs, one after the other for the same duration,
+  - polling:  the loop OLEDTimeSetter.handle_gpio used (read reset/set/CLK/DT, sleep 1 ms)
+  - events:   src.hardware.gpio_input.InputManager (GPIO.add_event_detect + event queue)
+and reports the process CPU time per wall-clock second plus the encoder steps each one saw.
+With --turns the encoder is turned at --step-ms per step during the run (needs --simulate, or a
+person turning the knob on real hardware), which also shows steps missed by polling.
+
+On a Raspberry Pi this uses RPi.GPIO. --simulate selects the fake hardware backend
+(BRAINALARM_HW=fake), whose edge callbacks run on the thread driving the pins, as RPi.GPIO's do
+on its event thread.
+
+Usage:
+    python scripts/bench_gpio_input.py [--seconds 10] [--simulate] [--turns 200 --step-ms 0.5]
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+import time
+import argparse
+import threading
+
+RESET_PIN, SET_PIN, CLK, DT = 4, 23, 17, 18
+
+
+def run_polling(gpio, stop):
+    """The polling loop as it was in OLEDTimeSetter.handle_gpio (returns encoder steps seen)."""
+    steps = 0
+    last_reset, last_set, last_clk = gpio.input(RESET_PIN), gpio.input(SET_PIN), gpio.input(CLK)
+    while not stop.is_set():
+        reset_state = gpio.input(RESET_PIN)
+        last_reset = reset_state
+        set_state = gpio.input(SET_PIN)
+        last_set = set_state
+        clk_state = gpio.input(CLK)
+        if last_clk == 0 and clk_state == 1:
+            steps += 1 if gpio.input(DT) == 0 else -1
+        last_clk = clk_state
+        time.sleep(0.001)
+    return steps
+
+
+def run_events(gpio, stop):
+    """The edge-callback input layer (returns encoder steps seen)."""
+    from src.hardware.gpio_input import InputManager, ENCODER_STEP
+    inputs = InputManager(maxsize=4096)
+    inputs.add_button('reset', RESET_PIN)
+    inputs.add_button('set', SET_PIN)
+    inputs.add_encoder('knob', CLK, DT)
+    steps = 0
+    while not stop.is_set():
+        event = inputs.get(timeout=0.5)
+        if event is not None and event.kind == ENCODER_STEP:
+            steps += event.value
+    steps += sum(e.value for e in inputs.drain() if e.kind == ENCODER_STEP)
+    inputs.close()
+    return steps
+
+
+def measure(name, runner, gpio, seconds, turns, step_sec):
+    stop = threading.Event()
+    result = {}
+    consumer = threading.Thread(target=lambda: result.setdefault('steps', runner(gpio, stop)))
+    wall0, cpu0 = time.monotonic(), time.process_time()
+    consumer.start()
+    if turns:
+        time.sleep(0.1)
+        gpio.turn(CLK, DT, turns, step_sec)
+    time.sleep(max(0.0, seconds - (time.monotonic() - wall0)))
+    stop.set()
+    consumer.join()
+    wall, cpu = time.monotonic() - wall0, time.process_time() - cpu0
+    print(f"{name:8s}  CPU {cpu:6.3f} s over {wall:5.1f} s = {100 * cpu / wall:5.2f} %   "
+          f"encoder steps {result.get('steps', 0)}" + (f" / {turns} turned" if turns else ""))
+    return cpu / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CPU usage of polling vs edge-callback GPIO input')
+    parser.add_argument('--seconds', type=float, default=10.0, help='Duration of each run (default: 10)')
+    parser.add_argument('--simulate', action='store_true', help='Use the fake GPIO backend (no hardware)')
+    parser.add_argument('--turns', type=int, default=0, help='Encoder steps driven during each run (simulation)')
+    parser.add_argument('--step-ms', type=float, default=2.0, help='Time per encoder step in ms (default: 2)')
+    args = parser.parse_args()
+
+    if args.simulate:
+        os.environ['BRAINALARM_HW'] = 'fake'
+    from src.hardware.backend import GPIO as gpio, is_fake
+    gpio.setwarnings(False)
+    gpio.setmode(gpio.BCM)
+    for pin in (RESET_PIN, SET_PIN, CLK, DT):
+        gpio.setup(pin, gpio.IN, pull_up_down=gpio.PUD_UP)
+    if args.turns and not is_fake():
+        print("--turns needs --simulate; turn the knob by hand instead.")
+        args.turns = 0
+
+    try:
+        polling = measure('polling', run_polling, gpio, args.seconds, args.turns, args.step_ms / 1000)
+        events = measure('events', run_events, gpio, args.seconds, args.turns, args.step_ms / 1000)
+        if events > 0:
+            print(f"polling uses {polling / events:.1f}x the CPU of the event-driven input layer")
+    finally:
+        gpio.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Per-frame allocations and time of the new/ OLED drawing path: a fresh canvas per frame vs the
+persistent back-buffer.
+
+Draws the UIRenderer screens frame after frame three ways:
+  canvas       `with canvas(device) as draw:` - a new PIL image and ImageDraw per frame (before)
+  back-buffer  one Image/ImageDraw reused, the last frame's inked area cleared in place
+  OLED.display the back-buffer plus the frame diff and partial updates (what new/main runs)
+The first two hand the frame to a device that discards it, so only the drawing path is measured.
+Reported per frame: mean time, PIL images allocated (each one a width x height byte buffer in
+Pillow's own allocator) and the peak Python-heap bytes allocated while drawing (tracemalloc).
+
+Usage:
+    python scripts/bench_oled_backbuffer.py [--frames 1000]
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(1, os.path.join(PROJECT_ROOT, 'new'))
+os.environ['BRAINALARM_HW'] = 'fake'
+import time
+import argparse
+import tracemalloc
+from PIL import Image, ImageDraw
+from src.hardware import backend
+from hardware_handler import OLED
+from ui_renderer import UIRenderer
+from state_manager import StateManager, State
+
+
+class _NullDevice:
+    """luma device that discards frames."""
+    size = (128, 64)
+    mode = '1'
+
+    def display(self, image):
+        pass
+
+
+class _Silent:
+    def on(self):
+        pass
+
+    def off(self):
+        pass
+
+
+_images_created = 0
+_image_new = Image.new
+
+
+def _counting_new(*args, **kwargs):
+    global _images_created
+    _images_created += 1
+    return _image_new(*args, **kwargs)
+
+
+def canvas_path(oled, scene):
+    device = _NullDevice()
+
+    def frame():
+        with backend.canvas(device) as draw:
+            scene(draw, oled)
+    return frame
+
+
+def backbuffer_path(oled, scene):
+    device = _NullDevice()
+    image = Image.new(device.mode, device.size)
+    draw = ImageDraw.Draw(image)
+
+    def frame():
+        inked = image.getbbox()
+        if inked:
+            draw.rectangle((inked[0], inked[1], inked[2] - 1, inked[3] - 1), fill=0)
+        scene(draw, oled)
+        device.display(image)
+    return frame
+
+
+def oled_path(oled, scene):
+    return lambda: oled.display(scene)
+
+
+def measure(frame, frames):
+    """(mean seconds, images per frame, peak Python bytes per frame) over `frames` calls."""
+    global _images_created
+    frame()   # 첫 프레임(캐시 준비)은 제외
+    _images_created = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame()
+    seconds = (time.perf_counter() - start) / frames
+    images = _images_created / frames
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(min(frames, 200)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        frame()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return seconds, images, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OLED drawing path: canvas per frame vs persistent back-buffer')
+    parser.add_argument('--frames', type=int, default=1000, help='Frames per screen and path (default: 1000)')
+    args = parser.parse_args()
+
+    Image.new = _counting_new
+    oled = OLED()
+    state = StateManager(_Silent())
+    renderer = UIRenderer()
+    screens = (('DISPLAY_TIME', State.DISPLAY_TIME), ('SET_WINDOW', State.SET_WINDOW_DURATION),
+               ('SET_TARGET_TIME', State.SET_TARGET_TIME))
+
+    print(f"\n{'screen':16s} {'path':13s} {'ms/frame':>9s} {'images/frame':>13s} {'peak py bytes':>14s}")
+    for name, screen_state in screens:
+        state.current_state = screen_state
+
+        def scene(draw, oled_):
+            renderer._draw_scene(draw, oled_, state)
+        for label, path in (('canvas', canvas_path), ('back-buffer', backbuffer_path), ('OLED.display', oled_path)):
+            seconds, images, peak = measure(path(oled, scene), args.frames)
+            print(f"{name:16s} {label:13s} {seconds * 1000:9.3f} {images:13.2f} {peak:14d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Bytes on the I2C bus per UI interaction: full-frame updates vs partial (dirty rectangle) updates.
+
+Drives OLEDTimeSetter on the fake hardware backend through typical interactions (a minute tick of
+the clock face, an encoder step in the time and window screens, confirming a screen) and reports,
+per interaction, the bus bytes of sending the full framebuffer against sending only the changed
+page/column rectangles, the number of rectangles, and the time spent computing them. Each partial
+update is checked against a model of the panel RAM: after it, the panel must show the new frame.
+
+Usage:
+    python scripts/bench_oled_bus.py [--repeat 200]
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+os.environ['BRAINALARM_HW'] = 'fake'
+import time
+import types
+import argparse
+import datetime
+from src.alarm.clock import KST
+from src.display import oled_time_setter2
+from src.display.oled_time_setter2 import OLEDTimeSetter
+from src.display.partial_update import PartialUpdater
+from src.hardware.backend import FakeSSD1306, FakeLumaDevice
+
+
+class _FrozenClock:
+    """Stands in for the datetime module in oled_time_setter2 so the clock face shows a chosen time."""
+
+    def __init__(self):
+        self.now_value = KST.localize(datetime.datetime(2024, 1, 1, 12, 34))
+        frozen = self
+
+        class _Datetime(datetime.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return frozen.now_value
+
+        self.module = types.SimpleNamespace(datetime=_Datetime, date=datetime.date,
+                                            time=datetime.time, timedelta=datetime.timedelta)
+
+    def set(self, hour, minute):
+        self.now_value = self.now_value.replace(hour=hour, minute=minute)
+
+
+def _render(setter):
+    setter.draw.rectangle((0, 0, 128, 64), outline=0, fill=0)
+    {'WINDOW': setter.draw_window_interface, 'TIME': setter.draw_time_interface,
+     'CLOCK': setter.draw_clock_interface}[setter.interface_mode]()
+    return setter.image.copy()
+
+
+def interactions(setter, clock):
+    """(name, frame before, frame after) for each UI interaction."""
+    def step(name, change, **state):
+        for key, value in state.items():
+            setattr(setter, key, value)
+        before = _render(setter)
+        change()
+        return name, before, _render(setter)
+
+    def tick(start, end):
+        clock.set(*start)
+        return lambda: clock.set(*end)
+
+    def switch(mode):
+        return lambda: setattr(setter, 'interface_mode', mode)
+
+    return [
+        step('clock minute tick 12:34 -> 12:35', tick((12, 34), (12, 35)), interface_mode='CLOCK'),
+        step('clock hour tick 12:59 -> 01:00', tick((12, 59), (13, 0))),
+        step('clock AM -> PM 11:59 -> 12:00', tick((11, 59), (12, 0))),
+        step('encoder +5 min (time screen)', lambda: setter.add_minutes(5),
+             interface_mode='TIME', set_hour=7, set_minute=0),
+        step('encoder +60 min (time screen)', lambda: setter.add_minutes(60)),
+        step('encoder +5 min (window screen)', lambda: setter.adjust_window(5),
+             interface_mode='WINDOW', wake_window_minutes=30),
+        step('confirm window (window -> time screen)', switch('TIME'), interface_mode='WINDOW'),
+    ]
+
+
+def measure(device, before, after, repeat):
+    """Bus bytes of a full frame and of the partial update before -> after, plus update time."""
+    panel = PartialUpdater(device)
+    panel.show(before)
+    start_bytes = device.bytes_sent
+    estimate = panel.show(after)
+    partial = device.bytes_sent - start_bytes
+    assert device.panel_image.tobytes() == after.convert('1').tobytes(), "panel RAM does not match the frame"
+    assert partial == estimate, f"bus byte estimate {estimate} != {partial} on the bus"
+
+    start_bytes = device.bytes_sent
+    PartialUpdater(device).show(after)
+    full = device.bytes_sent - start_bytes
+
+    timer = PartialUpdater(type(device)())
+    timer.show(after)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        timer.show(before)
+        timer.show(after)
+    per_update = (time.perf_counter() - start) / repeat / 2
+    return full, partial, panel.windows, per_update
+
+
+def main():
+    parser = argparse.ArgumentParser(description='I2C bytes per UI interaction: full vs partial OLED updates')
+    parser.add_argument('--repeat', type=int, default=200, help='Timing repetitions (default: 200)')
+    args = parser.parse_args()
+
+    clock = _FrozenClock()
+    oled_time_setter2.datetime = clock.module
+    setter = OLEDTimeSetter(KST.localize(datetime.datetime(2024, 1, 2, 7, 0)))
+    steps = interactions(setter, clock)
+
+    for driver in (FakeSSD1306, FakeLumaDevice):
+        print(f"\n{driver.__name__} ({'adafruit_ssd1306' if driver is FakeSSD1306 else 'luma.oled'} bus costs)")
+        print(f"  {'interaction':40s} {'full':>6s} {'partial':>8s} {'saved':>6s} {'rects':>5s} {'update ms':>9s}")
+        total_full = total_partial = 0
+        for name, before, after in steps:
+            full, partial, windows, seconds = measure(driver(), before, after, args.repeat)
+            total_full += full
+            total_partial += partial
+            print(f"  {name:40s} {full:6d} {partial:8d} {100 * (1 - partial / full):5.0f}% {windows:5d} "
+                  f"{seconds * 1000:9.3f}")
+        print(f"  {'total':40s} {total_full:6d} {total_partial:8d} {100 * (1 - total_partial / total_full):5.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Record rotary encoder edges on the Raspberry Pi for offline replay through the quadrature decoder.
+
+Every edge on CLK or DT is written as "timestamp,a,b". Turn the knob (slowly, fast, back and
+forth) while it records; at the end the live detent count is compared with a replay of the file:
+    python -m src.hardware.quadrature encoder_trace.csv
+
+Usage:
+    python scripts/record_encoder_trace.py [--out encoder_trace.csv] [--seconds 20] [--clk 17 --dt 18]
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+import time
+import argparse
+import RPi.GPIO as GPIO
+from src.hardware.gpio_input import InputManager, ENCODER_STEP
+from src.hardware.quadrature import EncoderTraceRecorder, load_trace, replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record rotary encoder edges to a CSV trace')
+    parser.add_argument('--out', default='encoder_trace.csv', help='Trace file (default: encoder_trace.csv)')
+    parser.add_argument('--seconds', type=float, default=20.0, help='Recording time (default: 20)')
+    parser.add_argument('--clk', type=int, default=17, help='BCM pin of CLK (default: 17)')
+    parser.add_argument('--dt', type=int, default=18, help='BCM pin of DT (default: 18)')
+    parser.add_argument('--steps-per-detent', type=int, choices=(1, 2, 4), default=4,
+                        help='Quarter steps per detent (default: 4)')
+    args = parser.parse_args()
+
+    GPIO.setwarnings(False)
+    GPIO.setmode(GPIO.BCM)
+    recorder = EncoderTraceRecorder(args.out)
+    inputs = InputManager(maxsize=4096)
+    encoder = inputs.add_encoder('knob', args.clk, args.dt, args.steps_per_detent, trace=recorder)
+    # 첫 줄은 초기 레벨 (replay()가 디코더 초기 상태로 사용)
+    recorder(time.monotonic(), GPIO.input(args.clk), GPIO.input(args.dt))
+
+    print(f"Recording encoder edges for {args.seconds:.0f} s -> {args.out}. Turn the knob...")
+    live = 0
+    deadline = time.monotonic() + args.seconds
+    try:
+        while time.monotonic() < deadline:
+            event = inputs.get(timeout=0.2)
+            if event is not None and event.kind == ENCODER_STEP:
+                live += event.value
+                print(f"  {'CW ' if event.value > 0 else 'CCW'}  total {live:+d}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        inputs.close()
+        recorder.close()
+        GPIO.cleanup()
+
+    result = replay(load_trace(args.out), args.steps_per_detent)
+    print(f"Live: {live:+d} detents, {encoder.decoder.errors} errors | "
+          f"replay: {result['detents']:+d} detents, {result['errors']} errors")
+
+
+if __name__ == '__main__':
+    main()
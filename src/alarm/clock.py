@@ -0,0 +1,71 @@
+"""
+Alarm Clock Sources
+SmartAlarm reads the wall clock, the monotonic clock and sleeps only through a clock object, so
+the same alarm logic runs in real time on the device and on a virtual clock in the night
+simulator (src/simulation/night.py).
+"""
+import time
+import datetime
+from pytz import timezone
+
+KST = timezone('Asia/Seoul')  # 모든 사용자 시각은 UTC+9
+
+
+class SystemClock:
+    """Real time: datetime.now(KST), time.monotonic() and time.sleep()."""
+
+    def now(self):
+        return datetime.datetime.now(KST)
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Simulated time that only moves when sleep() is called.
+
+    sleep() advances the clock in steps of `tick` seconds and calls every registered ticker with
+    the new monotonic time after each step, so simulated inputs (an EEG stream, scripted button
+    presses) are produced on the sleeping thread, in order, and an 8-hour night runs as fast as
+    the work done in it.
+    """
+
+    def __init__(self, start, tick=1.0, origin=1000.0):
+        """
+        Args:
+            start (datetime): Timezone-aware wall time at which the simulation starts
+            tick (float): Largest step (s) between ticker calls
+            origin (float): monotonic() value at the start
+        """
+        self.start = start
+        self.tick = tick
+        self.origin = origin
+        self.elapsed = 0.0
+        self.tickers = []
+
+    def now(self):
+        return self.start + datetime.timedelta(seconds=self.elapsed)
+
+    def monotonic(self):
+        return self.origin + self.elapsed
+
+    def sleep(self, seconds):
+        target = self.elapsed + max(0.0, seconds)
+        while self.elapsed < target:
+            self.elapsed = min(target, self.elapsed + self.tick)
+            now = self.monotonic()
+            for ticker in list(self.tickers):
+                ticker(now)
+
+    def add_ticker(self, ticker):
+        """Call ticker(monotonic_time) after every step of simulated time."""
+        self.tickers.append(ticker)
+
+    def remove_ticker(self, ticker):
+        if ticker in self.tickers:
+            self.tickers.remove(ticker)
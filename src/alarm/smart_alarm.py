@@ -3,6 +3,14 @@ import time
 from src.hardware.vibration_controller import trigger_vibration_alarm
 # from src.processing.signal_processing import suBAR
 from src.hardware.eeg import EEGReader
+from src.hardware.watchdog import SerialWatchdog, Backoff
+from src.hardware.stats import AcquisitionStats
+from src.processing.timing import GAP_INTERPOLATE
+from src.processing.tgam_features import TIER_FULL, TIER_TGAM
+from src.processing.artifact_gate import ARTIFACT_REJECT
+from src.processing.governor import ComputeGovernor, bands_by_importance, RAW_TIERS, DEGRADED_TIERS
+from src.alarm.clock import SystemClock
+from src.display.render_service import RenderService
 import sys
 import os
 import threading
@@ -18,6 +26,15 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'display'))
 
 #All time variables use UTC+9 (python3)
 
+# 기상 윈도우 시작 전에 미리 EEG 수집을 시작하는 시간 (초).
+# 연결 + 30초 신호 품질 윈도우 + 30초 epoch 하나를 채우기에 충분해야 합니다.
+PREROLL_SEC = 90
+
+# 시계 화면은 렌더 스레드가 최대 이 속도로 그리고, 알람 루프가 자는 동안에도 1초마다 갱신합니다.
+DISPLAY_FPS = 10
+DISPLAY_REFRESH_SEC = 1.0
+VIRTUAL_DISPLAY_FRAME_SEC = 60.0  # 가상 시계(시뮬레이터)에서의 프레임 간격: 시계 화면은 분 단위로만 바뀝니다
+
 # 알람 작동
 def trigger_alarm():
     """
@@ -54,32 +71,201 @@ def is_within_wake_window(current_time, start_time, window_min=15):
 #         time.sleep(5)
 
 class SmartAlarm:
-    def __init__(self, model, start_time, wake_time, wake_window_min, args, oled):
+    def __init__(self, model, start_time, wake_time, wake_window_min, args, oled,
+                 preroll_sec=PREROLL_SEC, tgam_model=None, clock=None, eeg_reader_factory=None,
+                 watchdog=None, alarm_action=trigger_alarm):
+        """
+        Args:
+            clock: Time source with now()/monotonic()/sleep() (default SystemClock; the night
+                simulator passes a VirtualClock)
+            eeg_reader_factory: Called with EEGReader's arguments to build the reader (default
+                EEGReader; the night simulator passes a simulated EEG stream)
+            watchdog: Link watchdog for the reader (default SerialWatchdog)
+            alarm_action: Called with no arguments to wake the user (default: vibration alarm)
+        """
         self.model = model
+        self.tgam_model = tgam_model # TGAM 칩 특징(TGAM_FEATURE_NAMES)으로 학습된 경량 모델 (선택)
         self.start_time = start_time # 탐색 시작 시각
         self.wake_time = wake_time # 목표 기상 시각
         self.wake_window_min = wake_window_min
         self.args = args
         self.oled = oled
+        self.preroll_sec = preroll_sec # 윈도우 시작 전 EEG 사전 수집 시간 (0이면 비활성화)
+        self.clock = clock or SystemClock()
+        self.alarm_action = alarm_action
+        self.alarm_time = None   # 알람이 울린 시각
+        self.alarm_reason = None # 'light_sleep' 또는 'wake_time'
+
+        # 특징 추출이 마감 시간을 넘기면 더 가벼운 티어로 내려가고, 여유가 생기면 다시 올라갑니다 (--deadline으로 켬).
+        deadline = getattr(self.args, 'deadline', 0)
+        self.governor = None
+        if deadline > 0:
+            tiers = RAW_TIERS + ((TIER_TGAM,) if tgam_model is not None else ())
+            self.governor = ComputeGovernor(deadline, tiers=tiers, keep_bands=bands_by_importance(model))
+        self.predictions = [] # 예측 기록: 시각, 수면 단계, 특징 티어, 추출 시간, epoch 종료 -> 판단 지연
 
         # 1. EEGReader 객체는 미리 생성해두지만, 연결은 하지 않습니다.
-        self.eeg_reader = EEGReader(port=self.args.port, baudrate=self.args.baudrate)
+        make_reader = eeg_reader_factory or EEGReader
+        self.eeg_reader = make_reader(port=self.args.port, baudrate=self.args.baudrate,
+                                      gap_policy=getattr(self.args, 'gap_policy', GAP_INTERPOLATE),
+                                      feature_tier=getattr(self.args, 'feature_tier', TIER_FULL),
+                                      artifact_policy=getattr(self.args, 'artifact_policy', ARTIFACT_REJECT),
+                                      isolate_extraction=getattr(self.args, 'isolate_extraction', False),
+                                      incremental_features=getattr(self.args, 'incremental', False),
+                                      governor=self.governor)
+        # 수집 중 링크가 끊기면 워치독이 백오프로 재연결합니다.
+        self.watchdog = watchdog or SerialWatchdog(self.eeg_reader)
+        self.connect_backoff = Backoff(base=1.0, max_delay=30.0)
         self.thread: Optional[threading.Thread] = None
         self.running = False
+        # OLED는 렌더 스레드에서만 그립니다. 알람 루프는 화면 상태를 게시만 하고 바로 돌아옵니다.
+        if hasattr(self.clock, 'add_ticker'):
+            # 가상 시계는 실제 시간보다 수천 배 빠르므로 렌더 스레드 대신 시계 틱에서 그립니다.
+            self.display = RenderService(self._render_display, fps=1 / VIRTUAL_DISPLAY_FRAME_SEC,
+                                         refresh_sec=VIRTUAL_DISPLAY_FRAME_SEC, name='alarm-display',
+                                         clock=self.clock)
+        else:
+            self.display = RenderService(self._render_display, fps=DISPLAY_FPS,
+                                         refresh_sec=DISPLAY_REFRESH_SEC, name='alarm-display')
 
     def wait_until_start(self):
         # 표기는 사용자 설정 시각인 UTC+9으로
         print(f"brainalarm 시작 예정 시각: {self.start_time.strftime('%H:%M:%S')}")
         print('start_datetime: ', self.start_time)
-        print('현재시각: ',datetime.datetime.now(timezone('Asia/Seoul')).strftime('%H:%M:%S'))
-        while datetime.datetime.now(timezone('Asia/Seoul')) < self.start_time:
+        print('현재시각: ',self.clock.now().strftime('%H:%M:%S'))
+        self._wait_until(self.start_time)
+
+    def _wait_until(self, target_time):
+        """target_time(UTC+9)까지 시계 화면을 갱신하며 대기합니다."""
+        while self.running:
+            remaining = (target_time - self.clock.now()).total_seconds()
+            if remaining <= 0:
+                break
             # gpio_thread = threading.Thread(target=self.oled.handle_gpioreset, daemon=True)
             # gpio_thread.start()
             print('waiting until start time...', end='\r')
-            self.oled.interface_mode = 'CLOCK'
-            self.oled.update_display()
-            time.sleep(5)
-    
+            self.display.publish('CLOCK')
+            self.clock.sleep(min(5, remaining))
+
+    def _render_display(self, mode):
+        """(렌더 스레드에서 실행됨) 게시된 화면 모드로 OLED를 그립니다."""
+        self.oled.interface_mode = mode
+        self.oled.update_display()
+
+    def _preroll(self):
+        """
+        기상 윈도우가 열리기 전에 EEG 장치에 연결하고 수집을 시작합니다.
+
+        start_time - preroll_sec 시점에 호출되어 연결, 신호 품질 확인, epoch 버퍼 채우기를
+        미리 끝내 두므로, 윈도우가 열리는 순간 첫 번째 예측을 바로 할 수 있습니다.
+
+        Returns:
+            bool: EEG 리더가 시작되었으면 True
+        """
+        print(f"[{self.clock.now().strftime('%H:%M:%S')}] EEG 사전 수집(pre-roll)을 시작합니다. ({self.preroll_sec}초 전)")
+        while self.running:
+            if self._start_eeg():
+                break
+            remaining = (self.start_time - self.clock.now()).total_seconds()
+            if remaining <= 0:
+                print("Pre-roll 중 EEG 장치 연결 실패. 윈도우 안에서 다시 시도합니다.")
+                return False
+            delay = min(self.connect_backoff.next(), remaining)
+            print(f"EEG 장치 연결 실패. {delay:.1f}초 후 재시도합니다.")
+            self.clock.sleep(delay)
+        if not self.eeg_reader.running:
+            return False
+
+        self._wait_until(self.start_time)
+
+        # 윈도우가 열리는 시점의 신호 품질과 epoch 준비 상태를 보고합니다.
+        quality = self.eeg_reader.thirty_signal_quality
+        if quality is None:
+            print("Pre-roll 완료: 30초 신호 품질 윈도우가 아직 채워지지 않았습니다.")
+        else:
+            print(f"Pre-roll 완료: 신호 품질 {'좋음' if quality else '불안정'}, "
+                  f"epoch 준비 {'완료' if self.eeg_reader.new_feature_ready else '미완료'}")
+        return True
+
+    def _start_eeg(self):
+        """EEG 장치에 연결하고 리더와 워치독을 시작합니다. 성공하면 True."""
+        if not self.eeg_reader.connect():
+            return False
+        self.eeg_reader.start(mode='parsed')
+        self.watchdog.start()
+        self.connect_backoff.reset()
+        return True
+
+    def _stop_eeg(self):
+        """워치독을 먼저 멈춘 뒤 EEG 리더를 중지하고 연결을 해제합니다."""
+        self.watchdog.stop()
+        if self.eeg_reader.running:
+            self.eeg_reader.stop()
+        self.eeg_reader.disconnect()
+
+    def _select_features(self):
+        """
+        이번 epoch 예측에 쓸 모델과 특징 벡터를 고릅니다.
+
+        전체 특징(exfeature)이 있으면 기본 모델을, 없으면(TGAM 티어이거나 epoch이 폐기된 경우)
+        TGAM 경량 모델이 있을 때 TGAM 칩 특징을 사용합니다. 거버너가 내린 축소 티어(DEGRADED_TIERS)의
+        특징은 기본 모델이 학습하지 않은 분포(fs/2, NaN)이므로 판단에 쓰지 않고 TGAM 모델로 넘어갑니다.
+
+        Returns:
+            tuple: (model, feature_vector, tier) 또는 쓸 수 있는 특징이 없으면 None
+        """
+        if self.eeg_reader.feature is not None:
+            meta = self.eeg_reader.epoch_metadata or {}
+            tier = meta.get('tier') or TIER_FULL
+            if tier not in DEGRADED_TIERS:
+                return self.model, self.eeg_reader.feature, tier
+            print(f"[{self.clock.now().strftime('%H:%M:%S')}] {tier} 티어 특징은 기본 모델의 판단에 쓰지 않습니다.")
+        if self.tgam_model is not None and self.eeg_reader.tgam_feature is not None:
+            return self.tgam_model, self.eeg_reader.tgam_feature, TIER_TGAM
+        return None
+
+    def _predict(self, model, feature, tier, meta):
+        """
+        선택된 모델로 수면 단계를 예측하고, 어떤 티어의 특징으로 예측했는지 기록합니다.
+
+        Returns:
+            예측된 수면 단계, 예측에 실패하면 None
+        """
+        feature_vector = np.array(feature, dtype=float)
+        try:
+            predicted_stage = model.predict(feature_vector.reshape(1,-1))[0]
+        except Exception as e:
+            # 결측값(NaN)을 받지 못하는 모델이면 축소 티어의 특징에서 실패할 수 있습니다.
+            print(f"[{self.clock.now().strftime('%H:%M:%S')}] 예측 실패 ({tier}): {e}")
+            return None
+        extract_sec = meta.get('extract_sec')
+        queue_sec = meta.get('queue_sec')
+        end_time = meta.get('end_time')
+        closed_at = meta.get('closed_at')
+        # latency_sec는 마지막 샘플 도착부터(알람 시계 기준), decision_sec는 epoch 마감부터 실제 경과 시간입니다.
+        self.predictions.append({'time': self.clock.now(), 'stage': predicted_stage,
+                                 'tier': tier, 'extract_sec': extract_sec, 'queue_sec': queue_sec,
+                                 'latency_sec': self.clock.monotonic() - end_time if end_time is not None else None,
+                                 'decision_sec': time.perf_counter() - closed_at if closed_at is not None else None})
+        print(f"[{self.clock.now().strftime('%H:%M:%S')}] 현재 수면 단계 예측: {predicted_stage} "
+              f"({tier}{f', 추출 {extract_sec:.1f}s' if extract_sec is not None else ''}"
+              f"{f', 대기 {queue_sec:.1f}s' if queue_sec is not None else ''})")
+        return predicted_stage
+
+    def _fire_alarm(self, reason):
+        """EEG 수집을 멈추고 알람을 울립니다. 알람 루프는 이번 반복 후 종료됩니다."""
+        self.running = False # 알람 울렸으므로 종료
+        self.alarm_time = self.clock.now()
+        self.alarm_reason = reason
+        self._stop_eeg()
+        self.alarm_action()
+
+    def get_acquisition_stats(self):
+        """EEG 수집 상태 카운터(처리량, 체크섬 오류, 샘플 간격 등)와 워치독 재연결 정보를 반환합니다."""
+        stats = self.eeg_reader.get_stats('acquisition')
+        stats['outages'] = self.watchdog.outages
+        stats['last_recovery_sec'] = self.watchdog.last_recovery_sec
+        return stats
 
     def start(self):
         """알람 루프 스레드를 시작합니다. EEG 리더는 아직 시작하지 않습니다."""
@@ -87,10 +273,11 @@ class SmartAlarm:
             print("Alarm is already running.")
             return
 
-        # 2. _alarm_loop 스레드만 시작합니다.
+        # 2. 렌더 스레드와 _alarm_loop 스레드만 시작합니다.
+        self.running = True
+        self.display.start()
         self.thread = threading.Thread(target=self._alarm_loop, daemon=True)
         self.thread.start()
-        self.running = True
         print("Smart alarm thread started. Waiting for wake window...")
 
     def stop(self):
@@ -102,12 +289,12 @@ class SmartAlarm:
         self.running = False # 루프 중단 신호
 
         # 3. EEG 리더가 실행 중(running) 상태일 경우에만 중지 및 연결 해제를 시도합니다.
-        if self.eeg_reader and self.eeg_reader.running:
-            self.eeg_reader.stop()
-            self.eeg_reader.disconnect()
+        if self.eeg_reader and (self.eeg_reader.running or self.watchdog.running):
+            self._stop_eeg()
 
         if self.thread and self.thread.is_alive():
             self.thread.join()
+        self.display.stop()
         
         print("Smart alarm system stopped.")
 
@@ -119,60 +306,77 @@ class SmartAlarm:
         """(스레드에서 실행됨) 스마트 알람 메인 로직."""
         # 목표 기상 시간이 되면 무조건 알람 울림
 
+        eeg_started = False # EEG 리더가 시작되었는지 확인하는 플래그
+        if self.preroll_sec > 0:
+            # 윈도우 시작 preroll_sec초 전까지만 대기하고, 이후 EEG를 미리 수집합니다.
+            self._wait_until(self.start_time - datetime.timedelta(seconds=self.preroll_sec))
+            eeg_started = self._preroll()
         self.wait_until_start()
         print('alarm loop started')
-        eeg_started = False # EEG 리더가 시작되었는지 확인하는 플래그
 
         while self.running:
-            loop_start_time = time.monotonic()
-            now_time = datetime.datetime.now(timezone('Asia/Seoul'))
-            self.oled.interface_mode = 'CLOCK'
-            self.oled.update_display()
+            loop_start_time = self.clock.monotonic()
+            now_time = self.clock.now()
+            self.display.publish('CLOCK')
             if now_time > self.wake_time:
-                print(f"[{datetime.datetime.now(timezone('Asia/Seoul')).strftime('%H:%M:%S')}] 목표 기상 시간 도달! 알람을 울립니다.")
-                self.running = False # 알람 울렸으므로 종료
-                self.eeg_reader.disconnect()
-                trigger_alarm()
-                
+                print(f"[{self.clock.now().strftime('%H:%M:%S')}] 목표 기상 시간 도달! 알람을 울립니다.")
+                self._fire_alarm('wake_time')
+                continue # 같은 반복에서 예측으로 알람이 한 번 더 울리지 않도록 합니다.
 
             # 4. 기상 윈도우에 진입했는지 확인
             if is_within_wake_window(now_time, self.start_time, self.wake_window_min):
                 # 5. EEG 리더가 아직 시작되지 않았다면, 여기서 시작합니다.
                 if not eeg_started:
                     #출력은 한국 시간
-                    print(f"[{datetime.datetime.now(timezone('Asia/Seoul')).strftime('%H:%M:%S')}] 기상 윈도우 진입. EEG 데이터 수집을 시작합니다.")
-                    if self.eeg_reader.connect():
-                        self.eeg_reader.start(mode='parsed')
+                    print(f"[{self.clock.now().strftime('%H:%M:%S')}] 기상 윈도우 진입. EEG 데이터 수집을 시작합니다.")
+                    if self._start_eeg():
                         eeg_started = True
                     else:
-                        print("EEG 장치 연결 실패. 30초 후 재시도합니다.")
-                        time.sleep(30)
+                        delay = self.connect_backoff.next()
+                        print(f"EEG 장치 연결 실패. {delay:.1f}초 후 재시도합니다.")
+                        self.clock.sleep(delay)
                         continue # 연결 실패 시 다음 루프로 넘어감
 
                 # 6. EEG 리더가 성공적으로 시작된 후에만 아래 로직을 수행합니다.
                 if eeg_started:
+                    print(f"[{self.clock.now().strftime('%H:%M:%S')}] EEG 수집 상태: "
+                          f"{AcquisitionStats.format(self.eeg_reader.get_stats('alarm-log'))}")
                     if self.eeg_reader.new_feature_ready:
-                        print(f"[{datetime.datetime.now(timezone('Asia/Seoul')).strftime('%H:%M:%S')}]New EEG feature available for prediction.")
+                        meta = self.eeg_reader.epoch_metadata or {}
+                        quality = meta.get('quality') or {}
+                        print(f"[{self.clock.now().strftime('%H:%M:%S')}]New EEG feature available for prediction. "
+                              f"(epoch {meta.get('status', 'ok')}, {meta.get('filled', 0)} samples reconstructed, "
+                              f"{meta.get('discarded', 0)} discarded before it, "
+                              f"quality score {quality.get('score', 0.0):.2f})")
+                        selected = self._select_features()
                         if self.eeg_reader.thirty_signal_quality == 0:
-                            print(f"[{datetime.datetime.now(timezone('Asia/Seoul')).strftime('%H:%M:%S')}] 신호 품질이 좋지 않습니다 ({self.eeg_reader.thirty_signal_quality}%). 다시 시도합니다.")
+                            print(f"[{self.clock.now().strftime('%H:%M:%S')}] 신호 품질이 좋지 않습니다 ({self.eeg_reader.thirty_signal_quality}%). 다시 시도합니다.")
+                        elif selected is None:
+                            print(f"[{self.clock.now().strftime('%H:%M:%S')}] 이번 epoch에는 사용할 수 있는 특징이 없습니다.")
                         else:
-                            feature_vector = np.array(self.eeg_reader.feature)
-                            predicted_stage = self.model.predict(feature_vector.reshape(1,-1))[0]
-                            print(f"[{datetime.datetime.now(timezone('Asia/Seoul')).strftime('%H:%M:%S')}] 현재 수면 단계 예측: {predicted_stage}")
-
-                            if predicted_stage == 1: # 얕은 수면으로 가정
-                                print(f"[{datetime.datetime.now(timezone('Asia/Seoul')).strftime('%H:%M:%S')}] 얕은 수면 감지! 알람을 울립니다.")
-                                self.running = False # 알람 울렸으므로 종료
-                                self.eeg_reader.disconnect()
-                                trigger_alarm()
+                            predicted_stage = self._predict(*selected, meta)
+
+                            artifacts = meta.get('artifacts')
+                            if predicted_stage is None:
+                                pass
+                            elif artifacts and not artifacts['passed']:
+                                # 아티팩트가 표시된(flag) epoch으로는 알람을 울리지 않습니다.
+                                print(f"[{self.clock.now().strftime('%H:%M:%S')}] 아티팩트 epoch ({', '.join(artifacts['reasons'])}): 알람 판단에서 제외합니다.")
+                            elif predicted_stage == 1: # 얕은 수면으로 가정
+                                print(f"[{self.clock.now().strftime('%H:%M:%S')}] 얕은 수면 감지! 알람을 울립니다.")
+                                self._fire_alarm('light_sleep')
+                                self.eeg_reader.new_feature_ready = False
+                                continue # 목표 시간 경로와 같이 30초를 더 기다리지 않고 바로 루프를 끝냅니다.
                         self.eeg_reader.new_feature_ready = False
                     else:
-                        print(f"[{datetime.datetime.now(timezone('Asia/Seoul')).strftime('%H:%M:%S')}] 새로운 EEG 특징이 아직 준비되지 않았습니다. 기다립니다...")
+                        print(f"[{self.clock.now().strftime('%H:%M:%S')}] 새로운 EEG 특징이 아직 준비되지 않았습니다. 기다립니다...")
 
 
-            elapsed_time = time.monotonic() - loop_start_time
+            elapsed_time = self.clock.monotonic() - loop_start_time
             sleep_duration = 30 - elapsed_time
             if sleep_duration > 0:
-                time.sleep(sleep_duration)
+                self.clock.sleep(sleep_duration)
         
+        self.display.stop()
+        print(f"Display: {RenderService.format(self.display.snapshot())}")
         print("Alarm loop finished.")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OLED Frame Diffing
+Skips sending a frame to the panel when it is identical to the last frame sent.
+
+The UI loops redraw far more often than the picture changes (the clock face changes once a
+minute, the new/ main loop renders every 50 ms), and every transfer of a 128x64 frame is 1 KB
+over a 400 kHz I2C bus. A 1-bit frame is only 1 KB, so comparing its bytes with the previous
+frame costs microseconds and, unlike a hash, never mistakes a changed frame for an old one.
+
+Usage:
+    frames = FrameDiffer()
+    ...draw into image...
+    if frames.changed(image):
+        oled.image(image)
+        oled.show()
+"""
+
+
+class FrameDiffer:
+    """Remembers the last frame sent and counts rendered vs transmitted frames."""
+
+    def __init__(self):
+        self.rendered = 0      # frames drawn and offered to the panel
+        self.transmitted = 0   # frames actually sent
+        self._last = None      # bytes of the last frame sent
+
+    def changed(self, image) -> bool:
+        """
+        Count a rendered frame and decide whether it has to be sent.
+
+        Args:
+            image (PIL.Image): The frame just drawn
+
+        Returns:
+            bool: True if it differs from the last frame sent (it is then recorded as sent)
+        """
+        self.rendered += 1
+        data = image.tobytes()
+        if data == self._last:
+            return False
+        self._last = data
+        self.transmitted += 1
+        return True
+
+    def invalidate(self):
+        """Forget the last frame (the panel was cleared or written elsewhere): the next frame is sent."""
+        self._last = None
+
+    @property
+    def skipped(self) -> int:
+        return self.rendered - self.transmitted
+
+    def snapshot(self) -> dict:
+        """rendered, transmitted and skipped frame counts"""
+        return {'rendered': self.rendered, 'transmitted': self.transmitted, 'skipped': self.skipped}
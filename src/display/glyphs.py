@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Glyph Cache
+Pre-rendered 1-bit glyphs for the text the OLED screens draw every frame.
+
+draw.text() with a TrueType font runs FreeType for every character of every frame, and the
+screens call textbbox() first to centre the text, which lays it out a second time. The clock
+screens only ever show the digits, ':' and a few fixed labels (AM/PM, titles), so each of them
+is rasterized once per font into a 1-bit mask with its ink box and advance width. A frame is
+then composed by blitting masks and measured by adding advances.
+
+Text is split into the longest registered word at each position, otherwise single characters.
+Text with a character that is not cached falls back to draw.text() (counted in `misses`).
+Glyphs are placed at the pen positions FreeType would use, so for the hinted DejaVu fonts the
+output matches draw.text() pixel for pixel (scripts/bench_glyph_render.py checks this).
+
+Usage:
+    digits = GlyphFont(ImageFont.truetype(path, 20))
+    left, top, right, bottom = digits.textbbox("12:34")
+    digits.draw_text(draw, (x, 15), "12:34", fill=255)
+"""
+
+from collections import namedtuple
+from PIL import Image, ImageDraw
+
+DIGITS = '0123456789'
+CLOCK_CHARS = DIGITS + ':'
+AMPM = ('AM', 'PM')
+
+Glyph = namedtuple('Glyph', 'mask left top right bottom advance')
+
+
+class GlyphFont:
+    """Cached 1-bit glyphs of one font: single characters plus whole words."""
+
+    def __init__(self, font, chars=CLOCK_CHARS, words=AMPM):
+        """
+        Args:
+            font (ImageFont): Font to rasterize (TrueType or PIL default font)
+            chars (str): Characters to cache one by one
+            words (iterable): Strings to cache as one sprite each (labels, AM/PM)
+        """
+        self.font = font
+        self.glyphs = {}
+        self.words = ()
+        self.hits = 0     # draw_text() calls served from the cache
+        self.misses = 0   # draw_text() calls that fell back to draw.text()
+        for char in chars:
+            self.add(char)
+        for word in words:
+            self.add(word)
+
+    def add(self, token):
+        """Rasterize `token` (a character or a word) into the cache."""
+        if token in self.glyphs:
+            return self.glyphs[token]
+        left, top, right, bottom = self.font.getbbox(token, mode='1')
+        mask = Image.new('1', (max(right - left, 1), max(bottom - top, 1)))
+        ImageDraw.Draw(mask).text((-left, -top), token, font=self.font, fill=255)
+        glyph = Glyph(mask, left, top, right, bottom, self.font.getlength(token, mode='1'))
+        self.glyphs[token] = glyph
+        if len(token) > 1:
+            self.words = tuple(sorted(self.words + (token,), key=len, reverse=True))
+        return glyph
+
+    def layout(self, text):
+        """
+        Split `text` into cached glyphs.
+
+        Returns:
+            list: (pen x, Glyph) pairs, or None if a character is not cached
+        """
+        placed = []
+        pen = 0.0
+        i = 0
+        while i < len(text):
+            token = next((word for word in self.words if text.startswith(word, i)), text[i])
+            glyph = self.glyphs.get(token)
+            if glyph is None:
+                return None
+            placed.append((pen, glyph))
+            pen += glyph.advance
+            i += len(token)
+        return placed
+
+    def textbbox(self, text):
+        """Same as draw.textbbox((0, 0), text, font=font), from the cached glyph boxes."""
+        placed = self.layout(text)
+        if placed is None:
+            return self.font.getbbox(text, mode='1')
+        inked = [(int(pen) + glyph.left, glyph.top, int(pen) + glyph.right, glyph.bottom)
+                 for pen, glyph in placed if glyph.right > glyph.left]
+        if not inked:
+            return (0, 0, 0, 0)
+        return (min(box[0] for box in inked), min(box[1] for box in inked),
+                max(box[2] for box in inked), max(box[3] for box in inked))
+
+    def text_width(self, text):
+        left, _, right, _ = self.textbbox(text)
+        return right - left
+
+    def draw_text(self, draw, xy, text, fill=255):
+        """Blit `text` with its origin at xy, as draw.text(xy, text, font=font, fill=fill) would draw it."""
+        placed = self.layout(text)
+        if placed is None:
+            self.misses += 1
+            draw.text(xy, text, font=self.font, fill=fill)
+            return
+        self.hits += 1
+        x, y = int(xy[0]), int(xy[1])
+        for pen, glyph in placed:
+            if glyph.right > glyph.left:
+                draw.bitmap((x + int(pen) + glyph.left, y + glyph.top), glyph.mask, fill=fill)
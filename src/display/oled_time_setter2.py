@@ -9,21 +9,23 @@ OLED Time Setter System (Refactored)
 import time
 import threading
 import datetime
-import RPi.GPIO as GPIO
-import board
-import busio
-from PIL import Image, ImageDraw, ImageFont
-import adafruit_ssd1306
+from src.hardware.backend import GPIO, init_gpio
+from src.alarm.clock import SystemClock
 from pytz import timezone
+from src.hardware.gpio_input import InputManager, BUTTON_PRESS, ENCODER_STEP
+from src.hardware.quadrature import RotationAccelerator
+from src.display.glyphs import CLOCK_CHARS, DIGITS, AMPM
+from src.display.resources import (get_font, get_glyphs, get_ssd1306, get_panel_state, get_canvas,
+                                   FONT_REGULAR, FONT_BOLD)
 
 TIMEGAP = 60*60*9 # UTC+9 (Seoul)
 
 class OLEDTimeSetter:
-    def __init__(self, wake_time):
-        # GPIO Setup
-        GPIO.cleanup()
-        GPIO.setwarnings(False)
-        GPIO.setmode(GPIO.BCM)
+    def __init__(self, wake_time, clock=None):
+        # 시계 화면의 현재 시각 (기본은 실제 시간, 밤 시뮬레이터는 가상 시계를 넘깁니다)
+        self.clock = clock or SystemClock()
+        # GPIO Setup (cleanup/BCM mode only once per process: a second instance keeps the first's pins)
+        init_gpio()
         
         # Pin definitions
         self.reset_pin = 4
@@ -39,9 +41,6 @@ class OLEDTimeSetter:
         GPIO.setup(self.CLK, GPIO.IN, pull_up_down=GPIO.PUD_UP)
         GPIO.setup(self.DT, GPIO.IN, pull_up_down=GPIO.PUD_UP)
         
-        # Rotary encoder state
-        self.last_clk = GPIO.input(self.CLK)
-        
         # --- State Management (Encapsulated Instance Variables) ---
         # No more global variables. All state is managed within the instance.
         self.wake_window_minutes = 30  # Default wake window
@@ -60,27 +59,26 @@ class OLEDTimeSetter:
         self.last_blink_time = time.time()
         self.blink_state = True
         
-        # Button state tracking
-        self.last_reset_state = GPIO.input(self.reset_pin)
-        self.last_set_state = GPIO.input(self.set_pin)
+        # Button/encoder events (edge callbacks, created when input handling starts)
+        self.inputs = None
+        self.time_accelerator = RotationAccelerator(base_step=5)  # fast spins: 10-30 min per detent
         
-        # OLED Setup
-        self.i2c = busio.I2C(board.SCL, board.SDA)
-        self.oled = adafruit_ssd1306.SSD1306_I2C(128, 64, self.i2c)
-        self.image = Image.new("1", (128, 64))
-        self.draw = ImageDraw.Draw(self.image)
+        # OLED Setup (패널, 캔버스, 폰트는 프로세스 전체에서 공유: src/display/resources.py)
+        self.oled = get_ssd1306(128, 64)
+        self.image, self.draw = get_canvas('oled_time_setter', (128, 64))
+        # 이전 프레임과 같으면 I2C 전송을 건너뛰고, 바뀐 페이지/열 범위만 전송합니다.
+        self.frames, self.panel = get_panel_state(self.oled)
         
         # Load fonts
-        try:
-            self.time_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
-            self.ampm_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 13)
-            self.window_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 18)
-            self.alarmtime_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 10)
-        except IOError:
-            self.time_font = ImageFont.load_default()
-            self.ampm_font = ImageFont.load_default()
-            self.window_font = ImageFont.load_default()
-            self.alarmtime_font = ImageFont.load_default()
+        self.time_font = get_font(FONT_BOLD, 20)
+        self.ampm_font = get_font(FONT_REGULAR, 13)
+        self.window_font = get_font(FONT_BOLD, 18)
+        self.alarmtime_font = get_font(FONT_BOLD, 10)
+        # 매 프레임 그리는 숫자와 문구는 한 번만 래스터화해 두고 블릿합니다.
+        self.time_glyphs = get_glyphs(self.time_font, CLOCK_CHARS, AMPM)
+        self.ampm_glyphs = get_glyphs(self.ampm_font, CLOCK_CHARS, AMPM + ("Wake Window", "m before"))
+        self.window_glyphs = get_glyphs(self.window_font, DIGITS, (" mins",))
+        self.alarmtime_glyphs = get_glyphs(self.alarmtime_font, CLOCK_CHARS, AMPM)
         
         # System state
         self.running = True
@@ -134,20 +132,20 @@ class OLEDTimeSetter:
         elif self.interface_mode == 'CLOCK':
             self.draw_clock_interface()
         
-        self.oled.image(self.image)
-        self.oled.show()
+        if self.frames.changed(self.image):
+            self.panel.show(self.image)
     
     def draw_window_interface(self):
         """Draw the wake window selection interface"""
         title = "Wake Window"
-        title_bbox = self.draw.textbbox((0, 0), title, font=self.ampm_font)
+        title_bbox = self.ampm_glyphs.textbbox(title)
         title_x = (128 - (title_bbox[2] - title_bbox[0])) // 2
-        self.draw.text((title_x, 5), title, font=self.ampm_font, fill=255)
+        self.ampm_glyphs.draw_text(self.draw, (title_x, 5), title, fill=255)
         
         window_text = f"{self.wake_window_minutes} mins"
-        window_bbox = self.draw.textbbox((0, 0), window_text, font=self.window_font)
+        window_bbox = self.window_glyphs.textbbox(window_text)
         window_x = (128 - (window_bbox[2] - window_bbox[0])) // 2
-        self.draw.text((window_x, 25), window_text, font=self.window_font, fill=255)
+        self.window_glyphs.draw_text(self.draw, (window_x, 25), window_text, fill=255)
     
     def draw_time_interface(self):
         """Draw the time setting interface with blinking"""
@@ -160,22 +158,22 @@ class OLEDTimeSetter:
         time_text = f"{display_hour:02d}:{self.set_minute:02d}"
         ampm_text = "PM" if self.set_is_pm else "AM"
         
-        bbox = self.draw.textbbox((0, 0), time_text, font=self.time_font)
+        bbox = self.time_glyphs.textbbox(time_text)
         time_x = (128 - (bbox[2] - bbox[0])) // 2
-        self.draw.text((time_x, 15), time_text, font=self.time_font, fill=255)
+        self.time_glyphs.draw_text(self.draw, (time_x, 15), time_text, fill=255)
         
-        ampm_bbox = self.draw.textbbox((0, 0), ampm_text, font=self.ampm_font)
+        ampm_bbox = self.ampm_glyphs.textbbox(ampm_text)
         ampm_x = (128 - (ampm_bbox[2] - ampm_bbox[0])) // 2
-        self.draw.text((ampm_x, 40), ampm_text, font=self.ampm_font, fill=255)
+        self.ampm_glyphs.draw_text(self.draw, (ampm_x, 40), ampm_text, fill=255)
         
         window_info = f"{self.wake_window_minutes}m before"
-        window_bbox = self.draw.textbbox((0, 0), window_info, font=self.ampm_font)
+        window_bbox = self.ampm_glyphs.textbbox(window_info)
         window_x = (128 - (window_bbox[2] - window_bbox[0])) // 2
-        self.draw.text((window_x, 50), window_info, font=self.ampm_font, fill=255)
+        self.ampm_glyphs.draw_text(self.draw, (window_x, 50), window_info, fill=255)
     
     def draw_clock_interface(self):
         """Draw the clock interface showing current time and alarm time"""
-        now = datetime.datetime.now(timezone('Asia/Seoul'))  # KST
+        now = self.clock.now()  # KST
         current_hour = now.hour
         
         display_current_hour = current_hour
@@ -185,13 +183,13 @@ class OLEDTimeSetter:
         current_ampm = "PM" if current_hour >= 12 else "AM"
         current_time_text = f"{display_current_hour:02d}:{now.minute:02d}"
         
-        bbox = self.draw.textbbox((0, 0), current_time_text, font=self.time_font)
+        bbox = self.time_glyphs.textbbox(current_time_text)
         time_x = (128 - (bbox[2] - bbox[0])) // 2
-        self.draw.text((time_x, 15), current_time_text, font=self.time_font, fill=255)
+        self.time_glyphs.draw_text(self.draw, (time_x, 15), current_time_text, fill=255)
         
-        ampm_bbox = self.draw.textbbox((0, 0), current_ampm, font=self.ampm_font)
+        ampm_bbox = self.ampm_glyphs.textbbox(current_ampm)
         ampm_x = (128 - (ampm_bbox[2] - ampm_bbox[0])) // 2
-        self.draw.text((ampm_x, 40), current_ampm, font=self.ampm_font, fill=255)
+        self.ampm_glyphs.draw_text(self.draw, (ampm_x, 40), current_ampm, fill=255)
         
         # alarm_dt = datetime.datetime.fromtimestamp(self.settime + TIMEGAP)
         # alarm_hour = alarm_dt.hour
@@ -199,10 +197,10 @@ class OLEDTimeSetter:
         # display_alarm_hour = alarm_hour
 
         alarm_text = f"{self.wake_time.hour:02d}:{self.wake_time.minute:02d}"
-        alarm_bbox = self.draw.textbbox((0, 0), alarm_text, font=self.ampm_font)
+        alarm_bbox = self.ampm_glyphs.textbbox(alarm_text)
         alarm_x = 128 - (alarm_bbox[2] - alarm_bbox[0]) - 2
         
-        self.draw.text((alarm_x, 48), alarm_text, font=self.alarmtime_font, fill=255)
+        self.alarmtime_glyphs.draw_text(self.draw, (alarm_x, 48), alarm_text, fill=255)
 
     def adjust_window(self, increment):
         """Adjust wake window by increment"""
@@ -254,47 +252,44 @@ class OLEDTimeSetter:
         print("✅ Smart alarm fully configured!")
         print(f"✅ Monitoring will start {self.wake_window_minutes} minutes before wake time")
 
+    def start_inputs(self):
+        """Register the buttons and the encoder with the edge-callback input layer (idempotent)."""
+        if self.inputs is None:
+            self.inputs = InputManager()
+            self.inputs.add_button('reset', self.reset_pin)
+            self.inputs.add_button('set', self.set_pin)
+            self.inputs.add_encoder('knob', self.CLK, self.DT)
+        return self.inputs
+
+    def handle_input_event(self, event):
+        """Apply one button/encoder event to the interface state"""
+        if event.kind == BUTTON_PRESS and event.name == 'reset':
+            self.reset_to_window_selection()
+        elif event.kind == BUTTON_PRESS and event.name == 'set':
+            if self.interface_mode == 'WINDOW': self.confirm_window()
+            elif self.interface_mode == 'TIME': self.confirm_time()
+        elif event.kind == ENCODER_STEP:
+            if self.interface_mode == 'WINDOW':
+                self.adjust_window(5 * event.value)
+            elif self.interface_mode == 'TIME':
+                self.add_minutes(self.time_accelerator.step(event.value, event.timestamp))
+
     def handle_gpio(self):
-        """Handle GPIO inputs in a separate thread"""
+        """Handle GPIO input events in a separate thread (blocks on the event queue, no polling)"""
+        inputs = self.start_inputs()
         while self.running:
+            event = inputs.get(timeout=0.5)  # running 플래그 확인을 위한 타임아웃
+            if event is None:
+                continue
             try:
-                reset_state = GPIO.input(self.reset_pin)
-                if self.last_reset_state == 1 and reset_state == 0:
-                    print("dd")
-                    self.reset_to_window_selection()
-                self.last_reset_state = reset_state
-                
-                set_state = GPIO.input(self.set_pin)
-                if self.last_set_state == 1 and set_state == 0:
-                    if self.interface_mode == 'WINDOW': self.confirm_window()
-                    elif self.interface_mode == 'TIME': self.confirm_time()
-                self.last_set_state = set_state
-                
-                clk_state = GPIO.input(self.CLK)
-                if self.last_clk == 0 and clk_state == 1:
-                    dt_state = GPIO.input(self.DT)
-                    if self.interface_mode == 'WINDOW':
-                        self.adjust_window(5 if dt_state == 0 else -5)
-                    elif self.interface_mode == 'TIME':
-                        self.add_minutes(5 if dt_state == 0 else -5)
-                self.last_clk = clk_state
-                
-                time.sleep(0.001)
+                self.handle_input_event(event)
             except Exception as e:
                 print(f"GPIO error: {e}")
-                time.sleep(0.01)
+
     def handle_gpioreset(self):
-        """Handle GPIO reset button in a separate thread"""
-        try:
-            reset_state = GPIO.input(self.reset_pin)
-            if self.last_reset_state == 1 and reset_state == 0:
-                return 1
-            self.last_reset_state = reset_state
-            
-            time.sleep(0.001)
-        except Exception as e:
-            print(f"GPIO error: {e}")
-            time.sleep(0.01)
+        """Return 1 if the reset button was pressed since the last call (non-blocking, other queued events are discarded)"""
+        if self.start_inputs().wait_for('reset', BUTTON_PRESS, timeout=0):
+            return 1
     
     def run(self):
         """Main execution loop"""
@@ -318,9 +313,17 @@ class OLEDTimeSetter:
     def cleanup(self):
         """Clean up resources"""
         self.running = False
+        if self.inputs is not None:
+            self.inputs.close()
+            self.inputs = None
         self.draw.rectangle((0, 0, 128, 64), outline=0, fill=0)
-        self.oled.image(self.image)
-        self.oled.show()
+        self.panel.show(self.image)
+        self.frames.invalidate()
+        stats = self.frames.snapshot()
+        print(f"Display frames: {stats['rendered']} rendered, {stats['transmitted']} sent, {stats['skipped']} skipped")
+        bus = self.panel.snapshot()
+        print(f"Display bus: {bus['bus_bytes']} bytes ({bus['full_frame_bytes']} as full frames), "
+              f"{bus['partial_frames']} partial / {bus['full_frames']} full updates")
         print("Cleanup completed")
 
 def main():
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SSD1306 Partial Updates
+Sends only the changed part of a frame to the panel instead of the whole 1 KB framebuffer.
+
+The new frame is packed into the controller's RAM layout (8-pixel-high pages x 128 columns, see
+src/hardware/ssd1306.py) and compared with the last frame sent. Every page with a change gives a
+column span. Neighbouring spans are merged into one rectangle when one column/page address window
+costs fewer bus bytes than two. Each rectangle is then sent as SET_COL_ADDR + SET_PAGE_ADDR and
+its data bytes. When the rectangles would cost as much as a full frame, the whole frame is sent
+the driver's usual way.
+
+Bus costs follow the two drivers in use:
+  adafruit_ssd1306   one I2C write per command byte (address, 0x80, command), then one data
+                     write (address, 0x40, data)
+  luma.oled          the commands in one write (address, 0x00, commands), data in 32-byte blocks
+                     (address, 0x40, block)
+
+Usage:
+    panel = PartialUpdater(oled)      # adafruit SSD1306_I2C or a luma device
+    panel.show(image)                 # full frame the first time, changed rectangles afterwards
+"""
+
+from src.hardware.ssd1306 import pack_pages, SET_COL_ADDR, SET_PAGE_ADDR, DATA_PREFIX
+
+_WINDOW_COMMANDS = 6   # SET_COL_ADDR, start, end, SET_PAGE_ADDR, start, end
+
+
+class _AdafruitBus:
+    """adafruit_ssd1306.SSD1306_I2C"""
+
+    def __init__(self, oled):
+        self.oled = oled
+
+    @staticmethod
+    def cost(n):
+        return _WINDOW_COMMANDS * 3 + 2 + n
+
+    def send_window(self, page_start, page_end, col_start, col_end, data):
+        for cmd in (SET_COL_ADDR, col_start, col_end, SET_PAGE_ADDR, page_start, page_end):
+            self.oled.write_cmd(cmd)
+        with self.oled.i2c_device:
+            self.oled.i2c_device.write(bytes([DATA_PREFIX]) + data)
+
+    def send_frame(self, image):
+        self.oled.image(image)
+        self.oled.show()
+
+
+class _LumaBus:
+    """luma.oled ssd1306 device on luma.core's I2C interface"""
+    BLOCK = 32
+
+    def __init__(self, device):
+        self.device = device
+
+    @classmethod
+    def cost(cls, n):
+        return 2 + _WINDOW_COMMANDS + n + 2 * -(-n // cls.BLOCK)
+
+    def send_window(self, page_start, page_end, col_start, col_end, data):
+        self.device.command(SET_COL_ADDR, col_start, col_end, SET_PAGE_ADDR, page_start, page_end)
+        self.device.data(list(data))
+
+    def send_frame(self, image):
+        self.device.display(image)
+
+
+def _window_cost(window, cost):
+    page_start, page_end, col_start, col_end = window
+    return cost((page_end - page_start + 1) * (col_end - col_start + 1))
+
+
+def dirty_windows(previous, current, cost):
+    """
+    Rectangles covering every changed byte between two frames in display RAM layout.
+
+    Args:
+        previous, current (np.ndarray): (pages, width) uint8 frames from pack_pages()
+        cost (callable): Bus bytes of one window with n data bytes
+
+    Returns:
+        list: (page_start, page_end, col_start, col_end) tuples, inclusive, in page order
+    """
+    changed = previous != current
+    windows = []
+    for page in changed.any(axis=1).nonzero()[0]:
+        columns = changed[page].nonzero()[0]
+        window = (int(page), int(page), int(columns[0]), int(columns[-1]))
+        if windows:
+            last = windows[-1]
+            merged = (last[0], window[1], min(last[2], window[2]), max(last[3], window[3]))
+            if _window_cost(merged, cost) <= _window_cost(last, cost) + _window_cost(window, cost):
+                windows[-1] = merged
+                continue
+        windows.append(window)
+    return windows
+
+
+class PartialUpdater:
+    """Keeps the last frame sent to an SSD1306 and sends only the rectangles that changed."""
+
+    def __init__(self, device):
+        """
+        Args:
+            device: adafruit_ssd1306.SSD1306_I2C, a luma.oled device, or their fakes
+        """
+        self.bus = _AdafruitBus(device) if hasattr(device, 'write_cmd') else _LumaBus(device)
+        self._pages = None          # last frame sent, in display RAM layout
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.windows = 0
+        self.bus_bytes = 0          # estimated bytes on the I2C bus
+        self.full_frame_bytes = 0   # what the same frames would have cost as full frames
+
+    def show(self, image):
+        """
+        Send the changes between `image` and the last frame sent.
+
+        Returns:
+            int: Estimated bytes on the bus (0 if nothing changed)
+        """
+        pages = pack_pages(image)
+        full_cost = self.bus.cost(pages.size)
+        if self._pages is None or self._pages.shape != pages.shape:
+            windows = None
+        else:
+            windows = dirty_windows(self._pages, pages, self.bus.cost)
+            if not windows:
+                return 0
+        sent = full_cost if windows is None else sum(_window_cost(w, self.bus.cost) for w in windows)
+        if sent >= full_cost:
+            sent = full_cost
+            self.bus.send_frame(image)
+            self.full_frames += 1
+        else:
+            for page_start, page_end, col_start, col_end in windows:
+                data = pages[page_start:page_end + 1, col_start:col_end + 1].tobytes()
+                self.bus.send_window(page_start, page_end, col_start, col_end, data)
+            self.partial_frames += 1
+            self.windows += len(windows)
+        self._pages = pages
+        self.bus_bytes += sent
+        self.full_frame_bytes += full_cost
+        return sent
+
+    def invalidate(self):
+        """The panel was written elsewhere (e.g. the driver's own show()): send the next frame whole."""
+        self._pages = None
+
+    def snapshot(self) -> dict:
+        """Frame and bus byte counters"""
+        return {'full_frames': self.full_frames, 'partial_frames': self.partial_frames,
+                'windows': self.windows, 'bus_bytes': self.bus_bytes,
+                'full_frame_bytes': self.full_frame_bytes}
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Render Service
+Draws the display on its own thread, at most once per frame interval.
+
+Callers publish the state to show and return immediately: a slow I2C transfer no longer holds up
+the alarm logic or the input loop, and a burst of encoder events between two frames is coalesced
+into one redraw of the latest state. With refresh_sec the last state is redrawn periodically even
+without new publishes, so a clock face keeps up with the time while its caller sleeps (the frame
+diff in the display layer drops redraws that change nothing).
+
+Given a clock with add_ticker() (the night simulator's VirtualClock), frames are drawn on that
+clock's ticks instead, synchronously on the thread that advances it, with fps and refresh_sec
+counted in the clock's seconds. A real-time render thread would otherwise race a clock running
+thousands of times faster, and its frame counts would mean nothing.
+
+Usage:
+    display = RenderService(lambda state: renderer.render(oled, state), fps=10, refresh_sec=1.0)
+    display.start()
+    display.publish(state)       # returns at once; drawn on the render thread
+    display.stop()
+"""
+
+import time
+import threading
+from collections import deque
+import numpy as np
+
+
+class RenderService:
+    """Rate-capped render thread: publish() stores the latest state, the thread draws it."""
+
+    def __init__(self, render, fps=10.0, refresh_sec=None, name='render', history=500, clock=None):
+        """
+        Args:
+            render (callable): Called with the published state on the render thread; draws and sends one frame
+            fps (float): Maximum frames per second
+            refresh_sec (float): Redraw the last state after this many idle seconds (None: only on publish)
+            history (int): Frame times kept for the percentiles
+            clock: Draw on this clock's ticks (clock.add_ticker) instead of a render thread
+        """
+        self.render = render
+        self.interval = 1.0 / fps
+        self.refresh_sec = refresh_sec
+        self.name = name
+        self.published = 0     # publish() calls
+        self.rendered = 0      # frames drawn
+        self.coalesced = 0     # publishes replaced by a newer one before they were drawn
+        self.refreshes = 0     # frames drawn by refresh_sec without a publish
+        self.overruns = 0      # frames that took longer than the frame interval
+        self.errors = 0
+        self.frame_times = deque(maxlen=history)
+        self._state = None
+        self._has_state = False
+        self._pending = False
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.clock = clock
+        self._next_frame = None   # clock 모드: 다음 프레임을 그릴 수 있는 시각
+        self._last_frame = None
+
+    def publish(self, state=None):
+        """Set the state to draw next. Never blocks on rendering."""
+        with self._cond:
+            self.published += 1
+            if self._pending:
+                self.coalesced += 1
+            self._state = state
+            self._has_state = True
+            self._pending = True
+            self._cond.notify()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        if self.clock is not None:
+            self.clock.add_ticker(self._on_tick)
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, flush=True):
+        """Stop the render thread; with flush, the last published state is drawn first."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify()
+        if self.clock is not None:
+            self.clock.remove_ticker(self._on_tick)
+        elif self._thread is not threading.current_thread():
+            self._thread.join()
+        if flush and self._pending:
+            self._draw(self._take())
+
+    def _take(self):
+        with self._cond:
+            self._pending = False
+            return self._state
+
+    def _run(self):
+        next_frame = time.monotonic()
+        while True:
+            with self._cond:
+                # 새 상태가 올 때까지 (또는 refresh_sec 동안) 기다립니다.
+                while self._running and not self._pending:
+                    if not self._cond.wait(self.refresh_sec) and self._has_state and self.refresh_sec:
+                        break
+                if not self._running:
+                    return
+                refresh = not self._pending
+                # 프레임 간격이 지나기 전이면 기다리는 동안 들어온 publish를 한 프레임으로 합칩니다.
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    self._cond.wait_for(lambda: not self._running, delay)
+                    if not self._running:
+                        return
+                state = self._state
+                self._pending = False
+            if refresh:
+                self.refreshes += 1
+            started = time.monotonic()
+            self._draw(state)
+            next_frame = started + self.interval
+
+    def _on_tick(self, now):
+        """(clock ticker) Draw the pending state, or refresh the last one, once a frame interval has passed."""
+        if self._next_frame is not None and now < self._next_frame:
+            return
+        with self._cond:
+            if not self._pending:
+                if not (self._has_state and self.refresh_sec and
+                        (self._last_frame is None or now - self._last_frame >= self.refresh_sec)):
+                    return
+                self.refreshes += 1
+            state = self._state
+            self._pending = False
+        self._draw(state)
+        self._last_frame = now
+        self._next_frame = now + self.interval
+
+    def _draw(self, state):
+        started = time.perf_counter()
+        try:
+            self.render(state)
+        except Exception as e:
+            self.errors += 1
+            print(f"Render error: {e}")
+        elapsed = time.perf_counter() - started
+        self.rendered += 1
+        self.frame_times.append(elapsed)
+        if elapsed > self.interval:
+            self.overruns += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: published, rendered, coalesced (skipped) and refresh counts, overruns, and
+                  frame time p50/p95/max in ms over the recent frames
+        """
+        times = np.array(self.frame_times) * 1000 if self.frame_times else np.zeros(1)
+        return {'published': self.published, 'rendered': self.rendered, 'coalesced': self.coalesced,
+                'refreshes': self.refreshes, 'overruns': self.overruns, 'errors': self.errors,
+                'frame_ms_p50': float(np.percentile(times, 50)),
+                'frame_ms_p95': float(np.percentile(times, 95)),
+                'frame_ms_max': float(times.max())}
+
+    @staticmethod
+    def format(snap) -> str:
+        return (f"{snap['rendered']} frames for {snap['published']} publishes "
+                f"({snap['coalesced']} coalesced, {snap['refreshes']} refreshes, {snap['overruns']} over budget), "
+                f"frame time p50 {snap['frame_ms_p50']:.2f} ms, p95 {snap['frame_ms_p95']:.2f} ms, "
+                f"max {snap['frame_ms_max']:.2f} ms")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Display Resources
+Process-wide cache of the things every display class needs once: TrueType fonts, glyph caches,
+display handles (one I2C init per panel), the per-panel frame diff / partial update state, and
+preallocated Image/ImageDraw canvases.
+
+program.py builds one OLEDTimeSetter to take the settings and a second one for the alarm; both
+now share the same fonts, glyphs, panel and canvas instead of loading and initialising their own.
+The frame diff and partial update state belong to the panel, not to the object drawing on it, so
+whichever object draws next still knows what the panel is showing.
+
+A canvas is shared by everything that asks for the same name: only one object may draw into it at
+a time (the UI objects take turns; they never render concurrently).
+"""
+
+import threading
+from PIL import Image, ImageDraw, ImageFont
+from src.hardware.backend import create_ssd1306, create_luma_device
+from src.display.glyphs import GlyphFont
+from src.display.frame_diff import FrameDiffer
+from src.display.partial_update import PartialUpdater
+
+FONT_DIR = "/usr/share/fonts/truetype/dejavu"
+FONT_REGULAR = f"{FONT_DIR}/DejaVuSans.ttf"
+FONT_BOLD = f"{FONT_DIR}/DejaVuSans-Bold.ttf"
+
+_lock = threading.RLock()
+_fonts = {}       # (path, size) -> font
+_glyphs = {}      # (font, chars, words) -> GlyphFont
+_displays = {}    # ('ssd1306', width, height) / ('luma', port, address) -> device
+_panels = {}      # device -> (FrameDiffer, PartialUpdater)
+_canvases = {}    # (name, mode, size) -> (Image, ImageDraw)
+
+
+def get_font(path, size):
+    """TrueType font, loaded once per (path, size); PIL's default font if the file is missing."""
+    key = (path, size)
+    with _lock:
+        font = _fonts.get(key)
+        if font is None:
+            try:
+                font = ImageFont.truetype(path, size)
+            except IOError:
+                print(f"Font not found: {path}, using the default font")
+                font = ImageFont.load_default()
+            _fonts[key] = font
+        return font
+
+
+def get_glyphs(font, chars, words=()):
+    """GlyphFont of `font`, rasterized once per (font, chars, words)."""
+    key = (font, chars, tuple(words))
+    with _lock:
+        glyphs = _glyphs.get(key)
+        if glyphs is None:
+            glyphs = _glyphs[key] = GlyphFont(font, chars, words)
+        return glyphs
+
+
+def get_ssd1306(width=128, height=64):
+    """The adafruit_ssd1306 panel (the I2C bus and panel are initialised on the first call only)."""
+    key = ('ssd1306', width, height)
+    with _lock:
+        if key not in _displays:
+            _displays[key] = create_ssd1306(width, height)
+        return _displays[key]
+
+
+def get_luma_device(port=1, address=0x3C):
+    """The luma.oled device at `port`/`address`, created on the first call only."""
+    key = ('luma', port, address)
+    with _lock:
+        if key not in _displays:
+            _displays[key] = create_luma_device(port=port, address=address)
+        return _displays[key]
+
+
+def get_panel_state(device):
+    """
+    The frame diff and partial update state of a display handle, shared by every object drawing on it.
+
+    Returns:
+        tuple: (FrameDiffer, PartialUpdater)
+    """
+    with _lock:
+        state = _panels.get(device)
+        if state is None:
+            state = _panels[device] = (FrameDiffer(), PartialUpdater(device))
+        return state
+
+
+def get_canvas(name, size=(128, 64), mode='1'):
+    """
+    A preallocated image and its ImageDraw, shared by everything asking for the same name.
+
+    Returns:
+        tuple: (Image, ImageDraw)
+    """
+    key = (name, mode, tuple(size))
+    with _lock:
+        canvas = _canvases.get(key)
+        if canvas is None:
+            image = Image.new(mode, tuple(size))
+            canvas = _canvases[key] = (image, ImageDraw.Draw(image))
+        return canvas
+
+
+def stats():
+    """Number of cached fonts, glyph caches, displays and canvases."""
+    with _lock:
+        return {'fonts': len(_fonts), 'glyphs': len(_glyphs), 'displays': len(_displays),
+                'canvases': len(_canvases)}
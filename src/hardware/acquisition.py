@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Multi-Headset EEG Acquisition
+Reads several ThinkGear headsets (/dev/rfcomm0..N) from one process.
+
+All serial ports are multiplexed through a single selectors loop thread. Each device has its
+own parser, raw-sample ring buffer and feature queue, and completed epochs are sent to one
+shared process pool (sized to the CPU count) for feature extraction. A port that fails to open
+or errors while reading leaves the loop and is reopened on its own backoff schedule.
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..'
+))
+sys.path.insert(0, PROJECT_ROOT)
+import time
+import queue
+import selectors
+import threading
+import multiprocessing as mp
+import numpy as np
+import serial
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, List
+from src.processing.feature_extract import exfeature
+from src.hardware.thinkgear import ThinkGearParser, ParserType, CODE_RAW_SIGNAL, CODE_POOR_SIGNAL
+from src.hardware.eeg import thirty_quality
+from src.hardware.stats import AcquisitionStats
+from src.hardware.watchdog import Backoff
+from src.processing.artifact_gate import check_epoch
+
+
+class SampleRing:
+    """Fixed-size ring buffer of raw samples backed by a preallocated numpy array."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.index = 0      # next write position
+        self.total = 0      # samples written since creation
+
+    def append(self, value: float):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.total += 1
+
+    def latest(self, n: int) -> np.ndarray:
+        """Return a copy of the most recent n samples in chronological order."""
+        n = min(n, self.capacity, self.total)
+        start = (self.index - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.data[start:start + n].copy()
+        return np.concatenate((self.data[start:], self.data[:self.index]))
+
+
+class DeviceStream:
+    """Per-headset state: serial port, parser, ring buffer, feature queue and counters."""
+
+    def __init__(self, name: str, port: str, baudrate: int = 57600, fs: int = 512,
+                 epoch_duration: int = 30, feature_queue_size: int = 8):
+        self.name = name
+        self.port = port
+        self.baudrate = baudrate
+        self.fs = fs
+        self.epoch_samples = fs * epoch_duration
+        self.serial_conn: Optional[serial.Serial] = None
+        self.parser = ThinkGearParser(ParserType.PACKETS, self._handle_data_value)
+        # Two epochs of history so a late reader can still take a full window.
+        self.ring = SampleRing(2 * self.epoch_samples)
+        self.quality_checker = thirty_quality()
+        self.signal_good: Optional[bool] = None
+        self.feature_queue: "queue.Queue" = queue.Queue(maxsize=feature_queue_size)
+        self.on_epoch = None  # set by AcquisitionManager
+        self._samples_in_epoch = 0
+
+        # Counters (read by AcquisitionManager.stats())
+        self.stats = AcquisitionStats(self.parser)
+        self.stats.watch_queue('features', self.feature_queue.qsize)
+        self.epochs = 0
+        self.epochs_dropped = 0     # pool backlog too deep, epoch not extracted
+        self.epochs_artifact = 0    # failed the artifact gate, not extracted
+        self.features_dropped = 0   # feature queue full, oldest result discarded
+        self.read_errors = 0
+        self.pending = 0            # epochs submitted but not finished
+        self.error: Optional[Exception] = None
+
+        # Reconnect state (driven by AcquisitionManager's loop)
+        self.backoff = Backoff()
+        self.retry_at: Optional[float] = None        # monotonic time of the next reopen attempt
+        self.reconnects = 0
+        self._bytes_at_reconnect: Optional[int] = None    # stats.bytes when the port was reopened
+
+    def connect(self) -> bool:
+        try:
+            self.serial_conn = serial.Serial(
+                port=self.port,
+                baudrate=self.baudrate,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                timeout=0
+            )
+            print(f"[{self.name}] Connected to {self.port} at {self.baudrate} baud")
+            return True
+        except serial.SerialException as e:
+            print(f"[{self.name}] Failed to connect to {self.port}: {e}")
+            self.error = e
+            return False
+
+    def disconnect(self):
+        if self.serial_conn and self.serial_conn.is_open:
+            try:
+                self.serial_conn.close()
+            except (serial.SerialException, OSError) as e:
+                print(f"[{self.name}] Error while closing {self.port}: {e}")
+
+    def fileno(self) -> int:
+        return self.serial_conn.fileno()
+
+    def restart_stream(self):
+        """Drop the packet and epoch in progress; the samples before the outage do not join the new ones."""
+        self.parser.reset()
+        self._samples_in_epoch = 0
+
+    def read_available(self):
+        """Read everything the port has buffered and feed it to the parser (called by the selector loop)."""
+        data = self.serial_conn.read(self.serial_conn.in_waiting or 1)
+        if data:
+            self.parser.parse_chunk(data)
+            self.stats.record_chunk(len(data), time.monotonic())
+
+    def _handle_data_value(self, extended_code_level: int, code: int, num_bytes: int, value):
+        if code == CODE_RAW_SIGNAL:
+            if not isinstance(value, int):
+                # 2바이트가 아닌 raw 값 (memoryview) - 샘플로 쓰지 않습니다.
+                self.stats.malformed_raw += 1
+                return
+            raw_val = value
+            if raw_val > 32768:
+                raw_val -= 65536
+            self.ring.append(raw_val)
+            self.stats.raw_samples += 1
+            self._samples_in_epoch += 1
+            if self._samples_in_epoch == self.epoch_samples:
+                self._samples_in_epoch = 0
+                self.on_epoch(self, self.ring.latest(self.epoch_samples))
+        elif code == CODE_POOR_SIGNAL:
+            if self.quality_checker.add_and_check(value):
+                self.signal_good = self.quality_checker.is_good
+
+    def put_features(self, result: dict):
+        """Queue an extraction result, discarding the oldest one if the consumer is behind."""
+        try:
+            self.feature_queue.put_nowait(result)
+        except queue.Full:
+            try:
+                self.feature_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.features_dropped += 1
+            self.feature_queue.put_nowait(result)
+
+
+class AcquisitionManager:
+    """
+    Opens N ThinkGear ports and multiplexes them through one selector loop.
+
+    Usage:
+        manager = AcquisitionManager(['/dev/rfcomm0', '/dev/rfcomm1'])
+        manager.open_all()
+        manager.start()
+        result = manager.devices['rfcomm0'].feature_queue.get()
+    """
+
+    def __init__(self, ports: List[str], baudrate: int = 57600, fs: int = 512,
+                 epoch_duration: int = 30, workers: Optional[int] = None,
+                 max_pending_per_device: int = 2):
+        """
+        Args:
+            ports: Serial ports, one per headset
+            workers: Extraction processes (default: os.cpu_count())
+            max_pending_per_device: Epochs a device may have in the pool before new ones are dropped
+        """
+        self.devices: Dict[str, DeviceStream] = {}
+        for port in ports:
+            name = os.path.basename(port)
+            device = DeviceStream(name, port, baudrate, fs, epoch_duration)
+            device.on_epoch = self._submit_epoch
+            self.devices[name] = device
+        self.fs = fs
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending_per_device
+        self.selector = selectors.DefaultSelector()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+        self._lock = threading.Lock()
+
+    def open_all(self) -> int:
+        """
+        Connect every device and register it with the selector
+
+        Returns:
+            int: Number of devices connected
+        """
+        opened = 0
+        for device in self.devices.values():
+            if device.connect():
+                self.selector.register(device.fileno(), selectors.EVENT_READ, device)
+                opened += 1
+            else:
+                self._schedule_reconnect(device)
+        return opened
+
+    def start(self):
+        """Start the extraction pool and the selector loop thread."""
+        if self.running:
+            print("Acquisition is already running.")
+            return
+        # 셀렉터 스레드가 도는 프로세스를 fork하지 않습니다 (extraction_worker와 같은 이유).
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context('spawn'))
+        self.running = True
+        self.thread = threading.Thread(target=self._select_loop, daemon=True)
+        self.thread.start()
+        print(f"Acquisition started: {len(self.selector.get_map())} device(s), {self.workers} extraction worker(s)")
+
+    def stop(self):
+        """Stop the loop, close every port and shut the pool down."""
+        if not self.running:
+            return
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        for device in self.devices.values():
+            device.disconnect()
+        self.selector.close()
+        self.pool.shutdown(wait=False)
+        print("Acquisition stopped.")
+
+    def _select_loop(self):
+        """(스레드에서 실행됨) 모든 포트를 하나의 selector로 감시하며 읽을 수 있는 포트만 처리합니다."""
+        while self.running:
+            self._reconnect_due()
+            if not self.selector.get_map():
+                time.sleep(0.5)
+                continue
+            for key, _ in self.selector.select(timeout=0.5):
+                device = key.data
+                try:
+                    device.read_available()
+                except (serial.SerialException, OSError) as e:
+                    self._remove_device(key.fd, device, e)
+
+    def _remove_device(self, fd: int, device: DeviceStream, error: Exception):
+        """Take a failed port out of the loop and schedule its reopen."""
+        print(f"[{device.name}] Read error, removing from loop: {error}")
+        device.read_errors += 1
+        device.error = error
+        self.selector.unregister(fd)
+        device.disconnect()
+        self._schedule_reconnect(device)
+
+    def _schedule_reconnect(self, device: DeviceStream):
+        delay = device.backoff.next()
+        device.retry_at = time.monotonic() + delay
+        print(f"[{device.name}] Reopening {device.port} in {delay:.1f}s")
+
+    def _reconnect_due(self):
+        """
+        (셀렉터 스레드에서 호출됨) 재시도 시각이 지난 포트를 다시 열어 루프에 등록합니다.
+
+        As in SerialWatchdog, the backoff is only reset once a reopened port has delivered bytes,
+        so a port that opens but stays silent or fails again keeps backing off.
+        """
+        now = time.monotonic()
+        for device in self.devices.values():
+            if device.retry_at is None:
+                if device._bytes_at_reconnect is not None and device.stats.bytes > device._bytes_at_reconnect:
+                    device._bytes_at_reconnect = None
+                    device.backoff.reset()
+                continue
+            if now < device.retry_at:
+                continue
+            if device.connect():
+                device.restart_stream()
+                self.selector.register(device.fileno(), selectors.EVENT_READ, device)
+                device.retry_at = None
+                device.reconnects += 1
+                device._bytes_at_reconnect = device.stats.bytes
+            else:
+                self._schedule_reconnect(device)
+
+    def _submit_epoch(self, device: DeviceStream, data: np.ndarray):
+        """Send a completed epoch to the shared pool unless the device already has a backlog."""
+        device.epochs += 1
+        quality = device.quality_checker.close_epoch()
+        epoch_index = device.epochs
+        signal_good = device.signal_good
+        # 아티팩트 epoch은 풀에 보내지 않고 바로 결과로 돌려줍니다.
+        artifacts = check_epoch(data, self.fs)
+        if not artifacts['passed']:
+            device.epochs_artifact += 1
+            device.put_features({
+                'device': device.name, 'epoch': epoch_index, 'features': None, 'error': None,
+                'signal_good': signal_good, 'quality': quality, 'artifacts': artifacts, 'latency': 0.0,
+            })
+            return
+        with self._lock:
+            if device.pending >= self.max_pending:
+                device.epochs_dropped += 1
+                return
+            device.pending += 1
+        submitted_at = time.monotonic()
+        future = self.pool.submit(exfeature, data, self.fs)
+
+        def _done(fut):
+            with self._lock:
+                device.pending -= 1
+            if fut.cancelled():
+                return
+            error = fut.exception()
+            device.put_features({
+                'device': device.name,
+                'epoch': epoch_index,
+                'features': None if error else fut.result(),
+                'error': error,
+                'signal_good': signal_good,
+                'quality': quality,
+                'artifacts': artifacts,
+                'latency': time.monotonic() - submitted_at,
+            })
+
+        future.add_done_callback(_done)
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Per-device throughput, parser health and drop counters
+
+        Rates are averaged over the time since the previous stats() call (see AcquisitionStats.snapshot).
+        """
+        result = {}
+        for name, device in self.devices.items():
+            snap = device.stats.snapshot('manager')
+            snap.update({
+                'epochs': device.epochs,
+                'epochs_dropped': device.epochs_dropped,
+                'epochs_artifact': device.epochs_artifact,
+                'features_dropped': device.features_dropped,
+                'pending': device.pending,
+                'read_errors': device.read_errors,
+                'reconnects': device.reconnects,
+                'signal_good': device.signal_good,
+            })
+            result[name] = snap
+        return result
+
+
+def main():
+    """Main execution function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Multi-headset EEG acquisition for ThinkGear Protocol')
+    parser.add_argument('--ports', '-p', nargs='+',
+                        help='Serial ports (default: /dev/rfcomm0..N-1, see --count)')
+    parser.add_argument('--count', '-n', type=int, default=4,
+                        help='Number of rfcomm devices when --ports is not given (default: 4)')
+    parser.add_argument('--baudrate', '-b', type=int, default=57600,
+                        help='Baud rate (default: 57600)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Extraction worker processes (default: CPU count)')
+    parser.add_argument('--interval', '-i', type=float, default=5.0,
+                        help='Stats print interval in seconds (default: 5)')
+    args = parser.parse_args()
+
+    ports = args.ports or [f'/dev/rfcomm{i}' for i in range(args.count)]
+    manager = AcquisitionManager(ports, baudrate=args.baudrate, workers=args.workers)
+    if manager.open_all() == 0:
+        sys.exit(1)
+
+    try:
+        manager.start()
+        while True:
+            time.sleep(args.interval)
+            for name, s in manager.stats().items():
+                print(f"[{name}] {AcquisitionStats.format(s)}, "
+                      f"epochs {s['epochs']} (dropped {s['epochs_dropped']}, artifact {s['epochs_artifact']}), "
+                      f"features dropped {s['features_dropped']}")
+            for device in manager.devices.values():
+                while not device.feature_queue.empty():
+                    result = device.feature_queue.get_nowait()
+                    if result['artifacts'] and not result['artifacts']['passed']:
+                        print(f"[{result['device']}] epoch {result['epoch']} rejected: "
+                              f"{', '.join(result['artifacts']['reasons'])}")
+                    else:
+                        print(f"[{result['device']}] epoch {result['epoch']} extracted in {result['latency']:.2f}s")
+    except KeyboardInterrupt:
+        print("\nKeyboard interrupt detected. Shutting down.")
+    finally:
+        manager.stop()
+
+
+if __name__ == "__main__":
+    main()
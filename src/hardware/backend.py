@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hardware Backend
+One place that decides where GPIO and the OLED come from, so the UI, vibration and alarm code can
+be imported, run and profiled off the Raspberry Pi.
+
+The backend is chosen by the BRAINALARM_HW environment variable when this module is imported:
+  rpi   (default)  RPi.GPIO, adafruit_ssd1306 over board/busio I2C, luma.oled
+  fake             in-memory backends: FakeGPIO records every pin write with a timestamp and
+                   accepts scripted input edges; the fake displays capture every frame shown
+
+Usage:
+    from src.hardware.backend import GPIO, create_ssd1306
+    GPIO.setup(27, GPIO.OUT)
+    oled = create_ssd1306(128, 64)
+
+    BRAINALARM_HW=fake python program.py      # whole system on plain Linux
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from src.hardware.ssd1306 import DisplayRAM, pack_pages, SET_COL_ADDR, SET_PAGE_ADDR, DATA_PREFIX
+
+BACKEND_ENV = 'BRAINALARM_HW'
+BACKEND_RPI = 'rpi'
+BACKEND_FAKE = 'fake'
+BACKENDS = (BACKEND_RPI, BACKEND_FAKE)
+
+BACKEND = os.environ.get(BACKEND_ENV, BACKEND_RPI).strip().lower()
+if BACKEND not in BACKENDS:
+    raise ValueError(f"{BACKEND_ENV}={BACKEND!r}: expected one of {', '.join(BACKENDS)}")
+
+
+class FakeGPIO:
+    """
+    In-memory stand-in for the RPi.GPIO module.
+
+    Inputs idle high (pull-ups) until driven with set_input(); edge callbacks registered with
+    add_event_detect() are called on the thread that drives the edge, as RPi.GPIO calls them on
+    its event thread. Timestamps come from `clock` (time.monotonic unless a simulation swaps in a
+    virtual clock).
+    """
+    BCM, BOARD = 11, 10
+    IN, OUT = 1, 0
+    PUD_OFF, PUD_DOWN, PUD_UP = 20, 21, 22
+    LOW, HIGH = 0, 1
+    RISING, FALLING, BOTH = 31, 32, 33
+
+    def __init__(self, clock=time.monotonic, max_writes=10000):
+        self.clock = clock
+        self.mode = None
+        self.levels = {}             # pin -> current level
+        self.directions = {}         # pin -> IN / OUT
+        self.callbacks = {}          # pin -> (edge, callback)
+        self.writes = deque(maxlen=max_writes)   # (timestamp, pin, value) per output()
+        self.inputs_driven = 0
+        self.cleanups = 0
+        self._lock = threading.RLock()
+
+    # --- RPi.GPIO API ---
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, direction, pull_up_down=None, initial=None):
+        with self._lock:
+            self.directions[pin] = direction
+            if direction == self.OUT:
+                self.levels[pin] = self.LOW if initial is None else initial
+            elif pin not in self.levels:
+                self.levels[pin] = self.LOW if pull_up_down == self.PUD_DOWN else self.HIGH
+
+    def input(self, pin):
+        return self.levels.get(pin, self.HIGH)
+
+    def output(self, pin, value):
+        value = int(bool(value))
+        with self._lock:
+            self.levels[pin] = value
+            self.writes.append((self.clock(), pin, value))
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        with self._lock:
+            if pin in self.callbacks:
+                raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+            self.callbacks[pin] = (edge, callback)
+
+    def remove_event_detect(self, pin):
+        with self._lock:
+            self.callbacks.pop(pin, None)
+
+    def cleanup(self, *pins):
+        with self._lock:
+            self.cleanups += 1
+            for pin in (pins or list(self.levels)):
+                self.callbacks.pop(pin, None)
+                self.directions.pop(pin, None)
+                self.levels.pop(pin, None)
+
+    # --- 시뮬레이션용 입력 ---
+    def set_input(self, pin, level):
+        """Drive an input pin; fires its edge callback if the level changes."""
+        with self._lock:
+            previous = self.levels.get(pin, self.HIGH)
+            if previous == level:
+                return
+            self.levels[pin] = level
+            self.inputs_driven += 1
+            edge, callback = self.callbacks.get(pin, (None, None))
+        if callback and (edge == self.BOTH or edge == (self.RISING if level else self.FALLING)):
+            callback(pin)
+
+    def press(self, pin, duration=0.1):
+        """Press and release an active-low button (blocks for `duration`)."""
+        self.set_input(pin, self.LOW)
+        time.sleep(duration)
+        self.set_input(pin, self.HIGH)
+
+    def turn(self, clk_pin, dt_pin, steps, step_sec=0.05):
+        """Turn an encoder `steps` full quadrature cycles (negative: counter-clockwise)."""
+        sequence = ((clk_pin, 0), (dt_pin, 0), (clk_pin, 1), (dt_pin, 1))
+        if steps < 0:
+            sequence = ((dt_pin, 0), (clk_pin, 0), (dt_pin, 1), (clk_pin, 1))
+        for _ in range(abs(steps)):
+            for pin, level in sequence:
+                self.set_input(pin, level)
+                time.sleep(step_sec / 4)
+
+    def play(self, script, background=True):
+        """
+        Replay scripted input edges.
+
+        Args:
+            script (iterable): (delay s, pin, level) entries; delay is relative to the previous entry
+            background (bool): Run on a daemon thread and return it
+
+        Returns:
+            threading.Thread or None
+        """
+        def run():
+            for delay, pin, level in script:
+                if delay > 0:
+                    time.sleep(delay)
+                self.set_input(pin, level)
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def writes_to(self, pin):
+        """(timestamp, value) of every output() to `pin`."""
+        return [(t, value) for t, p, value in self.writes if p == pin]
+
+
+class _FakeI2CDevice:
+    """adafruit_bus_device.I2CDevice stand-in: counts bus bytes and passes writes to the panel."""
+
+    def __init__(self, panel):
+        self.panel = panel
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, buf):
+        self.panel.bytes_sent += 1 + len(buf)   # address byte + control byte + payload
+        if buf and buf[0] == DATA_PREFIX:
+            self.panel.ram.data(bytes(buf[1:]))
+
+
+class FakeSSD1306:
+    """
+    In-memory stand-in for adafruit_ssd1306.SSD1306_I2C: image() stages a PIL image, show()
+    captures it as a frame. write_cmd() and i2c_device reach a model of the panel's RAM (like
+    the real driver's), so partial updates can be checked against what the panel would show.
+    """
+
+    def __init__(self, width=128, height=64, clock=time.monotonic, max_frames=100):
+        self.width = width
+        self.height = height
+        self.clock = clock
+        self.staged = None
+        self.frames = deque(maxlen=max_frames)   # (timestamp, PIL image)
+        self.shows = 0
+        self.bytes_sent = 0                       # bytes on the I2C bus, address/control bytes included
+        self.ram = DisplayRAM(width, height)
+        self.i2c_device = _FakeI2CDevice(self)
+
+    def image(self, img):
+        self.staged = img.copy()
+
+    def fill(self, color):
+        from PIL import Image
+        self.staged = Image.new('1', (self.width, self.height), 255 if color else 0)
+
+    def write_cmd(self, cmd):
+        self.bytes_sent += 3   # address, control 0x80, command: one I2C write per command byte
+        self.ram.command(cmd)
+
+    def show(self):
+        if self.staged is None:
+            self.fill(0)
+        for cmd in (SET_COL_ADDR, 0, self.width - 1, SET_PAGE_ADDR, 0, self.height // 8 - 1):
+            self.write_cmd(cmd)
+        with self.i2c_device:
+            self.i2c_device.write(bytes([DATA_PREFIX]) + pack_pages(self.staged).tobytes())
+        self.frames.append((self.clock(), self.staged.copy()))
+        self.shows += 1
+
+    @property
+    def last_frame(self):
+        return self.frames[-1][1] if self.frames else None
+
+    @property
+    def panel_image(self):
+        """What the panel shows, including partial updates (frames only holds full show() frames)."""
+        return self.ram.image()
+
+
+class FakeLumaDevice:
+    """In-memory stand-in for a luma.oled ssd1306 device on luma's I2C interface."""
+    I2C_BLOCK = 32   # luma.core i2c.data() writes at most 32 data bytes per transfer
+
+    def __init__(self, width=128, height=64, clock=time.monotonic, max_frames=100):
+        self.width = width
+        self.height = height
+        self.size = (width, height)
+        self.mode = '1'
+        self.clock = clock
+        self.frames = deque(maxlen=max_frames)   # (timestamp, PIL image)
+        self.shows = 0
+        self.bytes_sent = 0                       # bytes on the I2C bus, address/control bytes included
+        self.ram = DisplayRAM(width, height)
+
+    def command(self, *cmd):
+        self.bytes_sent += 2 + len(cmd)   # address, control 0x00, commands in one transfer
+        for byte in cmd:
+            self.ram.command(byte)
+
+    def data(self, data):
+        for i in range(0, len(data), self.I2C_BLOCK):
+            block = data[i:i + self.I2C_BLOCK]
+            self.bytes_sent += 2 + len(block)
+            self.ram.data(block)
+
+    def display(self, image):
+        self.command(SET_COL_ADDR, 0, self.width - 1, SET_PAGE_ADDR, 0, self.height // 8 - 1)
+        self.data(list(pack_pages(image).tobytes()))
+        self.frames.append((self.clock(), image.copy()))
+        self.shows += 1
+
+    def clear(self):
+        from PIL import Image
+        self.display(Image.new(self.mode, self.size))
+
+    @property
+    def last_frame(self):
+        return self.frames[-1][1] if self.frames else None
+
+    @property
+    def panel_image(self):
+        """What the panel shows, including partial updates."""
+        return self.ram.image()
+
+
+if BACKEND == BACKEND_FAKE:
+    GPIO = FakeGPIO()
+else:
+    import RPi.GPIO as GPIO
+
+
+def is_fake():
+    return BACKEND == BACKEND_FAKE
+
+
+_gpio_initialized = False
+_gpio_lock = threading.Lock()
+
+
+def init_gpio():
+    """
+    Reset GPIO and select BCM numbering, once per process.
+
+    Later calls do nothing, so a second display or controller created in the same process does
+    not run GPIO.cleanup() over the pins and edge detection the first one set up.
+    """
+    global _gpio_initialized
+    with _gpio_lock:
+        if _gpio_initialized:
+            return
+        GPIO.cleanup()
+        GPIO.setwarnings(False)
+        GPIO.setmode(GPIO.BCM)
+        _gpio_initialized = True
+
+
+def create_ssd1306(width=128, height=64):
+    """SSD1306 panel with the adafruit_ssd1306 API (image/show/fill) on the I2C bus."""
+    if BACKEND == BACKEND_FAKE:
+        return FakeSSD1306(width, height)
+    import board
+    import busio
+    import adafruit_ssd1306
+    i2c = busio.I2C(board.SCL, board.SDA)
+    return adafruit_ssd1306.SSD1306_I2C(width, height, i2c)
+
+
+def create_luma_device(port=1, address=0x3C):
+    """SSD1306 panel as a luma.oled device."""
+    if BACKEND == BACKEND_FAKE:
+        return FakeLumaDevice()
+    from luma.core.interface.serial import i2c
+    from luma.oled.device import ssd1306
+    return ssd1306(i2c(port=port, address=address))
+
+
+@contextmanager
+def canvas(device):
+    """luma.core.render.canvas for the selected backend: draw on a fresh image, then display it."""
+    if BACKEND != BACKEND_FAKE:
+        from luma.core.render import canvas as luma_canvas
+        with luma_canvas(device) as draw:
+            yield draw
+        return
+    from PIL import Image, ImageDraw
+    image = Image.new(device.mode, device.size)
+    yield ImageDraw.Draw(image)
+    device.display(image)
@@ -16,195 +16,35 @@ import numpy as np
 import serial
 import time
 import sys
-from enum import Enum
 import threading
 from collections import deque
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Any, Dict, Iterable, List
 from src.processing.feature_extract import exfeature
+from src.hardware.thinkgear import (
+    ParserState, ParserType, ThinkGearParser,
+    SYNC_BYTE, EXCODE_BYTE, MAX_PAYLOAD_LENGTH,
+    CODE_RAW_SIGNAL, CODE_ATTENTION, CODE_MEDITATION, CODE_BLINK_STRENGTH, CODE_POOR_SIGNAL,
+    CODE_EEG_POWER, PacketEvent,
+)
+from src.hardware.stats import AcquisitionStats
+from src.hardware.sinks import (
+    Sink, QueuedSink, HexDumpSink, RecorderSink, StatsSink, EpochSink, BandPowerSink,
+)
+from src.processing.timing import SampleClock, fill_values, GAP_POLICIES, GAP_INTERPOLATE, GAP_REJECT
+from src.processing.quality import RollingQuality
+from src.processing.extraction_worker import ExtractionWorker
+from src.processing.incremental_features import IncrementalFeatures
+from src.processing.governor import extract_tier, ComputeGovernor, RAW_TIERS, DEFAULT_DEADLINE_SEC
+from src.processing.artifact_gate import check_epoch, ARTIFACT_POLICIES, ARTIFACT_REJECT, ARTIFACT_OFF
+from src.processing.tgam_features import TGAMSeries, decode_eeg_power, FEATURE_TIERS, TIER_FULL, TIER_TGAM
 
 
-class ParserState(Enum):
-    """Parser states for ThinkGear packet decoding"""
-    NULL = 0x00
-    SYNC = 0x01              # Waiting for SYNC byte
-    SYNC_CHECK = 0x02        # Waiting for second SYNC byte
-    PAYLOAD_LENGTH = 0x03    # Waiting for payload length
-    PAYLOAD = 0x04           # Waiting for next payload byte
-    CHKSUM = 0x05           # Waiting for checksum byte
-    WAIT_HIGH = 0x06        # Waiting for high byte (2-byte raw)
-    WAIT_LOW = 0x07         # Waiting for low byte (2-byte raw)
-
-
-class ParserType(Enum):
-    """Parser types"""
-    PACKETS = 0x01
-    RAW_2BYTE = 0x02
-
-
-# ThinkGear Protocol Constants
-SYNC_BYTE = 0xAA
-EXCODE_BYTE = 0x55
-MAX_PAYLOAD_LENGTH = 169
-
-# Data codes (from ThinkGear protocol)
-CODE_RAW_SIGNAL = 0x80
-CODE_ATTENTION = 0x04
-CODE_MEDITATION = 0x05
-CODE_BLINK_STRENGTH = 0x16
-CODE_POOR_SIGNAL = 0x02
-
-
-class ThinkGearParser:
-    """
-    ThinkGear Stream Parser
-    Based on NeuroSky's ThinkGearStreamParser.c implementation
-    """
-    
-    def __init__(self, parser_type: ParserType = ParserType.PACKETS, 
-                 data_handler: Optional[Callable] = None):
-        self.parser_type = parser_type
-        self.state = ParserState.SYNC if parser_type == ParserType.PACKETS else ParserState.WAIT_HIGH
-        self.data_handler = data_handler
-        
-        # Packet parsing variables
-        self.payload_length = 0
-        self.payload_bytes_received = 0
-        self.payload_sum = 0
-        self.payload = bytearray(MAX_PAYLOAD_LENGTH + 1)
-        self.checksum = 0
-        self.last_byte = 0
-        
-    def parse_byte(self, byte: int) -> int:
-        """
-        Parse a single byte according to ThinkGear protocol
-        
-        Args:
-            byte: Input byte to parse
-            
-        Returns:
-            int: Return value
-                 0 = normal operation
-                 1 = packet completed successfully
-                -1 = invalid parser
-                -2 = checksum failed
-                -3 = payload too long
-                -4 = standby mode
-                -5 = unrecognized state
-        """
-        return_value = 0
-        
-        if self.state == ParserState.SYNC:
-            # Waiting for first SYNC byte
-            if byte == SYNC_BYTE:
-                self.state = ParserState.SYNC_CHECK
-                
-        elif self.state == ParserState.SYNC_CHECK:
-            # Waiting for second SYNC byte
-            if byte == SYNC_BYTE:
-                self.state = ParserState.PAYLOAD_LENGTH
-            else:
-                self.state = ParserState.SYNC
-                
-        elif self.state == ParserState.PAYLOAD_LENGTH:
-            # Waiting for payload length
-            self.payload_length = byte
-            if self.payload_length > 170:
-                self.state = ParserState.SYNC
-                return_value = -3
-            elif self.payload_length == 170:
-                return_value = -4  # Standby mode
-            else:
-                self.payload_bytes_received = 0
-                self.payload_sum = 0
-                self.state = ParserState.PAYLOAD
-                
-        elif self.state == ParserState.PAYLOAD:
-            # Collecting payload bytes
-            self.payload[self.payload_bytes_received] = byte
-            self.payload_bytes_received += 1
-            self.payload_sum = (self.payload_sum + byte) & 0xFF
-            
-            if self.payload_bytes_received >= self.payload_length:
-                self.state = ParserState.CHKSUM
-                
-        elif self.state == ParserState.CHKSUM:
-            # Verify checksum
-            self.checksum = byte
-            self.state = ParserState.SYNC
-            
-            expected_checksum = (~self.payload_sum) & 0xFF
-            if self.checksum != expected_checksum:
-                return_value = -2
-            else:
-                return_value = 1
-                self._parse_packet_payload()
-                
-        elif self.state == ParserState.WAIT_HIGH:
-            # Waiting for high byte of 2-byte raw value
-            if (byte & 0xC0) == 0x80:
-                self.state = ParserState.WAIT_LOW
-                
-        elif self.state == ParserState.WAIT_LOW:
-            # Waiting for low byte of 2-byte raw value
-            if (byte & 0xC0) == 0x40:
-                raw_value = (self.last_byte << 8) | byte
-                if self.data_handler:
-                    self.data_handler(0, CODE_RAW_SIGNAL, 2, raw_value)
-                return_value = 1
-            self.state = ParserState.WAIT_HIGH
-            
-        else:
-            # Unrecognized state
-            self.state = ParserState.SYNC
-            return_value = -5
-            
-        self.last_byte = byte
-        return return_value
-        
-    def _parse_packet_payload(self):
-        """Parse the packet payload and extract data values"""
-        i = 0
-        
-        while i < self.payload_length:
-            extended_code_level = 0
-            
-            # Parse extended code bytes
-            while i < self.payload_length and self.payload[i] == EXCODE_BYTE:
-                extended_code_level += 1
-                i += 1
-                
-            if i >= self.payload_length:
-                break
-                
-            # Parse code
-            code = self.payload[i]
-            i += 1
-            
-            # Parse value length
-            if code >= 0x80:
-                if i >= self.payload_length:
-                    break
-                num_bytes = self.payload[i]
-                i += 1
-            else:
-                num_bytes = 1
-                
-            # Extract value
-            if i + num_bytes <= self.payload_length:
-                value = self.payload[i:i + num_bytes]
-                if self.data_handler:
-                    self.data_handler(extended_code_level, code, num_bytes, value)
-                i += num_bytes
-            else:
-                break
-
-class thirty_quality:
+class thirty_quality(RollingQuality):
     """30초 슬라이딩 윈도우를 사용하여 신호 품질을 지속적으로 모니터링합니다."""
-    def __init__(self):
-        self.buffer_size = 30
-        # maxlen을 사용하는 deque는 자동으로 가장 오래된 데이터를 밀어내
-        # 완벽한 슬라이딩 윈도우를 구현합니다.
-        self.buffer = deque(maxlen=self.buffer_size)
+    def __init__(self, window: int = 30):
+        # 카운터를 증분 갱신하는 RollingQuality 위에 기존 add_and_check()/is_good API를 유지합니다.
+        super().__init__(window)
+        self.buffer_size = window
         self.is_good = False  # 가장 최근에 확인된 '좋음' 상태를 저장
 
     def add_and_check(self, quality: int) -> bool:
@@ -214,60 +54,284 @@ class thirty_quality:
         Returns:
             bool: 품질 검사를 새로 수행했는지 여부를 반환합니다.
         """
-        self.buffer.append(quality)
+        self.add(quality)
         
-        # 버퍼가 30개 샘플로 가득 찼는지 확인
-        if len(self.buffer) == self.buffer_size:
-            # 버퍼 내의 모든 값이 0(좋음)인지 확인하여 상태 업데이트
-            self.is_good = all(q == 0 for q in self.buffer)
+        # 윈도우가 30개 샘플로 가득 찼는지 확인
+        if self.is_full:
+            # 윈도우 안의 나쁜 값 개수로 '좋음' 상태를 바로 판단합니다 (재검사 없음).
+            self.is_good = self.bad_count == 0
             return True  # 새로운 검사가 완료되었음을 알림
             
         return False # 버퍼가 아직 채워지지 않음
 
 class EpochFeatureExtractor:
-    def __init__(self, fs=512, epoch_duration=30):
+    def __init__(self, fs=512, epoch_duration=30, gap_policy=GAP_INTERPOLATE, max_fill_sec=2.0,
+                 extract_features=True, artifact_policy=ARTIFACT_REJECT, worker=None,
+                 incremental=False, block_sec=5, governor=None):
         """
         Args:
             fs (int): Sampling frequency (default 512Hz for TGAM)
             epoch_duration (int): Epoch length in seconds (default 30s)
+            gap_policy (str): How lost samples are handled: 'interpolate', 'zero_fill' or 'reject'
+            max_fill_sec (float): Longest gap reconstructed by gap_policy. After a longer gap
+                (e.g. a dropout the watchdog reconnected) the epoch in progress is discarded and
+                a new one starts at the first sample after the gap, so an epoch never spans more
+                than epoch_duration seconds of real time; the new epoch's metadata 'discarded'
+                counts the samples thrown away. gap_policy 'reject' still fills and rejects.
+            extract_features (bool): Run exfeature() on each epoch; False only tracks epoch
+                boundaries and metadata (TGAM feature tier)
+            artifact_policy (str): Epochs failing the artifact gate are 'reject'ed before
+                exfeature(), only 'flag'ged, or not checked ('off')
+            worker (ExtractionWorker): Run exfeature() in this worker process instead of inline;
+                finished epochs then return features None with metadata 'offloaded' True, and the
+                features arrive through the worker's on_result callback
+            incremental (bool): Filter and reduce every block_sec of samples as they arrive
+                (IncrementalFeatures) so closing the epoch only merges partial statistics.
+                Ignored when a worker is given.
+            block_sec (int): Sub-block length in seconds for incremental extraction
+            governor (ComputeGovernor): Picks the extraction tier per epoch from measured
+                extraction times; the tier and time are recorded in the epoch metadata
+                ('extract_sec'; with a worker, the wait before and after it is 'queue_sec')
         """
+        if gap_policy not in GAP_POLICIES:
+            raise ValueError(f"Invalid gap policy '{gap_policy}'. Choose one of {GAP_POLICIES}.")
+        if artifact_policy not in ARTIFACT_POLICIES:
+            raise ValueError(f"Invalid artifact policy '{artifact_policy}'. Choose one of {ARTIFACT_POLICIES}.")
         self.fs = fs
         self.epoch_duration = epoch_duration
         self.buffer_size = fs * epoch_duration
         self.buffer = deque(maxlen=self.buffer_size)  # raw EEG data 저장
         self.features = None  # 마지막으로 추출된 특징 벡터 저장
+        self.gap_policy = gap_policy
+        self.max_fill_samples = int(max_fill_sec * fs)
+        self.extract_features = extract_features
+        self.artifact_policy = artifact_policy
+        self.worker = worker
+        self.incremental = IncrementalFeatures(fs) if incremental and extract_features and worker is None else None
+        self.block_samples = int(block_sec * fs)
+        self._block = []  # 아직 incremental에 넘기지 않은 샘플
+        self._reconstructed = []  # 현재 epoch 버퍼에서 갭을 채운 샘플의 위치 (아티팩트 검사에서 제외)
+        self.governor = governor
+        self.clock = SampleClock(fs)
+        self.metadata = None  # 마지막으로 완료된 epoch의 타이밍/갭 정보
+        self._meta = self._new_metadata()
+
+    @staticmethod
+    def _new_metadata(start_time=None):
+        return {'start_time': start_time, 'end_time': None, 'received': 0, 'filled': 0,
+                'gaps': 0, 'discarded': 0, 'rejected': False, 'artifacts': None, 'offloaded': False,
+                'tier': None, 'extract_sec': None, 'queue_sec': None, 'closed_at': None}
         
     def add_sample(self, sample):
-        """새로운 raw EEG 샘플 추가"""
+        """새로운 raw EEG 샘플 추가 (도착 시각 정보 없음)"""
+        self._meta['received'] += 1
+        return self._append(sample)
+
+    def add_chunk(self, samples, arrival):
+        """
+        한 번의 시리얼 읽기에서 디코딩된 raw 샘플들을 도착 시각과 함께 추가합니다.
+        SampleClock으로 앞선 갭을 감지하고 gap_policy에 따라 채우거나 epoch을 폐기 표시합니다.
+
+        Args:
+            samples (list): Raw samples decoded from one chunk, in order
+            arrival (float): time.monotonic() when the chunk was read
+
+        Returns:
+            tuple: (features, has_thirty_seconds_data), same as add_sample
+        """
+        result = (self.features, None)
+        missing = self.clock.on_chunk(arrival, len(samples))
+        if missing:
+            result = self._fill_gap(missing, samples[0], arrival)
+        if self._meta['start_time'] is None:
+            self._meta['start_time'] = arrival
+        for sample in samples:
+            self._meta['received'] += 1
+            features, is_ready = self._append(sample, arrival)
+            if is_ready:
+                result = (features, is_ready)
+        return result
+
+    def _fill_gap(self, missing, next_value, arrival):
+        """
+        갭 정책에 따라 누락된 샘플 자리를 채워 epoch이 실제 30초를 유지하도록 합니다.
+        채우기에는 너무 긴 갭이면 진행 중인 epoch을 버리고 갭 뒤에서 새로 시작합니다.
+        """
+        print(f"[{time.strftime('%H:%M:%S')}] Sample gap detected: {missing} samples "
+              f"({missing / self.fs:.2f}s) missing, policy '{self.gap_policy}'")
+        if missing >= self.buffer_size or (self.gap_policy != GAP_REJECT and missing > self.max_fill_samples):
+            # 갭이 epoch 하나보다 길거나 채우기에 너무 길면(재연결 등) 진행 중인 epoch을 버리고 새로 시작합니다.
+            # 끊기기 전후 샘플을 이어 붙이면 epoch이 30초보다 긴 실제 시간을 덮고 이음매에 계단이 생깁니다.
+            discarded = len(self.buffer)
+            self.buffer.clear()
+            self._reconstructed = []
+            self._reset_incremental()
+            self._meta = self._new_metadata(arrival)
+            self._meta['discarded'] = discarded
+            return (self.features, None)
+
+        reject = self.gap_policy == GAP_REJECT
+        last_value = self.buffer[-1] if self.buffer else None
+        self._meta['gaps'] += 1
+        result = (self.features, None)
+        for value in fill_values(self.gap_policy, missing, last_value, next_value):
+            self._meta['filled'] += 1
+            if reject:
+                self._meta['rejected'] = True
+            features, is_ready = self._append(value, arrival, reconstructed=True)
+            if is_ready:
+                result = (features, is_ready)
+        return result
+
+    def _tier(self):
+        return self.governor.tier if self.governor else TIER_FULL
+
+    def _reset_incremental(self):
+        self._block = []
+        if self.incremental:
+            self.incremental.reset()
+
+    def _append(self, sample, arrival=None, reconstructed=False):
         self.buffer.append(sample)
-        has_thirty_seconds_data = None
+        if reconstructed:
+            self._reconstructed.append(len(self.buffer) - 1)
+        if self.incremental and not self._meta['rejected'] and self._tier() == TIER_FULL:
+            # 5초 블록이 찰 때마다 필터링/부분 통계를 미리 계산해 epoch 마감 시의 CPU 부하를 나눕니다.
+            self._block.append(sample)
+            if len(self._block) == self.block_samples:
+                self.incremental.add(self._block)
+                self._block = []
         
         # 버퍼가 가득 차면 특징 추출
-        if len(self.buffer) == self.buffer_size:
-            has_thirty_seconds_data = True
+        if len(self.buffer) < self.buffer_size:
+            return (self.features, None)
+
+        meta = self._meta
+        meta['end_time'] = arrival
+        meta['policy'] = self.gap_policy
+        meta['status'] = 'rejected' if meta['rejected'] else ('filled' if meta['filled'] else 'ok')
+        meta['rate_hz'] = self.clock.rate
+        meta['closed_at'] = time.perf_counter()  # 실제 시간: epoch 마감 -> 알람 판단 지연 측정용
+        self.metadata = meta
+        self._meta = self._new_metadata(arrival)
+
+        if meta['rejected'] or not self.extract_features:
+            # 손상된 epoch이나 TGAM 티어에서는 특징 추출 CPU를 쓰지 않습니다.
+            self.features = None
+        else:
             data = np.array(self.buffer, dtype=np.float32)
-            self.features = exfeature(data, fs=self.fs)
+            if self.artifact_policy != ARTIFACT_OFF:
+                # 필터링 전에 포화/평탄/움직임/고주파 아티팩트를 먼저 걸러냅니다 (수 ms).
+                # 갭을 채운 샘플은 평탄 검사에서 빠집니다 (zero_fill 갭이 flatline으로 걸리지 않도록).
+                reconstructed = None
+                if self._reconstructed:
+                    reconstructed = np.zeros(len(data), dtype=bool)
+                    reconstructed[self._reconstructed] = True
+                meta['artifacts'] = check_epoch(data, fs=self.fs, reconstructed=reconstructed)
+            meta['tier'] = tier = self._tier()
+            if meta['artifacts'] and not meta['artifacts']['passed'] and self.artifact_policy == ARTIFACT_REJECT:
+                meta['status'] = 'artifact'
+                self.features = None
+            elif tier == TIER_TGAM:
+                # 거버너가 가장 낮은 티어를 골랐습니다: raw 신호 DSP 없이 TGAM 칩 특징을 씁니다.
+                self.features = None
+                self.governor.record(tier, 0.0)
+            elif self.worker is not None:
+                # 특징 추출은 워커 프로세스에서 — 리더 프로세스의 GIL을 잡지 않습니다.
+                options = self.governor.options() if self.governor else None
+                meta['offloaded'] = self.worker.submit(data, meta, options)
+                if not meta['offloaded']:
+                    meta['status'] = 'dropped'  # 워커가 이전 epoch을 아직 처리 중
+                self.features = None
+            else:
+                start = time.perf_counter()
+                if tier == TIER_FULL and self.incremental and self.incremental.samples + len(self._block) == len(data):
+                    if self._block:
+                        self.incremental.add(self._block)
+                        self._block = []
+                    self.features = self.incremental.finalize(data)
+                elif self.governor:
+                    self.features = extract_tier(data, self.fs, **self.governor.options())
+                else:
+                    self.features = exfeature(data, fs=self.fs)
+                meta['extract_sec'] = time.perf_counter() - start
+                if self.governor:
+                    self.governor.record(tier, meta['extract_sec'])
             
-            # 버퍼 초기화 (슬라이딩 윈도우 원한다면 주석 처리)
-            self.buffer.clear()
+        # 버퍼 초기화 (슬라이딩 윈도우 원한다면 주석 처리)
+        self.buffer.clear()
+        self._reconstructed = []
+        self._reset_incremental()
             
-        return (self.features, has_thirty_seconds_data)
+        return (self.features, True)
 
 class EEGReader:
     """EEG Data Reader with hex display functionality"""
     
-    def __init__(self, port: str = '/dev/rfcomm0', baudrate: int = 57600):
+    def __init__(self, port: str = '/dev/rfcomm0', baudrate: int = 57600,
+                 gap_policy: str = GAP_INTERPOLATE, feature_tier: str = TIER_FULL,
+                 artifact_policy: str = ARTIFACT_REJECT, isolate_extraction: bool = False,
+                 incremental_features: bool = False, governor=None):
+        if feature_tier not in FEATURE_TIERS:
+            raise ValueError(f"Invalid feature tier '{feature_tier}'. Choose one of {FEATURE_TIERS}.")
         self.port = port
         self.baudrate = baudrate
         self.serial_conn: Optional[serial.Serial] = None
         self.parser = ThinkGearParser(ParserType.PACKETS, self._handle_data_value)
         self.running = False
-        self.feature_extractor = EpochFeatureExtractor(fs=512, epoch_duration=30)
+        self.feature_tier = feature_tier
+        # isolate_extraction이면 exfeature()를 공유 메모리로 epoch을 받는 별도 프로세스에서 실행합니다.
+        self.extraction_worker: Optional[ExtractionWorker] = None
+        if isolate_extraction and feature_tier == TIER_FULL:
+            self.extraction_worker = ExtractionWorker(512 * 30, fs=512, extract=extract_tier,
+                                                      on_result=self._on_extracted)
+        self.feature_extractor = EpochFeatureExtractor(fs=512, epoch_duration=30, gap_policy=gap_policy,
+                                                       extract_features=feature_tier == TIER_FULL,
+                                                       artifact_policy=artifact_policy,
+                                                       worker=self.extraction_worker,
+                                                       incremental=incremental_features,
+                                                       governor=governor if feature_tier == TIER_FULL else None)
+        self.governor = self.feature_extractor.governor
+        self.epoch_metadata = None  # 마지막 epoch의 타이밍/갭 정보 (EpochFeatureExtractor.metadata)
+        self.tgam = TGAMSeries()    # 칩이 계산한 대역 파워/eSense 값의 초당 시계열
+        self.tgam_feature = None    # 마지막 epoch의 TGAM 특징 벡터 (TGAM_FEATURE_NAMES 순서)
+        self._chunk_samples = []    # 현재 청크에서 디코딩된 raw 샘플
+        self.attention: Optional[int] = None
+        self.meditation: Optional[int] = None
+        self.blink_strength: Optional[int] = None
+        self.unknown_codes: Dict[int, int] = {}   # code -> count of values outside the dispatch table
+
+        # code -> handler. Built once so each value costs one dict lookup instead of an if/elif chain.
+        self._dispatch: Dict[int, Callable[[Any], Any]] = {
+            CODE_RAW_SIGNAL: self._on_raw_signal,
+            CODE_POOR_SIGNAL: self._on_poor_signal,
+            CODE_ATTENTION: self._on_attention,
+            CODE_MEDITATION: self._on_meditation,
+            CODE_BLINK_STRENGTH: self._on_blink_strength,
+            CODE_EEG_POWER: self._on_eeg_power,
+        }
+        self._subscribers: Dict[int, List[Callable[[PacketEvent], None]]] = {}
         self.feature = None
         self.thread: Optional[threading.Thread] = None
         self.thirty_signal_quality = None
         self.thirty_quality_checker = thirty_quality()
         self.new_feature_ready = False
+        self.mode = 'parsed'
+        self.last_byte_time: Optional[float] = None  # time.monotonic() of the last byte read
+        self.link_error: Optional[Exception] = None   # last exception that ended a reader loop
+        self.stats = AcquisitionStats(self.parser)
+        self.stats.watch_queue('epoch_buffer', lambda: len(self.feature_extractor.buffer))
+        if self.extraction_worker:
+            self.stats.watch_queue('extraction_pending', lambda: len(self.extraction_worker.pending))
+
+        # Stream taps: every serial chunk goes to the enabled sinks (see src/hardware/sinks.py).
+        self.sinks: List[Sink] = []
+        self._chunk_sinks: List[Sink] = []
+        self._sample_sinks: List[Sink] = []
+        self.add_sink(EpochSink(self.feature_extractor, self._on_epoch))
+        self.add_sink(StatsSink(self.stats))
+        self.hexdump_sink = HexDumpSink()
+        self.add_sink(self.hexdump_sink, enabled=False)
         
     def connect(self) -> bool:
         """
@@ -294,54 +358,198 @@ class EEGReader:
     def disconnect(self):
         """Disconnect from the serial port"""
         if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close()
+            try:
+                self.serial_conn.close()
+            except (serial.SerialException, OSError) as e:
+                print(f"Error while closing {self.port}: {e}")
             print("Disconnected from serial port")
+
+    def reconnect(self) -> bool:
+        """
+        Re-open the serial port and restart the reader thread in the previous mode.
+
+        Only the parser state is reset; the epoch buffer and signal-quality window are kept, so
+        samples received before an outage short enough to fill (max_fill_sec) still count towards
+        the current epoch. After a longer outage the epoch restarts at the first new sample.
+        An extraction worker whose process died is restarted with empty slots (ExtractionWorker.start).
+
+        Returns:
+            bool: True if the port was re-opened and the reader restarted
+        """
+        self._halt_thread()
+        self.disconnect()
+        self.parser.reset()
+        if not self.connect():
+            return False
+        self.start(self.mode)
+        return True
             
+    def subscribe(self, callback: Callable[[PacketEvent], None], codes: Optional[Iterable[int]] = None):
+        """
+        Deliver decoded values to callback as PacketEvent records
+
+        Callbacks run on the reader thread and must return quickly.
+
+        Args:
+            callback: Called with one PacketEvent per value
+            codes: ThinkGear codes to receive (default: every code in the dispatch table)
+        """
+        for code in (codes if codes is not None else self._dispatch):
+            self._subscribers.setdefault(code, []).append(callback)
+
+    def unsubscribe(self, callback: Callable[[PacketEvent], None]):
+        """Remove callback from every code it was subscribed to."""
+        for code in list(self._subscribers):
+            callbacks = [cb for cb in self._subscribers[code] if cb is not callback]
+            if callbacks:
+                self._subscribers[code] = callbacks
+            else:
+                del self._subscribers[code]
+
     def _handle_data_value(self, extended_code_level: int, code: int, 
                           num_bytes: int, value: Any):
-        """Handle parsed data values from ThinkGear packets"""
-        timestamp = time.strftime("%H:%M:%S")
-        
-        if code == CODE_POOR_SIGNAL:
-            signal_quality = value[0] if isinstance(value, (bytes, bytearray)) else value
-            is_check_done = self.thirty_quality_checker.add_and_check(signal_quality)
-            if is_check_done:
-                self.thirty_signal_quality = self.thirty_quality_checker.is_good
-                print(f"[{timestamp}] 30초 신호 품질 재확인: {'좋음' if self.thirty_signal_quality else '불안정'}")
-            
-        elif code == CODE_ATTENTION:
-            attention = value[0] if isinstance(value, (bytes, bytearray)) else value
-            #print(f"[{timestamp}] Attention: {attention}")
-            
-        elif code == CODE_MEDITATION:
-            meditation = value[0] if isinstance(value, (bytes, bytearray)) else value
-            #print(f"[{timestamp}] Meditation: {meditation}")
-            
-        elif code == CODE_BLINK_STRENGTH:
-            blink = value[0] if isinstance(value, (bytes, bytearray)) else value
-            #print(f"[{timestamp}] Blink Strength: {blink}")
+        """Handle parsed data values from ThinkGear packets (one dict lookup per value)"""
+        handler = self._dispatch.get(code)
+        if handler is None:
+            self._on_unknown_code(extended_code_level, code, value)
+            return
+        decoded = handler(value)
 
-            
-        elif code == CODE_RAW_SIGNAL:
-            if isinstance(value, (bytes, bytearray)) and len(value) >= 2:
-                raw_val = (value[0] << 8) | value[1]
-            else:
-                raw_val = value
-            if raw_val > 32768:
-                raw_val -= 65536
-            new_feature, is_ready = self.feature_extractor.add_sample(raw_val)
-            if is_ready:
-                self.feature = new_feature
-                self.new_feature_ready = True
-                #print(f"[{timestamp}] New 30s epoch feature extracted.")
-        
-        elif code == 0x83: # EEG Power (각 뇌파 대역별 세기)
-            pass
-            
-            
-        else:
-            value_hex = ' '.join([f'{b:02X}' for b in value]) if isinstance(value, (bytes, bytearray)) else f'{value:02X}'
-            print(f"[{timestamp}] Code 0x{code:02X} (Level {extended_code_level}): {value_hex}")
+        subscribers = self._subscribers.get(code)
+        if subscribers and decoded is not None:
+            event = PacketEvent(code, decoded, self.last_byte_time)
+            for callback in subscribers:
+                callback(event)
+
+    def _on_poor_signal(self, value) -> int:
+        signal_quality = value if isinstance(value, int) else value[0]
+        self.tgam.on_poor_signal(signal_quality, self.last_byte_time)
+        is_check_done = self.thirty_quality_checker.add_and_check(signal_quality)
+        if is_check_done:
+            self.thirty_signal_quality = self.thirty_quality_checker.is_good
+            print(f"[{time.strftime('%H:%M:%S')}] 30초 신호 품질 재확인: {'좋음' if self.thirty_signal_quality else '불안정'}")
+        return signal_quality
+
+    def _on_attention(self, value) -> int:
+        self.attention = value if isinstance(value, int) else value[0]
+        self.tgam.on_attention(self.attention, self.last_byte_time)
+        return self.attention
+
+    def _on_meditation(self, value) -> int:
+        self.meditation = value if isinstance(value, int) else value[0]
+        self.tgam.on_meditation(self.meditation, self.last_byte_time)
+        return self.meditation
+
+    def _on_blink_strength(self, value) -> int:
+        self.blink_strength = value if isinstance(value, int) else value[0]
+        self.tgam.on_blink(self.blink_strength, self.last_byte_time)
+        return self.blink_strength
+
+    def _on_raw_signal(self, value) -> Optional[int]:
+        # 두 파서 모두 2바이트 raw 값은 부호 없는 16비트 int로 넘겨줍니다.
+        # 길이가 2가 아닌 0x80 값은 memoryview로 오므로 샘플로 쓰지 않고 세기만 합니다.
+        if not isinstance(value, int):
+            self.stats.malformed_raw += 1
+            return None
+        raw_val = value
+        if raw_val > 32768:
+            raw_val -= 65536
+        # 청크가 끝나면 도착 시각과 함께 _dispatch_chunk()에서 sink들로 넘깁니다.
+        self._chunk_samples.append(raw_val)
+        return raw_val
+
+    def _on_eeg_power(self, value):
+        # EEG Power (각 뇌파 대역별 세기): 3바이트씩 8개 대역 (EEG_POWER_BANDS 순서)
+        if len(value) != 24:
+            return bytes(value)
+        powers = decode_eeg_power(value)
+        self.tgam.on_eeg_power(powers, self.last_byte_time)
+        return powers
+
+    def _on_unknown_code(self, extended_code_level: int, code: int, value: Any):
+        """Count codes outside the dispatch table; only the first occurrence of each is printed."""
+        count = self.unknown_codes.get(code, 0)
+        self.unknown_codes[code] = count + 1
+        if count == 0:
+            value_hex = ' '.join([f'{b:02X}' for b in value]) if not isinstance(value, int) else f'{value:02X}'
+            print(f"[{time.strftime('%H:%M:%S')}] Code 0x{code:02X} (Level {extended_code_level}): {value_hex}")
+
+    def add_sink(self, sink: Sink, enabled: bool = True):
+        """Attach a stream sink. Wrap slow sinks in QueuedSink so they cannot stall the reader."""
+        sink.enabled = enabled
+        self.sinks.append(sink)
+        self._rebuild_sinks()
+
+    def remove_sink(self, sink: Sink):
+        """Detach and close a sink."""
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+            self._rebuild_sinks()
+            sink.close()
+
+    def set_sink_enabled(self, sink: Sink, enabled: bool):
+        """Enable or disable a sink. Disabled sinks are left out of the call lists entirely."""
+        sink.enabled = enabled
+        self._rebuild_sinks()
+
+    def _rebuild_sinks(self):
+        # 새 리스트를 통째로 교체하므로 리더 스레드는 잠금 없이 순회할 수 있습니다.
+        active = [sink for sink in self.sinks if sink.enabled]
+        self._sample_sinks = [sink for sink in active if 'on_samples' in sink.hooks()]
+        self._chunk_sinks = [sink for sink in active if 'on_chunk' in sink.hooks()]
+
+    def _dispatch_chunk(self, data: bytes, arrival: float):
+        """Hand one parsed serial chunk to the sinks: decoded samples first, then the raw bytes."""
+        samples = self._chunk_samples
+        if samples:
+            self._chunk_samples = []
+            for sink in self._sample_sinks:
+                sink.on_samples(samples, arrival)
+        chunk_sinks = self._chunk_sinks
+        if chunk_sinks:
+            with memoryview(data) as view:
+                for sink in chunk_sinks:
+                    sink.on_chunk(view, arrival)
+
+    def _on_epoch(self, features, metadata: dict):
+        """(EpochSink에서 호출됨) 30초 epoch이 끝날 때마다 결과를 저장합니다."""
+        self.epoch_metadata = metadata
+        # TGAM 특징은 칩이 계산한 값이라 raw 샘플 갭과 무관하게 같은 epoch 구간으로 집계합니다.
+        self.tgam_feature = self.tgam.aggregate(metadata['start_time'], metadata['end_time'])
+        # 이번 epoch 동안의 poor signal 통계와 품질 점수(0~1)를 특징과 함께 제공합니다.
+        metadata['quality'] = self.thirty_quality_checker.close_epoch()
+        if metadata['status'] == 'rejected':
+            print(f"[{time.strftime('%H:%M:%S')}] 30s epoch rejected: "
+                  f"{metadata['filled']} samples missing in {metadata['gaps']} gap(s)")
+        elif metadata['artifacts'] and not metadata['artifacts']['passed']:
+            print(f"[{time.strftime('%H:%M:%S')}] 30s epoch artifact ({metadata['status']}): "
+                  f"{', '.join(metadata['artifacts']['reasons'])}")
+            if metadata['status'] == 'artifact':
+                # 움직임/전극 문제는 칩 특징도 오염시키므로 TGAM 대체 예측도 하지 않습니다.
+                self.tgam_feature = None
+        elif metadata['status'] == 'dropped':
+            print(f"[{time.strftime('%H:%M:%S')}] 30s epoch dropped: extraction worker is still busy")
+        if metadata['offloaded']:
+            return  # 특징은 워커 프로세스에서 도착하면 _on_extracted()가 처리합니다.
+        self.feature = features
+        if features is None and self.tgam_feature is None:
+            return
+        self.new_feature_ready = True
+        #print(f"[{timestamp}] New 30s epoch feature extracted.")
+
+    def _on_extracted(self, features, metadata: dict, error):
+        """(워커 결과 스레드에서 호출됨) 별도 프로세스에서 추출된 epoch 특징을 저장합니다."""
+        # 거버너 마감 시간에는 워커가 잰 추출 시간만 씁니다. 큐 대기/전송 시간은 따로 기록합니다.
+        metadata['extract_sec'] = self.extraction_worker.last_compute
+        metadata['queue_sec'] = self.extraction_worker.last_queue
+        if self.governor and metadata['extract_sec'] is not None:
+            self.governor.record(metadata['tier'], metadata['extract_sec'])
+        if error:
+            print(f"[{time.strftime('%H:%M:%S')}] Feature extraction failed: {error}")
+        self.feature = features
+        if features is None and self.tgam_feature is None:
+            return
+        self.new_feature_ready = True
 
     def start(self, mode: str = 'parsed'):
         """
@@ -358,53 +566,36 @@ class EEGReader:
             print("Serial connection not established.")
             return
 
-        # 1. mode 값에 따라 스레드가 실행할 타겟 함수를 선택합니다.
-        if mode == 'parsed':
-            target_loop = self._monitor_loop
-        elif mode == 'raw_hex':
-            target_loop = self._display_hex_loop
-        else:
+        # 1. mode 값은 이제 HEX 덤프 sink를 켜고 끄는 것만 결정합니다.
+        if mode not in ('parsed', 'raw_hex'):
             print(f"Invalid mode '{mode}'. Choose 'parsed' or 'raw_hex'.")
             return
+        self.set_sink_enabled(self.hexdump_sink, mode == 'raw_hex')
             
+        self.mode = mode
+        if self.extraction_worker:
+            self.extraction_worker.start()
+        self.link_error = None
+        self.last_byte_time = time.monotonic()
         self.running = True
-        self.thread = threading.Thread(target=target_loop, daemon=True)
+        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.thread.start()
         print(f"EEG monitoring thread started in '{mode}' mode on {self.port}")
 
     def _monitor_loop(self):
-        """(스레드에서 실행됨) 해석된 데이터만 출력하는 루프"""
+        """(스레드에서 실행됨) 시리얼 데이터를 읽어 파싱하고 sink들로 전달하는 루프"""
         try:
             while self.running:
-                if self.serial_conn.in_waiting > 0:
-                    byte_val = self.serial_conn.read(1)[0]
-                    self.parser.parse_byte(byte_val)
-                else:
-                    time.sleep(0.001)
+                # read() blocks in the kernel (up to the 1 s port timeout) until data arrives,
+                # so the thread sleeps instead of spinning on in_waiting.
+                data = self.serial_conn.read(self.serial_conn.in_waiting or 1)
+                if data:
+                    self.last_byte_time = time.monotonic()
+                    self.parser.parse_chunk(data)
+                    self._dispatch_chunk(data, self.last_byte_time)
         except Exception as e:
             print(f"An error occurred in the monitoring thread: {e}")
-            self.running = False
-
-    def _display_hex_loop(self):
-        """(스레드에서 실행됨) Raw Hex와 해석된 데이터를 함께 출력하는 루프"""
-        # 2. display_raw_hex 메서드의 루프 로직을 가져왔습니다.
-        try:
-            while self.running:
-                if self.serial_conn.in_waiting > 0:
-                    data = self.serial_conn.read(self.serial_conn.in_waiting)
-                    
-                    if data:
-                        timestamp = time.strftime("%H:%M:%S.%f")[:-3]
-                        hex_data = ' '.join([f'{b:02X}' for b in data])
-                        
-                        
-                        # 각 바이트를 파서로 전달
-                        for byte_val in data:
-                            self.parser.parse_byte(byte_val)
-                else:
-                    time.sleep(0.01)
-        except Exception as e:
-            print(f"An error occurred in the hex display thread: {e}")
+            self.link_error = e
             self.running = False
 
     def stop(self):
@@ -414,12 +605,20 @@ class EEGReader:
             return
         
         print("\nStopping EEG monitoring thread...")
+        self._halt_thread()
+        if self.extraction_worker:
+            self.extraction_worker.close()
+        print("EEG monitoring thread stopped.")
+
+    def get_stats(self, window: str = 'default') -> dict:
+        """Acquisition health counters, rates over the caller's window (see AcquisitionStats.snapshot)."""
+        return self.stats.snapshot(window)
+
+    def _halt_thread(self):
+        """Signal the reader loop to exit and wait for it (no-op when called from the loop itself)."""
         self.running = False
-        
-        if self.thread:
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
             self.thread.join()
-            
-        print("EEG monitoring thread stopped.")
 
 
 def main():
@@ -433,11 +632,41 @@ def main():
                        help='Baud rate (default: 57600)')
     parser.add_argument('--mode', '-m', choices=['hex', 'monitor'], default='hex',
                        help='Operation mode: hex (raw hex display) or monitor (parsed data)')
+    parser.add_argument('--gap-policy', choices=GAP_POLICIES, default=GAP_INTERPOLATE,
+                       help='Handling of lost samples: interpolate, zero_fill or reject the epoch (default: interpolate)')
+    parser.add_argument('--stats', '-s', type=float, default=5.0,
+                       help='Print acquisition statistics every N seconds (default: 5, 0 disables)')
+    parser.add_argument('--feature-tier', choices=FEATURE_TIERS, default=TIER_FULL,
+                       help='full: exfeature() per epoch, tgam: on-chip band powers/eSense only (default: full)')
+    parser.add_argument('--artifact-policy', choices=ARTIFACT_POLICIES, default=ARTIFACT_REJECT,
+                       help='Epochs failing the artifact gate: reject before feature extraction, flag, or off (default: reject)')
+    parser.add_argument('--isolate-extraction', action='store_true',
+                       help='Run feature extraction in a separate process fed through shared memory')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Compute epoch features from 5 s sub-blocks as samples arrive')
+    parser.add_argument('--deadline', type=float, default=0,
+                       help=f'Per-epoch extraction deadline in seconds; enables the compute governor '
+                            f'(e.g. {DEFAULT_DEADLINE_SEC:.0f}, default: 0 = off)')
+    parser.add_argument('--record', '-r', default=None,
+                       help='Record the raw byte stream with arrival times to this file')
+    parser.add_argument('--bandpower', action='store_true',
+                       help='Print live relative band power with the statistics')
     
     args = parser.parse_args()
     
     # Create EEG reader
-    eeg_reader = EEGReader(port=args.port, baudrate=args.baudrate)
+    eeg_reader = EEGReader(port=args.port, baudrate=args.baudrate, gap_policy=args.gap_policy,
+                           feature_tier=args.feature_tier, artifact_policy=args.artifact_policy,
+                           isolate_extraction=args.isolate_extraction,
+                           incremental_features=args.incremental,
+                           governor=ComputeGovernor(args.deadline, tiers=RAW_TIERS) if args.deadline > 0 else None)
+    
+    if args.record:
+        eeg_reader.add_sink(RecorderSink(args.record))
+    band_power = None
+    if args.bandpower:
+        band_power = BandPowerSink()
+        eeg_reader.add_sink(QueuedSink(band_power))
     
     # Connect to serial port
     if not eeg_reader.connect():
@@ -448,8 +677,20 @@ def main():
             eeg_reader.start('raw_hex')
         else:
             eeg_reader.start('parsed')
+        interval = args.stats if args.stats > 0 else 1.0
+        while eeg_reader.running:
+            time.sleep(interval)
+            if args.stats > 0:
+                print(f"[{time.strftime('%H:%M:%S')}] {AcquisitionStats.format(eeg_reader.get_stats('cli'))}")
+            if band_power and band_power.latest:
+                relative = band_power.latest['relative']
+                print('    band power: ' + ', '.join(f"{name} {value * 100:.0f}%" for name, value in relative.items()))
+    except KeyboardInterrupt:
+        eeg_reader.stop()
     finally:
         eeg_reader.disconnect()
+        for sink in list(eeg_reader.sinks):
+            eeg_reader.remove_sink(sink)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+asyncio EEG Acquisition Core
+Reads the ThinkGear serial port from an asyncio event loop instead of a polling thread.
+
+The serial file descriptor is registered with loop.add_reader(), so the process sleeps in
+the kernel until bytes arrive. epoch_consumer() assembles raw samples into 30 s epochs and
+extracts their features in an executor, and run_periodic() drives the status output from the
+same loop without extra threads. The CLI below runs the three together.
+"""
+import os
+import sys
+PROJECT_ROOT = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..'
+))
+sys.path.insert(0, PROJECT_ROOT)
+import asyncio
+import datetime
+import numpy as np
+import serial
+from typing import Optional, Callable, Iterable, List, Tuple
+from src.processing.feature_extract import exfeature
+from src.hardware.thinkgear import ThinkGearParser, ParserType, CODE_RAW_SIGNAL
+from src.hardware.stats import AcquisitionStats
+
+
+class AsyncEEGReader:
+    """
+    Event-loop driven ThinkGear reader.
+
+    Parsed values are delivered to consumers as (code, value, arrival_time) tuples through
+    bounded asyncio queues. Raw samples (0x80) arrive as signed ints, 1-byte codes as ints and
+    longer values as bytes. A consumer that falls behind loses events (counted in `dropped`)
+    instead of stalling acquisition.
+    """
+
+    def __init__(self, port: str = '/dev/rfcomm0', baudrate: int = 57600):
+        self.port = port
+        self.baudrate = baudrate
+        self.serial_conn: Optional[serial.Serial] = None
+        self.parser = ThinkGearParser(ParserType.PACKETS, self._handle_data_value)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = False
+        self.last_byte_time: Optional[float] = None  # loop.time() of the last chunk
+        self.link_error: Optional[Exception] = None
+        self.dropped = 0
+        self.stats = AcquisitionStats(self.parser)
+        self._consumers: List[Tuple[Optional[frozenset], asyncio.Queue]] = []
+        self._closed: Optional[asyncio.Event] = None
+
+    def connect(self) -> bool:
+        """
+        Open the serial port in non-blocking mode (timeout=0)
+
+        Returns:
+            bool: True if connection successful, False otherwise
+        """
+        try:
+            self.serial_conn = serial.Serial(
+                port=self.port,
+                baudrate=self.baudrate,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                timeout=0
+            )
+            print(f"Connected to {self.port} at {self.baudrate} baud")
+            return True
+        except serial.SerialException as e:
+            print(f"Failed to connect to {self.port}: {e}")
+            return False
+
+    def disconnect(self):
+        """Stop reading and close the serial port"""
+        self.stop()
+        if self.serial_conn and self.serial_conn.is_open:
+            try:
+                self.serial_conn.close()
+            except (serial.SerialException, OSError) as e:
+                print(f"Error while closing {self.port}: {e}")
+            print("Disconnected from serial port")
+
+    def subscribe(self, codes: Optional[Iterable[int]] = None, maxsize: int = 4096) -> asyncio.Queue:
+        """
+        Register a consumer queue
+
+        Args:
+            codes: ThinkGear codes to receive (default: all codes)
+            maxsize: Queue bound; events are dropped when the consumer falls this far behind
+
+        Returns:
+            asyncio.Queue: Queue of (code, value, arrival_time) tuples
+        """
+        queue = asyncio.Queue(maxsize=maxsize)
+        self._consumers.append((frozenset(codes) if codes is not None else None, queue))
+        self.stats.watch_queue(f'consumer{len(self._consumers)}', queue.qsize)
+        return queue
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Register the serial fd with the event loop. Must be called from the loop's thread."""
+        if self.running:
+            print("Monitoring is already running.")
+            return
+        if not self.serial_conn or not self.serial_conn.is_open:
+            print("Serial connection not established.")
+            return
+        self.loop = loop or asyncio.get_running_loop()
+        self._closed = asyncio.Event()
+        self.link_error = None
+        self.last_byte_time = self.loop.time()
+        self.loop.add_reader(self.serial_conn.fileno(), self._on_readable)
+        self.running = True
+        print(f"EEG acquisition registered with event loop on {self.port}")
+
+    def stop(self):
+        """Unregister the serial fd from the event loop."""
+        if not self.running:
+            return
+        self.running = False
+        try:
+            self.loop.remove_reader(self.serial_conn.fileno())
+        except (ValueError, OSError):
+            pass  # fd already closed
+        self._closed.set()
+
+    async def wait_closed(self):
+        """Wait until acquisition stops (stop() called or the link failed)."""
+        if self._closed is not None:
+            await self._closed.wait()
+
+    def _on_readable(self):
+        """(이벤트 루프에서 호출됨) fd에 읽을 데이터가 있을 때 한 번에 모두 읽어 파서로 전달합니다."""
+        try:
+            data = self.serial_conn.read(self.serial_conn.in_waiting or 1)
+        except (serial.SerialException, OSError) as e:
+            print(f"An error occurred while reading {self.port}: {e}")
+            self.link_error = e
+            self.stop()
+            return
+        if data:
+            self.last_byte_time = self.loop.time()
+            self.parser.parse_chunk(data)
+            self.stats.record_chunk(len(data), self.last_byte_time)
+
+    def _handle_data_value(self, extended_code_level: int, code: int,
+                           num_bytes: int, value):
+        """Decode a parsed value and fan it out to the consumer queues."""
+        if code == CODE_RAW_SIGNAL:
+            if not isinstance(value, int):
+                # 2바이트가 아닌 raw 값 (memoryview) - 소비자에게 넘기지 않습니다.
+                self.stats.malformed_raw += 1
+                return
+            if value > 32768:
+                value -= 65536
+            self.stats.raw_samples += 1
+        elif not isinstance(value, int):
+            # 파서가 넘겨준 memoryview는 콜백 동안만 유효하므로 큐에 넣기 전에 복사합니다.
+            value = bytes(value)
+
+        event = (code, value, self.last_byte_time)
+        for codes, queue in self._consumers:
+            if codes is None or code in codes:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self.dropped += 1
+
+
+async def run_periodic(interval: float, callback: Callable, *args):
+    """
+    Call callback every `interval` seconds on the running loop (UI refresh, status output)
+
+    The schedule is anchored to the loop clock so slow callbacks do not accumulate drift.
+    callback may be a plain function or a coroutine function.
+    """
+    loop = asyncio.get_running_loop()
+    next_time = loop.time()
+    while True:
+        result = callback(*args)
+        if asyncio.iscoroutine(result):
+            await result
+        next_time += interval
+        await asyncio.sleep(max(0.0, next_time - loop.time()))
+
+
+async def epoch_consumer(queue: asyncio.Queue, on_epoch: Callable, fs: int = 512,
+                         epoch_duration: int = 30, executor=None):
+    """
+    Collect raw samples from `queue` into epochs and extract features off the event loop
+
+    exfeature() runs in `executor` (default thread pool) as a separate task, so sample
+    collection for the next epoch continues while the previous one is processed.
+
+    Args:
+        queue: Queue from AsyncEEGReader.subscribe(codes=[CODE_RAW_SIGNAL])
+        on_epoch: Called with the feature list of every completed epoch (may be a coroutine function)
+    """
+    loop = asyncio.get_running_loop()
+    size = fs * epoch_duration
+    buffer = np.empty(size, dtype=np.float32)
+    count = 0
+    # 이벤트 루프는 태스크를 약한 참조로만 들고 있으므로, 끝날 때까지 여기서 참조를 유지합니다.
+    tasks = set()
+
+    async def _extract(data):
+        features = await loop.run_in_executor(executor, exfeature, data, fs)
+        result = on_epoch(features)
+        if asyncio.iscoroutine(result):
+            await result
+
+    def _done(task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Epoch feature extraction failed: {task.exception()!r}")
+
+    try:
+        while True:
+            _, value, _ = await queue.get()
+            buffer[count] = value
+            count += 1
+            if count == size:
+                task = loop.create_task(_extract(buffer.copy()))
+                tasks.add(task)
+                task.add_done_callback(_done)
+                count = 0
+    finally:
+        for task in list(tasks):
+            task.cancel()
+
+
+async def _run(args):
+    reader = AsyncEEGReader(port=args.port, baudrate=args.baudrate)
+    if not reader.connect():
+        return 1
+    raw_queue = reader.subscribe(codes=[CODE_RAW_SIGNAL])
+    reader.start()
+
+    epochs = 0
+
+    def on_epoch(features):
+        nonlocal epochs
+        epochs += 1
+        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 30s epoch {epochs}: "
+              f"{len(features)} features extracted")
+
+    def report():
+        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {AcquisitionStats.format(reader.stats.snapshot('cli'))}, "
+              f"dropped: {reader.dropped}")
+
+    tasks = [asyncio.ensure_future(epoch_consumer(raw_queue, on_epoch)),
+             asyncio.ensure_future(run_periodic(args.interval, report))]
+    try:
+        if args.duration > 0:
+            await asyncio.wait_for(reader.wait_closed(), timeout=args.duration)
+        else:
+            await reader.wait_closed()
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        reader.disconnect()
+    return 0
+
+
+def main():
+    """Main execution function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='asyncio EEG acquisition for ThinkGear Protocol')
+    parser.add_argument('--port', '-p', default='/dev/rfcomm0',
+                        help='Serial port (default: /dev/rfcomm0)')
+    parser.add_argument('--baudrate', '-b', type=int, default=57600,
+                        help='Baud rate (default: 57600)')
+    parser.add_argument('--interval', '-i', type=float, default=5.0,
+                        help='Status print interval in seconds (default: 5)')
+    parser.add_argument('--duration', '-d', type=float, default=0,
+                        help='Stop after this many seconds (default: run until the link drops)')
+    args = parser.parse_args()
+
+    try:
+        sys.exit(asyncio.run(_run(args)))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPIO Input Layer
+Button and rotary-encoder input from edge-detect callbacks (GPIO.add_event_detect) instead of
+threads that poll the pins every 1-100 ms.
+
+RPi.GPIO calls the edge callbacks from its own event thread. Each callback timestamps the edge
+(time.monotonic()), reads the pin level, debounces buttons in software, decodes encoders with
+a quadrature transition table (quadrature.py) and puts an InputEvent on the manager's queue;
+consumers block on get()/wait_for() and use no CPU while nothing is pressed. A button edge
+ignored by the debounce is followed by one re-read of the pin once the debounce interval is
+over, so a tap shorter than the interval still reports its release.
+
+RPi.GPIO allows one edge detection per pin, so the pins are registered in a process-wide table and
+one callback per pin fans the edges out to every InputManager watching that pin (e.g. the OLED
+time setter and the vibration controller both watch the reset button).
+
+Usage:
+    inputs = InputManager()
+    inputs.add_button('set', 23)
+    inputs.add_encoder('knob', 17, 18)
+    event = inputs.get(timeout=0.5)      # InputEvent or None
+    ...
+    inputs.close()
+"""
+
+import time
+import queue
+import threading
+from src.hardware.backend import GPIO
+from src.hardware.quadrature import QuadratureDecoder
+
+# 이벤트 종류
+BUTTON_PRESS = 'press'        # value: None
+BUTTON_RELEASE = 'release'    # value: 누르고 있던 시간 (s)
+ENCODER_STEP = 'step'         # value: +1 (시계 방향) / -1 (반시계 방향)
+
+DEFAULT_BUTTON_DEBOUNCE_MS = 50
+
+
+class InputEvent:
+    """One debounced input event."""
+    __slots__ = ('kind', 'name', 'value', 'timestamp')
+
+    def __init__(self, kind, name, value, timestamp):
+        self.kind = kind
+        self.name = name
+        self.value = value
+        self.timestamp = timestamp   # time.monotonic() of the edge
+
+    def __repr__(self):
+        return f"InputEvent({self.kind!r}, {self.name!r}, {self.value!r}, {self.timestamp:.3f})"
+
+
+# pin -> list of edge handlers; one GPIO.add_event_detect per pin
+_pin_handlers = {}
+_pin_lock = threading.Lock()
+
+
+def _dispatch_edge(pin):
+    """(RPi.GPIO 이벤트 스레드에서 실행됨) 한 핀의 엣지를 등록된 모든 핸들러에 전달합니다."""
+    timestamp = time.monotonic()
+    level = GPIO.input(pin)
+    for handler in _pin_handlers.get(pin, ()):
+        try:
+            handler(pin, level, timestamp)
+        except Exception as e:
+            print(f"GPIO input handler error (pin {pin}): {e}")
+
+
+def _attach(pin, handler):
+    with _pin_lock:
+        handlers = _pin_handlers.get(pin)
+        if handlers is None:
+            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            GPIO.add_event_detect(pin, GPIO.BOTH, callback=_dispatch_edge)
+            handlers = _pin_handlers[pin] = []
+        # 콜백 스레드가 순회 중인 리스트를 바꾸지 않도록 새 리스트로 교체합니다.
+        _pin_handlers[pin] = handlers + [handler]
+
+
+def _detach(pin, handler):
+    with _pin_lock:
+        handlers = [h for h in _pin_handlers.get(pin, ()) if h != handler]
+        if handlers:
+            _pin_handlers[pin] = handlers
+        elif pin in _pin_handlers:
+            del _pin_handlers[pin]
+            try:
+                GPIO.remove_event_detect(pin)
+            except Exception:
+                pass  # GPIO.cleanup()이 이미 해제한 경우
+
+
+class _Button:
+    """Debounce state of one active-low button (pull-up, pressed = 0)."""
+
+    def __init__(self, manager, name, pin, debounce_ms):
+        self.manager = manager
+        self.name = name
+        self.pin = pin
+        self.debounce = debounce_ms / 1000.0
+        self.level = GPIO.input(pin)
+        self.last_edge = 0.0
+        self.pressed_at = None if self.level else time.monotonic()
+        self._lock = threading.Lock()
+        self._timer = None          # pending re-read after an ignored edge
+        self._ignored_at = None     # timestamp of the last edge ignored inside the debounce interval
+        self.closed = False
+
+    def on_edge(self, pin, level, timestamp):
+        with self._lock:
+            if timestamp - self.last_edge < self.debounce:
+                # debounce 시간 안의 엣지는 채터링으로 봅니다. 짧은 탭의 떼는 엣지도 여기서 걸러지므로
+                # debounce 시간이 끝나면 핀을 한 번 다시 읽어 놓친 전이를 보충합니다.
+                self.manager.bounces += 1
+                self._ignored_at = timestamp
+                if self._timer is None and not self.closed:
+                    self._timer = threading.Timer(self.last_edge + self.debounce - timestamp, self._reread)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            if level == self.level:
+                self.manager.bounces += 1
+                return
+            self._accept(level, timestamp)
+
+    def _reread(self):
+        """(타이머 스레드에서 실행됨) debounce 시간 뒤의 핀 레벨이 마지막으로 받은 레벨과 다르면 전이를 보냅니다."""
+        with self._lock:
+            self._timer = None
+            if self.closed:
+                return
+            level = GPIO.input(self.pin)
+            if level != self.level:
+                # 핀이 마지막으로 바뀐 시각은 무시했던 마지막 엣지입니다.
+                self._accept(level, self._ignored_at)
+
+    def _accept(self, level, timestamp):
+        self.level = level
+        self.last_edge = timestamp
+        if level == 0:
+            self.pressed_at = timestamp
+            self.manager._emit(BUTTON_PRESS, self.name, None, timestamp)
+        else:
+            held = timestamp - self.pressed_at if self.pressed_at is not None else 0.0
+            self.pressed_at = None
+            self.manager._emit(BUTTON_RELEASE, self.name, held, timestamp)
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+class _Encoder:
+    """Quadrature decoding of one rotary encoder from the edges of both pins."""
+
+    def __init__(self, manager, name, clk_pin, dt_pin, steps_per_detent, trace):
+        self.manager = manager
+        self.name = name
+        self.clk_pin = clk_pin
+        self.dt_pin = dt_pin
+        self.trace = trace
+        self.decoder = QuadratureDecoder(GPIO.input(clk_pin), GPIO.input(dt_pin), steps_per_detent)
+
+    def on_edge(self, pin, level, timestamp):
+        # 채터링은 전이 테이블에서 앞뒤 이동으로 상쇄되므로 시간 기반 debounce는 쓰지 않습니다.
+        if pin == self.clk_pin:
+            a, b = level, GPIO.input(self.dt_pin)
+        else:
+            a, b = GPIO.input(self.clk_pin), level
+        if self.trace is not None:
+            self.trace(timestamp, a, b)
+        direction = self.decoder.update(a, b)
+        if direction:
+            self.manager._emit(ENCODER_STEP, self.name, direction, timestamp)
+
+
+class InputManager:
+    """Debounced button and encoder events from GPIO edge callbacks, delivered through a queue."""
+
+    def __init__(self, maxsize=64):
+        """
+        Args:
+            maxsize (int): Queued events kept while nobody reads; newer events are dropped beyond this
+        """
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._handlers = []     # (pin, handler) registered with the pin table
+        self._buttons = []
+
+        # Counters
+        self.events = 0
+        self.bounces = 0        # edges rejected by the software debounce
+        self.dropped = 0        # events lost because the queue was full
+
+    def add_button(self, name, pin, debounce_ms=DEFAULT_BUTTON_DEBOUNCE_MS):
+        """
+        Watch an active-low button (internal pull-up).
+
+        Args:
+            name (str): Name carried by the button's events
+            pin (int): BCM pin
+            debounce_ms (float): Edges closer than this to the previous accepted edge are ignored;
+                the pin is read again when the interval ends and a missed transition is emitted then
+        """
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        button = _Button(self, name, pin, debounce_ms)
+        self._register(pin, button.on_edge)
+        self._buttons.append(button)
+        return button
+
+    def add_encoder(self, name, clk_pin, dt_pin, steps_per_detent=4, trace=None):
+        """
+        Watch a rotary encoder; edges on both pins go through a QuadratureDecoder.
+
+        Args:
+            name (str): Name carried by the encoder's events (one ENCODER_STEP per detent)
+            clk_pin (int): BCM pin of CLK (A)
+            dt_pin (int): BCM pin of DT (B)
+            steps_per_detent (int): Quarter steps per detent: 4 (full cycle) or 2 (half cycle)
+            trace (callable): Optional trace(timestamp, a, b) per edge, e.g. an EncoderTraceRecorder
+        """
+        GPIO.setup(clk_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        GPIO.setup(dt_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        encoder = _Encoder(self, name, clk_pin, dt_pin, steps_per_detent, trace)
+        self._register(clk_pin, encoder.on_edge)
+        self._register(dt_pin, encoder.on_edge)
+        return encoder
+
+    def _register(self, pin, handler):
+        _attach(pin, handler)
+        self._handlers.append((pin, handler))
+
+    def _emit(self, kind, name, value, timestamp):
+        try:
+            self.queue.put_nowait(InputEvent(kind, name, value, timestamp))
+            self.events += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout=None):
+        """
+        Next event, waiting up to `timeout` seconds (None: forever, 0: don't wait).
+
+        Returns:
+            InputEvent or None on timeout
+        """
+        try:
+            if timeout == 0:
+                return self.queue.get_nowait()
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self):
+        """All queued events, without waiting."""
+        events = []
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def wait_for(self, name, kind=BUTTON_PRESS, timeout=None):
+        """
+        Block until an event of `kind` from input `name` arrives. Other events are discarded.
+
+        Returns:
+            InputEvent, or None if `timeout` seconds passed first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            event = self.get(timeout=remaining)
+            if event is None:
+                return None
+            if event.name == name and event.kind == kind:
+                return event
+
+    def close(self):
+        """Stop receiving edges; pin edge detection is removed once no manager watches the pin."""
+        for pin, handler in self._handlers:
+            _detach(pin, handler)
+        self._handlers = []
+        for button in self._buttons:
+            button.close()
+        self._buttons = []
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Quadrature Decoder
+Table-driven decoding of a rotary encoder's A (CLK) / B (DT) signals plus velocity-based
+rotation acceleration.
+
+Every edge on either pin moves the 2-bit state (A << 1 | B) to a neighbouring state (a quarter
+step), back (contact bounce, cancels out) or to the opposite state (an edge was missed: counted
+as an error and taken as two quarter steps in the direction already under way). Detents are
+emitted when the encoder comes to rest, so bounces and single missed edges do not drop or
+double-count steps the way "read DT on a CLK edge" does.
+
+Recorded edge traces ("timestamp,a,b" per line, see EncoderTraceRecorder) can be replayed
+through the decoder offline:
+    python -m src.hardware.quadrature trace.csv [--steps-per-detent 4]
+"""
+
+import sys
+import argparse
+
+# (이전 상태 << 2 | 현재 상태) -> 1/4 스텝 이동량. None은 두 비트가 동시에 바뀐 무효 전이입니다.
+# 시계 방향 (A가 먼저 바뀜): 11 -> 01 -> 00 -> 10 -> 11
+_INVALID = None
+TRANSITIONS = (
+    0, -1, 1, _INVALID,     # 00 -> 00, 01, 10, 11
+    1, 0, _INVALID, -1,     # 01 -> 00, 01, 10, 11
+    -1, _INVALID, 0, 1,     # 10 -> 00, 01, 10, 11
+    _INVALID, 1, -1, 0,     # 11 -> 00, 01, 10, 11
+)
+
+# 디텐트 한 칸당 1/4 스텝 수 -> 정지(디텐트) 상태들
+REST_STATES = {4: (0b11,), 2: (0b11, 0b00), 1: (0b00, 0b01, 0b10, 0b11)}
+
+# (디텐트 간격 상한 s, 디텐트당 분) - 빠르게 돌릴수록 크게 이동합니다.
+DEFAULT_ACCELERATION = ((0.05, 30), (0.12, 10))
+
+
+class QuadratureDecoder:
+    """4-state transition-table decoder for one rotary encoder."""
+
+    def __init__(self, a=1, b=1, steps_per_detent=4):
+        """
+        Args:
+            a, b (int): Initial pin levels
+            steps_per_detent (int): Quarter steps per detent: 4 (full cycle), 2 (half cycle) or 1
+        """
+        if steps_per_detent not in REST_STATES:
+            raise ValueError(f"steps_per_detent must be one of {sorted(REST_STATES)}")
+        self.steps_per_detent = steps_per_detent
+        self.rest_states = REST_STATES[steps_per_detent]
+        self.state = (a << 1) | b
+        self.count = 0          # 1/4 스텝 누적 (현재 디텐트 안에서)
+
+        # Counters
+        self.transitions = 0
+        self.errors = 0         # invalid transitions (missed edges)
+        self.detents = 0
+
+    def update(self, a, b):
+        """
+        Feed the current pin levels after an edge.
+
+        Returns:
+            int: +1 / -1 when a detent is completed in that direction, else 0
+        """
+        new_state = (a << 1) | b
+        move = TRANSITIONS[(self.state << 2) | new_state]
+        self.state = new_state
+        if move is _INVALID:
+            self.errors += 1
+            if self.count == 0:
+                return 0  # 방향을 알 수 없음
+            # 엣지 하나를 놓친 것: 진행 중이던 방향으로 두 1/4 스텝 이동한 것으로 봅니다.
+            move = 2 if self.count > 0 else -2
+        if move == 0:
+            return 0
+        self.transitions += 1
+        self.count += move
+        if new_state not in self.rest_states:
+            return 0
+        # 정지 상태에 도달: 절반 이상 이동했으면 한 칸 (엣지 하나를 놓쳐도 인정)
+        count, self.count = self.count, 0
+        if 2 * abs(count) >= self.steps_per_detent:
+            self.detents += 1
+            return 1 if count > 0 else -1
+        return 0
+
+
+class RotationAccelerator:
+    """Scales detents by rotation speed: slow turns move base_step, fast spins 10-30 units."""
+
+    def __init__(self, base_step=5, profile=DEFAULT_ACCELERATION, smoothing=0.5, idle_sec=0.4):
+        """
+        Args:
+            base_step (int): Units per detent when turning slowly (e.g. 5 minutes)
+            profile (tuple): (max interval s, units per detent) pairs, fastest first
+            smoothing (float): Weight of the newest interval in the smoothed interval
+            idle_sec (float): A pause longer than this (or a direction change) restarts at base_step
+        """
+        self.base_step = base_step
+        self.profile = tuple(profile)
+        self.smoothing = smoothing
+        self.idle_sec = idle_sec
+        self.interval = None
+        self._last_time = None
+        self._last_direction = 0
+
+    def step(self, direction, timestamp):
+        """
+        Units to move for one detent in `direction` (+1/-1) completed at `timestamp` (s).
+
+        Returns:
+            int: Signed step size
+        """
+        if (self._last_time is None or direction != self._last_direction
+                or timestamp - self._last_time > self.idle_sec):
+            self.interval = None
+        else:
+            interval = timestamp - self._last_time
+            self.interval = interval if self.interval is None else \
+                self.smoothing * interval + (1 - self.smoothing) * self.interval
+        self._last_time = timestamp
+        self._last_direction = direction
+
+        size = self.base_step
+        if self.interval is not None:
+            for max_interval, units in self.profile:
+                if self.interval <= max_interval:
+                    size = max(units, self.base_step)
+                    break
+        return direction * size
+
+
+class EncoderTraceRecorder:
+    """Writes encoder edges as 'timestamp,a,b' lines for replay()."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+        self.file.write("timestamp,a,b\n")
+
+    def __call__(self, timestamp, a, b):
+        self.file.write(f"{timestamp:.6f},{a},{b}\n")
+
+    def close(self):
+        self.file.close()
+
+
+def load_trace(path):
+    """Read a recorded trace: list of (timestamp, a, b)."""
+    trace = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(('#', 'timestamp')):
+                continue
+            t, a, b = line.split(',')
+            trace.append((float(t), int(a), int(b)))
+    return trace
+
+
+def replay(trace, steps_per_detent=4, accelerator=None):
+    """
+    Run a recorded edge trace through a fresh decoder.
+
+    Args:
+        trace (iterable): (timestamp, a, b) per edge; the first entry gives the initial levels
+        steps_per_detent (int): As QuadratureDecoder
+        accelerator (RotationAccelerator): Optional, to also compute the accelerated movement
+
+    Returns:
+        dict: detents (net), steps (list of (timestamp, direction, size)), errors, transitions
+    """
+    trace = iter(trace)
+    first = next(trace, None)
+    if first is None:
+        return {'detents': 0, 'steps': [], 'errors': 0, 'transitions': 0}
+    decoder = QuadratureDecoder(first[1], first[2], steps_per_detent)
+    steps = []
+    for timestamp, a, b in trace:
+        direction = decoder.update(a, b)
+        if direction:
+            size = accelerator.step(direction, timestamp) if accelerator else direction
+            steps.append((timestamp, direction, size))
+    return {
+        'detents': sum(direction for _, direction, _ in steps),
+        'steps': steps,
+        'errors': decoder.errors,
+        'transitions': decoder.transitions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded rotary encoder edge trace')
+    parser.add_argument('trace', help='CSV file with timestamp,a,b lines')
+    parser.add_argument('--steps-per-detent', type=int, choices=sorted(REST_STATES), default=4,
+                        help='Quarter steps per detent (default: 4)')
+    parser.add_argument('--base-step', type=int, default=5,
+                        help='Minutes per slow detent for the acceleration report (default: 5)')
+    args = parser.parse_args()
+
+    result = replay(load_trace(args.trace), args.steps_per_detent, RotationAccelerator(args.base_step))
+    for timestamp, direction, size in result['steps']:
+        print(f"{timestamp:12.6f}  {'CW ' if direction > 0 else 'CCW'}  {size:+d}")
+    print(f"Detents: {result['detents']:+d} ({len(result['steps'])} steps), "
+          f"accelerated total: {sum(size for _, _, size in result['steps']):+d}, "
+          f"transitions: {result['transitions']}, errors: {result['errors']}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+EEG Stream Sinks
+Independent consumers attached to an EEGReader with EEGReader.add_sink().
+
+A sink overrides one or both hooks:
+  - on_chunk(view, arrival):   raw bytes of one serial read, as a memoryview that is only valid
+                               during the call (copy it if it must outlive the call)
+  - on_samples(samples, arrival): raw EEG samples decoded from that read (shared list, do not modify)
+The reader only calls hooks a sink actually overrides, and disabled sinks are removed from the
+call lists entirely, so they cost nothing. Wrap slow sinks in QueuedSink to run them on their
+own thread behind a bounded queue.
+"""
+import time
+import queue
+import struct
+import threading
+import numpy as np
+from scipy.signal import welch
+from typing import Optional, Callable, Iterator, Tuple
+from src.processing.feature_extract import delta, theta, alpha, sigma, beta, gamma
+
+
+class Sink:
+    """Base class for stream sinks."""
+    name = 'sink'
+
+    def __init__(self):
+        self.enabled = True
+
+    def on_chunk(self, view: memoryview, arrival: float):
+        pass
+
+    def on_samples(self, samples: list, arrival: float):
+        pass
+
+    def close(self):
+        pass
+
+    def hooks(self) -> set:
+        """Names of the hooks this sink overrides; the reader only calls these."""
+        return {hook for hook in ('on_chunk', 'on_samples')
+                if getattr(type(self), hook) is not getattr(Sink, hook)}
+
+
+class QueuedSink(Sink):
+    """
+    Runs a slow sink on its own thread
+
+    Chunks are copied into a bounded queue; when the inner sink falls behind, new items are
+    dropped (counted in `dropped`) instead of blocking the serial reader.
+    """
+
+    def __init__(self, inner: Sink, maxsize: int = 256):
+        super().__init__()
+        self.inner = inner
+        self.name = f'queued:{inner.name}'
+        self.queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self.thread.start()
+
+    def hooks(self) -> set:
+        return self.inner.hooks()
+
+    def on_chunk(self, view: memoryview, arrival: float):
+        self._put(('on_chunk', bytes(view), arrival))
+
+    def on_samples(self, samples: list, arrival: float):
+        self._put(('on_samples', samples, arrival))
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _worker_loop(self):
+        """(스레드에서 실행됨) 큐에서 꺼낸 항목을 내부 sink로 전달합니다."""
+        while self.running:
+            item = self.queue.get()
+            if item is None:
+                break
+            hook, payload, arrival = item
+            try:
+                if hook == 'on_chunk':
+                    self.inner.on_chunk(memoryview(payload), arrival)
+                else:
+                    self.inner.on_samples(payload, arrival)
+            except Exception as e:
+                print(f"Error in sink '{self.inner.name}': {e}")
+
+    def close(self):
+        self.running = False
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self.thread.join(timeout=1.0)
+        self.inner.close()
+
+
+class HexDumpSink(Sink):
+    """Prints every chunk as hex bytes (the old 'raw_hex' mode)."""
+    name = 'hexdump'
+
+    def on_chunk(self, view: memoryview, arrival: float):
+        now = time.time()
+        timestamp = time.strftime("%H:%M:%S", time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
+        print(f"[{timestamp}] {view.hex(' ').upper()}")
+
+
+RECORD_HEADER = struct.Struct('<dI')  # arrival (monotonic s), chunk length
+
+
+class RecorderSink(Sink):
+    """
+    Records the raw byte stream with arrival times so a session can be replayed later
+
+    File format: repeated [arrival: float64][length: uint32][bytes], little-endian.
+    """
+    name = 'recorder'
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.file = open(path, 'ab')
+        self.bytes_written = 0
+
+    def on_chunk(self, view: memoryview, arrival: float):
+        self.file.write(RECORD_HEADER.pack(arrival, len(view)))
+        self.file.write(view)
+        self.bytes_written += len(view)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            print(f"Recorded {self.bytes_written} bytes to {self.path}")
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, bytes]]:
+    """Yield (arrival, chunk) pairs from a RecorderSink file."""
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            arrival, length = RECORD_HEADER.unpack(header)
+            yield arrival, f.read(length)
+
+
+class StatsSink(Sink):
+    """Feeds AcquisitionStats (always attached by EEGReader)."""
+    name = 'stats'
+
+    def __init__(self, stats):
+        super().__init__()
+        self.stats = stats
+
+    def on_samples(self, samples: list, arrival: float):
+        self.stats.raw_samples += len(samples)
+
+    def on_chunk(self, view: memoryview, arrival: float):
+        # Chunk hooks run after sample hooks, so the sample count for this chunk is already in.
+        self.stats.record_chunk(len(view), arrival)
+
+
+class EpochSink(Sink):
+    """
+    Builds 30 s epochs with an EpochFeatureExtractor and reports each finished epoch
+
+    on_epoch(features, metadata) is called on the thread running the sink; features is None
+    for epochs rejected by the gap policy.
+    """
+    name = 'epoch'
+
+    def __init__(self, extractor, on_epoch: Callable):
+        super().__init__()
+        self.extractor = extractor
+        self.on_epoch = on_epoch
+
+    def on_samples(self, samples: list, arrival: float):
+        features, is_ready = self.extractor.add_chunk(samples, arrival)
+        if is_ready:
+            self.on_epoch(features, self.extractor.metadata)
+
+
+class BandPowerSink(Sink):
+    """
+    Live absolute and relative band power over a sliding window, updated every interval_sec
+
+    Welch PSD is moderately expensive; attach through QueuedSink.
+    """
+    name = 'bandpower'
+    BANDS = {'delta': delta, 'theta': theta, 'alpha': alpha, 'sigma': sigma, 'beta': beta, 'gamma': gamma}
+
+    def __init__(self, fs: int = 512, window_sec: int = 4, interval_sec: float = 1.0):
+        super().__init__()
+        self.fs = fs
+        self.interval_sec = interval_sec
+        self.ring = np.zeros(fs * window_sec, dtype=np.float32)
+        self.index = 0
+        self.filled = 0
+        self.latest: Optional[dict] = None
+        self._last_update = 0.0
+
+    def on_samples(self, samples: list, arrival: float):
+        values = np.asarray(samples, dtype=np.float32)
+        n = len(values)
+        size = len(self.ring)
+        if n >= size:
+            self.ring[:] = values[-size:]
+            self.index = 0
+        else:
+            end = self.index + n
+            if end <= size:
+                self.ring[self.index:end] = values
+            else:
+                split = size - self.index
+                self.ring[self.index:] = values[:split]
+                self.ring[:end - size] = values[split:]
+            self.index = end % size
+        self.filled = min(size, self.filled + n)
+        if self.filled == size and arrival - self._last_update >= self.interval_sec:
+            self._last_update = arrival
+            self.latest = self._compute()
+
+    def _compute(self) -> dict:
+        data = np.concatenate((self.ring[self.index:], self.ring[:self.index]))
+        freqs, psd = welch(data, self.fs, nperseg=self.fs)
+        df = freqs[1] - freqs[0]
+        absolute = {name: float(psd[(freqs >= lo) & (freqs < hi)].sum() * df)
+                    for name, (lo, hi) in self.BANDS.items()}
+        total = sum(absolute.values()) or 1.0
+        return {'absolute': absolute,
+                'relative': {name: power / total for name, power in absolute.items()}}
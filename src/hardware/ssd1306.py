@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SSD1306 Display RAM
+Layout and addressing of the SSD1306's display RAM (GDDRAM), shared by the partial-update path
+(src/display/partial_update.py) and the fake displays (src/hardware/backend.py).
+
+The RAM is `height // 8` pages of `width` bytes. Byte (page, column) holds 8 vertical pixels:
+bit n is row page * 8 + n. In horizontal addressing mode, data bytes fill the window set by
+SET_COL_ADDR/SET_PAGE_ADDR column by column, then wrap to the next page of the window.
+"""
+
+import numpy as np
+
+SET_COL_ADDR = 0x21     # + start column, end column
+SET_PAGE_ADDR = 0x22    # + start page, end page
+DATA_PREFIX = 0x40      # I2C control byte: Co=0, D/C#=1 (display data follows)
+COMMAND_PREFIX = 0x80   # I2C control byte: Co=1, D/C#=0 (one command byte follows)
+
+_COMMAND_ARGS = {SET_COL_ADDR: 2, SET_PAGE_ADDR: 2}
+
+
+def pack_pages(image):
+    """
+    A 1-bit PIL image in display RAM layout.
+
+    Returns:
+        np.ndarray: uint8 array of shape (height // 8, width)
+    """
+    bits = np.asarray(image.convert('1'), dtype=bool)
+    height, width = bits.shape
+    packed = np.packbits(bits.reshape(height // 8, 8, width), axis=1, bitorder='little')
+    return packed.reshape(height // 8, width)
+
+
+def unpack_pages(pages):
+    """Display RAM bytes of shape (pages, width) as a 1-bit PIL image."""
+    from PIL import Image
+    pages = np.asarray(pages, dtype=np.uint8)
+    bits = np.unpackbits(pages[:, None, :], axis=1, bitorder='little')
+    return Image.fromarray(bits.reshape(-1, pages.shape[1]).astype(bool))
+
+
+class DisplayRAM:
+    """
+    Model of the controller's RAM in horizontal addressing mode: applies SET_COL_ADDR /
+    SET_PAGE_ADDR and data bytes the way the panel does, so fakes show what a real panel would.
+    """
+
+    def __init__(self, width=128, height=64):
+        self.width = width
+        self.pages = height // 8
+        self.ram = np.zeros((self.pages, width), dtype=np.uint8)
+        self.window = [0, width - 1, 0, self.pages - 1]   # col start, col end, page start, page end
+        self.column = 0
+        self.page = 0
+        self._pending = []   # command waiting for its arguments
+
+    def command(self, byte):
+        self._pending.append(byte)
+        code = self._pending[0]
+        if len(self._pending) <= _COMMAND_ARGS.get(code, 0):
+            return
+        if code == SET_COL_ADDR:
+            self.window[0:2] = self._pending[1:]
+            self.column = self.window[0]
+        elif code == SET_PAGE_ADDR:
+            self.window[2:4] = self._pending[1:]
+            self.page = self.window[2]
+        self._pending = []   # 그 밖의 명령(초기화 등)은 화면 내용과 무관하므로 무시합니다.
+
+    def data(self, data):
+        col_start, col_end, page_start, page_end = self.window
+        for byte in data:
+            self.ram[self.page, self.column] = byte
+            self.column += 1
+            if self.column > col_end:
+                self.column = col_start
+                self.page = page_start if self.page >= page_end else self.page + 1
+
+    def image(self):
+        """What the panel shows, as a 1-bit PIL image."""
+        return unpack_pages(self.ram)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Acquisition Statistics
+Always-on health counters for a ThinkGear stream (throughput, parser errors, sample gaps, queues).
+"""
+import time
+from typing import Optional, Callable, Dict
+
+NOMINAL_SAMPLE_RATE = 512  # TGAM raw EEG rate (Hz)
+
+
+class AcquisitionStats:
+    """
+    Cheap counters for one ThinkGear stream
+
+    The hot path only does integer additions (record_chunk once per serial read, raw_samples += 1
+    per sample); rates and ratios are computed when snapshot() is called, so this can stay on
+    permanently. Each caller reads its rates through its own named window, so a periodic log line
+    and the --stats printer do not reset each other's averaging interval. Parser-level counters
+    (checksum failures, resync bytes, ...) are read from the ThinkGearParser given at construction.
+    """
+
+    def __init__(self, parser=None, nominal_rate: int = NOMINAL_SAMPLE_RATE):
+        self.parser = parser
+        self.nominal_rate = nominal_rate
+        self.bytes = 0
+        self.chunks = 0
+        self.raw_samples = 0
+        self.malformed_raw = 0      # 0x80 values that were not 2 bytes long (dropped by the handlers)
+        self.max_sample_gap = 0.0   # longest time between chunks that carried raw samples (s)
+        self._last_sample_time: Optional[float] = None
+        self._samples_at_last_chunk = 0
+        self._queues: Dict[str, Callable[[], int]] = {}
+        self._started = time.monotonic()
+        self._windows: Dict[str, tuple] = {}  # window -> (time, bytes, packets, samples) at its last snapshot
+
+    def watch_queue(self, name: str, depth: Callable[[], int]):
+        """Report depth() under `name` in every snapshot (e.g. queue.qsize)."""
+        self._queues[name] = depth
+
+    def record_chunk(self, nbytes: int, now: float):
+        """
+        Account for one serial read. Call after the chunk has been parsed.
+
+        Args:
+            nbytes: Number of bytes read
+            now: time.monotonic() when the chunk arrived
+        """
+        self.bytes += nbytes
+        self.chunks += 1
+        if self.raw_samples != self._samples_at_last_chunk:
+            if self._last_sample_time is not None:
+                gap = now - self._last_sample_time
+                if gap > self.max_sample_gap:
+                    self.max_sample_gap = gap
+            self._last_sample_time = now
+            self._samples_at_last_chunk = self.raw_samples
+
+    def snapshot(self, window: str = 'default') -> dict:
+        """
+        Current counters plus rates averaged since the previous snapshot() of the same window
+
+        Args:
+            window: Name of the caller's rate window; the first snapshot of a window averages
+                since the stats were created
+
+        Returns:
+            dict: bytes_per_sec, packets_per_sec, samples_per_sec, sample_rate_ratio (vs 512 Hz),
+                  cumulative counters, max_sample_gap and queue depths
+        """
+        now = time.monotonic()
+        packets = self.parser.packets_ok if self.parser else 0
+        last_time, last_bytes, last_packets, last_samples = self._windows.get(window, (self._started, 0, 0, 0))
+        elapsed = max(now - last_time, 1e-6)
+        self._windows[window] = (now, self.bytes, packets, self.raw_samples)
+
+        samples_per_sec = (self.raw_samples - last_samples) / elapsed
+        snap = {
+            'uptime': now - self._started,
+            'bytes_per_sec': (self.bytes - last_bytes) / elapsed,
+            'packets_per_sec': (packets - last_packets) / elapsed,
+            'samples_per_sec': samples_per_sec,
+            'sample_rate_ratio': samples_per_sec / self.nominal_rate,
+            'bytes': self.bytes,
+            'packets': packets,
+            'raw_samples': self.raw_samples,
+            'malformed_raw': self.malformed_raw,
+            'max_sample_gap': self.max_sample_gap,
+            'queues': {name: depth() for name, depth in self._queues.items()},
+        }
+        if self.parser:
+            snap.update({
+                'checksum_failures': self.parser.checksum_failures,
+                'resync_bytes': self.parser.resync_bytes,
+                'oversized_payloads': self.parser.oversized_payloads,
+                'standby_packets': self.parser.standby_packets,
+            })
+        return snap
+
+    @staticmethod
+    def format(snap: dict) -> str:
+        """One-line summary of a snapshot() result for logs and the CLI."""
+        line = (f"{snap['bytes_per_sec']:.0f} B/s, {snap['packets_per_sec']:.0f} pkt/s, "
+                f"{snap['samples_per_sec']:.0f} samples/s ({snap['sample_rate_ratio'] * 100:.0f}% of nominal), "
+                f"max gap {snap['max_sample_gap'] * 1000:.0f} ms")
+        if 'checksum_failures' in snap:
+            line += (f", checksum fail {snap['checksum_failures']}, resync {snap['resync_bytes']} B, "
+                     f"oversized {snap['oversized_payloads']}")
+        if snap.get('malformed_raw'):
+            line += f", malformed raw {snap['malformed_raw']}"
+        if snap['queues']:
+            line += ', queues ' + ' '.join(f"{k}={v}" for k, v in snap['queues'].items())
+        return line
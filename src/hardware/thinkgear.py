@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+ThinkGear Protocol Parser
+Byte-level stream parser for NeuroSky ThinkGear (TGAM) packets.
+Kept free of serial/numpy imports so the threaded, asyncio and multi-device readers can share it.
+"""
+from enum import Enum
+from typing import Optional, Callable
+
+
+class ParserState(Enum):
+    """Parser states for ThinkGear packet decoding"""
+    NULL = 0x00
+    SYNC = 0x01              # Waiting for SYNC byte
+    SYNC_CHECK = 0x02        # Waiting for second SYNC byte
+    PAYLOAD_LENGTH = 0x03    # Waiting for payload length
+    PAYLOAD = 0x04           # Waiting for next payload byte
+    CHKSUM = 0x05           # Waiting for checksum byte
+    WAIT_HIGH = 0x06        # Waiting for high byte (2-byte raw)
+    WAIT_LOW = 0x07         # Waiting for low byte (2-byte raw)
+
+
+class ParserType(Enum):
+    """Parser types"""
+    PACKETS = 0x01
+    RAW_2BYTE = 0x02
+
+
+# ThinkGear Protocol Constants
+SYNC_BYTE = 0xAA
+EXCODE_BYTE = 0x55
+MAX_PAYLOAD_LENGTH = 169
+
+# Data codes (from ThinkGear protocol)
+CODE_RAW_SIGNAL = 0x80
+CODE_ATTENTION = 0x04
+CODE_MEDITATION = 0x05
+CODE_BLINK_STRENGTH = 0x16
+CODE_POOR_SIGNAL = 0x02
+CODE_EEG_POWER = 0x83
+
+
+class PacketEvent:
+    """
+    One decoded ThinkGear value delivered to subscribers
+
+    __slots__ keeps the record small and cheap to create; readers only build events for
+    codes that have subscribers. timestamp is the monotonic arrival time of the chunk.
+    """
+    __slots__ = ('code', 'value', 'timestamp')
+
+    def __init__(self, code: int, value, timestamp: float):
+        self.code = code
+        self.value = value
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"PacketEvent(code=0x{self.code:02X}, value={self.value!r}, timestamp={self.timestamp:.3f})"
+
+
+class ThinkGearParser:
+    """
+    ThinkGear Stream Parser
+    Based on NeuroSky's ThinkGearStreamParser.c implementation
+    """
+    
+    def __init__(self, parser_type: ParserType = ParserType.PACKETS, 
+                 data_handler: Optional[Callable] = None):
+        self.parser_type = parser_type
+        self.state = ParserState.SYNC if parser_type == ParserType.PACKETS else ParserState.WAIT_HIGH
+        self.data_handler = data_handler
+        
+        # Packet parsing variables
+        self.payload_length = 0
+        self.payload_bytes_received = 0
+        self.payload_sum = 0
+        self.payload = bytearray(MAX_PAYLOAD_LENGTH + 1)
+        # Multi-byte values are handed out as slices of this view; the payload buffer is reused
+        # for every packet, so nothing is copied.
+        self._payload_view = memoryview(self.payload)
+        self.checksum = 0
+        self.last_byte = 0
+
+        # Health counters (plain increments, read by AcquisitionStats)
+        self.bytes_total = 0
+        self.packets_ok = 0
+        self.checksum_failures = 0
+        self.resync_bytes = 0          # bytes discarded while hunting for SYNC SYNC
+        self.oversized_payloads = 0
+        self.standby_packets = 0
+        self.unrecognized_states = 0
+
+    def reset(self):
+        """Drop any partially received packet and wait for the next SYNC."""
+        self.state = ParserState.SYNC if self.parser_type == ParserType.PACKETS else ParserState.WAIT_HIGH
+        self.payload_length = 0
+        self.payload_bytes_received = 0
+        self.payload_sum = 0
+        self.last_byte = 0
+
+    def parse_chunk(self, data) -> int:
+        """
+        Parse a chunk of bytes read from the stream in one go
+
+        Args:
+            data: bytes, bytearray or memoryview holding the received bytes
+
+        Returns:
+            int: Number of packets completed successfully in this chunk
+        """
+        completed = 0
+        parse_byte = self.parse_byte
+        for byte in data:
+            if parse_byte(byte) == 1:
+                completed += 1
+        return completed
+        
+    def parse_byte(self, byte: int) -> int:
+        """
+        Parse a single byte according to ThinkGear protocol
+        
+        Args:
+            byte: Input byte to parse
+            
+        Returns:
+            int: Return value
+                 0 = normal operation
+                 1 = packet completed successfully
+                -1 = invalid parser
+                -2 = checksum failed
+                -3 = payload too long
+                -4 = standby mode
+                -5 = unrecognized state
+        """
+        return_value = 0
+        self.bytes_total += 1
+        
+        if self.state == ParserState.SYNC:
+            # Waiting for first SYNC byte
+            if byte == SYNC_BYTE:
+                self.state = ParserState.SYNC_CHECK
+            else:
+                self.resync_bytes += 1
+                
+        elif self.state == ParserState.SYNC_CHECK:
+            # Waiting for second SYNC byte
+            if byte == SYNC_BYTE:
+                self.state = ParserState.PAYLOAD_LENGTH
+            else:
+                self.state = ParserState.SYNC
+                self.resync_bytes += 2  # the lone SYNC byte and this one
+                
+        elif self.state == ParserState.PAYLOAD_LENGTH:
+            # Waiting for payload length
+            self.payload_length = byte
+            if self.payload_length > 170:
+                self.state = ParserState.SYNC
+                self.oversized_payloads += 1
+                return_value = -3
+            elif self.payload_length == 170:
+                self.standby_packets += 1
+                return_value = -4  # Standby mode
+            else:
+                self.payload_bytes_received = 0
+                self.payload_sum = 0
+                self.state = ParserState.PAYLOAD
+                
+        elif self.state == ParserState.PAYLOAD:
+            # Collecting payload bytes
+            self.payload[self.payload_bytes_received] = byte
+            self.payload_bytes_received += 1
+            self.payload_sum = (self.payload_sum + byte) & 0xFF
+            
+            if self.payload_bytes_received >= self.payload_length:
+                self.state = ParserState.CHKSUM
+                
+        elif self.state == ParserState.CHKSUM:
+            # Verify checksum
+            self.checksum = byte
+            self.state = ParserState.SYNC
+            
+            expected_checksum = (~self.payload_sum) & 0xFF
+            if self.checksum != expected_checksum:
+                self.checksum_failures += 1
+                return_value = -2
+            else:
+                self.packets_ok += 1
+                return_value = 1
+                self._parse_packet_payload()
+                
+        elif self.state == ParserState.WAIT_HIGH:
+            # Waiting for high byte of 2-byte raw value
+            if (byte & 0xC0) == 0x80:
+                self.state = ParserState.WAIT_LOW
+                
+        elif self.state == ParserState.WAIT_LOW:
+            # Waiting for low byte of 2-byte raw value
+            if (byte & 0xC0) == 0x40:
+                raw_value = (self.last_byte << 8) | byte
+                if self.data_handler:
+                    self.data_handler(0, CODE_RAW_SIGNAL, 2, raw_value)
+                self.packets_ok += 1
+                return_value = 1
+            self.state = ParserState.WAIT_HIGH
+            
+        else:
+            # Unrecognized state
+            self.state = ParserState.SYNC
+            self.unrecognized_states += 1
+            return_value = -5
+            
+        self.last_byte = byte
+        return return_value
+        
+    def _parse_packet_payload(self):
+        """
+        Parse the packet payload and extract data values
+
+        Values are passed to data_handler without copying the payload:
+          - single-byte codes (< 0x80) as an int
+          - 2-byte raw samples (0x80) as an unsigned 16-bit int, same as the RAW_2BYTE parser
+          - other multi-byte values as a memoryview into the reused payload buffer. The view is only
+            valid during the callback; use bytes(value) to keep it.
+        """
+        handler = self.data_handler
+        if handler is None:
+            return
+        payload = self.payload
+        length = self.payload_length
+
+        # Fast path: a TGAM raw packet is exactly [0x80, 0x02, high, low] (512 per second).
+        if length == 4 and payload[0] == CODE_RAW_SIGNAL and payload[1] == 2:
+            handler(0, CODE_RAW_SIGNAL, 2, (payload[2] << 8) | payload[3])
+            return
+
+        i = 0
+        while i < length:
+            extended_code_level = 0
+            
+            # Parse extended code bytes
+            while i < length and payload[i] == EXCODE_BYTE:
+                extended_code_level += 1
+                i += 1
+                
+            if i >= length:
+                break
+                
+            # Parse code
+            code = payload[i]
+            i += 1
+            
+            # Parse value length
+            if code >= 0x80:
+                if i >= length:
+                    break
+                num_bytes = payload[i]
+                i += 1
+            else:
+                num_bytes = 1
+                
+            # Extract value
+            if i + num_bytes > length:
+                break
+            if num_bytes == 1 and code < 0x80:
+                value = payload[i]
+            elif code == CODE_RAW_SIGNAL and num_bytes == 2:
+                value = (payload[i] << 8) | payload[i + 1]
+            else:
+                value = self._payload_view[i:i + num_bytes]
+            handler(extended_code_level, code, num_bytes, value)
+            i += num_bytes
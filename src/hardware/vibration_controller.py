@@ -6,8 +6,8 @@ Handles vibration motor control for the NeuroRise smart alarm system
 """
 
 import time
-import RPi.GPIO as GPIO
-
+from src.hardware.backend import GPIO
+from src.hardware.gpio_input import InputManager, BUTTON_PRESS
 
 
 class VibrationController:
@@ -22,6 +22,7 @@ class VibrationController:
         self.vibration_pin = vibration_pin
         self.reset_pin = reset_pin
         self.is_setup = False
+        self.inputs = None  # reset button events (edge callbacks)
         
     def setup_gpio(self):
         """Setup GPIO pins for vibration control"""
@@ -35,6 +36,8 @@ class VibrationController:
             
             # Initialize vibration as OFF
             GPIO.output(self.vibration_pin, GPIO.LOW)
+            self.inputs = InputManager()
+            self.inputs.add_button('reset', self.reset_pin)
             self.is_setup = True
             print(f"Vibration controller initialized - Pin {self.vibration_pin}")
     
@@ -50,19 +53,28 @@ class VibrationController:
         time.sleep(duration)
         GPIO.output(self.vibration_pin, GPIO.LOW)
     
-    def is_reset_pressed(self, last_state):
+    def is_reset_pressed(self, last_state=None):
         """
-        Check if reset button was pressed (falling edge detection)
+        Check if reset button was pressed since the last check (debounced press event)
         
         Args:
-            last_state: Previous button state
+            last_state: Unused, kept for compatibility with the polling version
             
         Returns:
             tuple: (current_state, was_pressed)
         """
-        current_state = GPIO.input(self.reset_pin)
-        was_pressed = (last_state == 1 and current_state == 0)
-        return current_state, was_pressed
+        self.setup_gpio()
+        was_pressed = self.inputs.wait_for('reset', BUTTON_PRESS, timeout=0) is not None
+        return GPIO.input(self.reset_pin), was_pressed
+
+    def wait_for_reset(self, timeout):
+        """
+        Block until the reset button is pressed or `timeout` seconds pass
+        
+        Returns:
+            bool: True if the button was pressed
+        """
+        return self.inputs.wait_for('reset', BUTTON_PRESS, timeout=timeout) is not None
     
     def start_alarm_vibration(self, vibrate_duration=1.0, pause_duration=0.2):
         """
@@ -78,49 +90,26 @@ class VibrationController:
         print("Vibration alarm starting... Press reset button to stop.")
         
         try:
-            alarm_active = True
-            last_reset_state = GPIO.input(self.reset_pin)
+            self.inputs.drain()  # 알람 전에 눌린 버튼은 무시합니다.
             
-            while alarm_active:
-                # Check reset button before starting vibration
-                current_reset_state, was_pressed = self.is_reset_pressed(last_reset_state)
-                if was_pressed:
-                    print("Reset button pressed - stopping alarm!")
-                    break
-                last_reset_state = current_reset_state
-                
+            while True:
                 # Start vibration
                 print("Vibrating...")
                 GPIO.output(self.vibration_pin, GPIO.HIGH)
                 
-                # Check for reset button during vibration (every 0.1s)
-                vibration_checks = int(vibrate_duration / 0.1)
-                for i in range(vibration_checks):
-                    time.sleep(0.1)
-                    current_reset_state, was_pressed = self.is_reset_pressed(last_reset_state)
-                    if was_pressed:
-                        print("Reset button pressed during vibration - stopping alarm!")
-                        alarm_active = False
-                        break
-                    last_reset_state = current_reset_state
-                
-                if not alarm_active:
+                # Wait for the reset button during vibration (returns on the press edge)
+                if self.wait_for_reset(vibrate_duration):
+                    print("Reset button pressed during vibration - stopping alarm!")
                     break
                 
                 # Stop vibration and pause
                 GPIO.output(self.vibration_pin, GPIO.LOW)
                 print("Pausing...")
                 
-                # Check for reset button during pause
-                pause_checks = int(pause_duration / 0.1)
-                for i in range(pause_checks):
-                    time.sleep(0.1)
-                    current_reset_state, was_pressed = self.is_reset_pressed(last_reset_state)
-                    if was_pressed:
-                        print("Reset button pressed during pause - stopping alarm!")
-                        alarm_active = False
-                        break
-                    last_reset_state = current_reset_state
+                # Wait for the reset button during pause
+                if self.wait_for_reset(pause_duration):
+                    print("Reset button pressed during pause - stopping alarm!")
+                    break
         
         except KeyboardInterrupt:
             print("\nAlarm interrupted by Ctrl+C")
@@ -140,6 +129,8 @@ class VibrationController:
         """Clean up GPIO resources"""
         if self.is_setup:
             GPIO.output(self.vibration_pin, GPIO.LOW)
+            self.inputs.close()
+            self.is_setup = False
             # Note: Don't call GPIO.cleanup() here as other modules might be using GPIO
 
 
@@ -154,6 +145,7 @@ def trigger_vibration_alarm(vibrate_duration=1.0, pause_duration=0.2):
     """
     controller = VibrationController()
     controller.start_alarm_vibration(vibrate_duration, pause_duration)
+    controller.cleanup()
 
 def vibrate_once(duration=1.0, pin=27):
     """
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Serial Link Watchdog
+Detects a stalled or dead EEG reader and reconnects it with bounded exponential backoff.
+"""
+import time
+import threading
+from typing import Optional
+
+
+class Backoff:
+    """Bounded exponential backoff: base, base*factor, base*factor^2, ... capped at max_delay."""
+
+    def __init__(self, base: float = 0.5, factor: float = 2.0, max_delay: float = 30.0):
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.attempts = 0
+
+    def next(self) -> float:
+        """Return the delay before the next attempt and advance the schedule."""
+        delay = min(self.max_delay, self.base * (self.factor ** self.attempts))
+        self.attempts += 1
+        return delay
+
+    def reset(self):
+        """Start again from the base delay (call after a successful attempt)."""
+        self.attempts = 0
+
+
+class SerialWatchdog:
+    """
+    Watches an EEGReader for stalled byte flow or a dead reader thread and recovers the link.
+
+    A Bluetooth dropout then costs the epoch in progress (an outage longer than the extractor's
+    max_fill_sec restarts it, see EEGReader.reconnect) instead of the rest of the wake window.
+    """
+
+    def __init__(self, reader, stall_timeout_ms: int = 2000, check_interval: float = 0.25,
+                 backoff: Optional[Backoff] = None):
+        """
+        Args:
+            reader: EEGReader to supervise (must already be connected and started)
+            stall_timeout_ms: No bytes for this long counts as a stalled link (default 2000 ms)
+            check_interval: Seconds between health checks (default 0.25 s)
+            backoff: Reconnect delay schedule (default 0.5 s doubling up to 30 s)
+        """
+        self.reader = reader
+        self.stall_timeout = stall_timeout_ms / 1000.0
+        self.check_interval = check_interval
+        self.backoff = backoff or Backoff()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+        # Outage reporting
+        self.outages = 0
+        self.last_recovery_sec: Optional[float] = None
+        self.total_downtime_sec = 0.0
+        self._outage_start: Optional[float] = None
+        self._reconnected_at: Optional[float] = None
+        self._retry_at: Optional[float] = None  # next reconnect while a reconnected port stays silent
+
+    def start(self):
+        """Start supervising the reader in a background thread."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self.thread.start()
+        print(f"Serial watchdog started (stall timeout {self.stall_timeout * 1000:.0f} ms)")
+
+    def stop(self):
+        """Stop supervising. Call this before stopping or disconnecting the reader on purpose."""
+        if not self.running:
+            return
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        print("Serial watchdog stopped.")
+
+    def _check_link(self) -> Optional[str]:
+        """Return a reason string if the link needs recovering, otherwise None."""
+        reader = self.reader
+        if reader.thread is None or not reader.thread.is_alive():
+            error = reader.link_error
+            return f"reader thread died ({error})" if error else "reader thread died"
+        last = reader.last_byte_time
+        if last is not None and time.monotonic() - last > self.stall_timeout:
+            return f"no bytes for {(time.monotonic() - last) * 1000:.0f} ms"
+        return None
+
+    def _watch_loop(self):
+        """(스레드에서 실행됨) 링크 상태를 주기적으로 검사하고 필요하면 재연결합니다."""
+        while self.running:
+            reason = self._check_link()
+            if reason is None:
+                self._confirm_recovery()
+            else:
+                self._recover(reason)
+            time.sleep(self.check_interval)
+
+    def _recover(self, reason: str):
+        """Reconnect the reader, waiting out the backoff schedule between failed attempts."""
+        if self._outage_start is None:
+            # The outage started when the last good byte arrived, not when we noticed it.
+            self._outage_start = self.reader.last_byte_time or time.monotonic()
+            self.outages += 1
+            print(f"[{time.strftime('%H:%M:%S')}] EEG link lost: {reason}. Reconnecting...")
+        elif self._reconnected_at is not None:
+            # 지난 재연결은 포트만 열리고 데이터가 오지 않았습니다 (Bluetooth SPP에서 흔한 상태).
+            # 열기에 실패한 경우와 같이 재시도 간격을 늘리고, 기다리는 동안 데이터가 오면
+            # _confirm_recovery()가 복구를 확인합니다. 간격 초기화는 그때만 합니다.
+            if self._retry_at is None:
+                delay = self.backoff.next()
+                print(f"Reconnected link is silent ({reason}). Retrying in {delay:.1f}s")
+                self._retry_at = time.monotonic() + delay
+            if time.monotonic() < self._retry_at:
+                return
+            self._retry_at = None
+
+        while self.running:
+            if self.reader.reconnect():
+                self._reconnected_at = time.monotonic()
+                return
+            delay = self.backoff.next()
+            print(f"Reconnect attempt {self.backoff.attempts} failed. Retrying in {delay:.1f}s")
+            self._wait(delay)
+
+    def _wait(self, delay: float):
+        """Sleep for delay seconds, returning early once stop() is called."""
+        end = time.monotonic() + delay
+        while self.running and time.monotonic() < end:
+            time.sleep(min(self.check_interval, end - time.monotonic()))
+
+    def _confirm_recovery(self):
+        """Report the outage once data is flowing again after a reconnect."""
+        if self._outage_start is None or self._reconnected_at is None:
+            return
+        last = self.reader.last_byte_time
+        if last is None or last <= self._reconnected_at:
+            return
+        self.last_recovery_sec = last - self._outage_start
+        self.total_downtime_sec += self.last_recovery_sec
+        print(f"[{time.strftime('%H:%M:%S')}] EEG link recovered after {self.last_recovery_sec:.1f}s "
+              f"(outages: {self.outages})")
+        self._outage_start = None
+        self._reconnected_at = None
+        self._retry_at = None
+        self.backoff.reset()
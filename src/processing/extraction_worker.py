@@ -0,0 +1,220 @@
+"""
+Feature Extraction Worker Process
+Runs exfeature() in a separate process so NumPy/SciPy filtering and yasa never hold the GIL of the
+process that runs the serial reader and the GPIO/OLED threads.
+
+Epochs are passed through a multiprocessing.shared_memory ring of `slots` float32 epoch slots:
+the reader copies a finished epoch into a free slot and sends only a small descriptor
+(epoch id, slot, length, fs, extract options) over a pipe. The worker computes features straight from the shared
+slot and sends the feature list back; the slot is returned to the free list when the result
+arrives. When every slot is busy the worker is behind, and submit() refuses the epoch instead of
+queueing more work. If the worker process dies, the next start() or submit() releases its ring,
+pipe and result thread and starts a fresh one; epochs that were in flight are counted as lost.
+"""
+import time
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Optional, Callable
+import numpy as np
+from src.processing.feature_extract import exfeature
+
+
+def _worker_main(conn, shm_name, slots, epoch_samples, extract):
+    """(워커 프로세스에서 실행됨) 디스크립터를 받아 공유 메모리의 epoch에서 특징을 추출합니다."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # 공유 메모리의 해제(unlink)는 만든 쪽(리더 프로세스)이 담당합니다.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    ring = np.ndarray((slots, epoch_samples), dtype=np.float32, buffer=shm.buf)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            epoch_id, slot, n, fs, options = message
+            start = time.perf_counter()
+            try:
+                features, error = extract(ring[slot, :n], fs, **options), None
+            except Exception as e:
+                features, error = None, repr(e)
+            # 추출에 걸린 시간만 (대기/전송 시간 제외) 워커 안에서 잽니다.
+            conn.send((epoch_id, slot, features, error, time.perf_counter() - start))
+    finally:
+        del ring
+        shm.close()
+
+
+class ExtractionWorker:
+    """
+    One feature-extraction process fed through a shared-memory epoch ring
+
+    Usage:
+        worker = ExtractionWorker(512 * 30, on_result=callback)
+        worker.start()
+        worker.submit(epoch_array, context)   # callback(features, context, error) later
+        worker.close()
+    """
+
+    def __init__(self, epoch_samples: int, fs: int = 512, slots: int = 2,
+                 extract: Callable = exfeature, on_result: Optional[Callable] = None):
+        """
+        Args:
+            epoch_samples: Samples per epoch (slot size)
+            fs: Sampling frequency passed to extract
+            slots: Epochs that may be in flight at once
+            extract: Module-level function extract(data, fs, **options) -> features (must be picklable)
+            on_result: Called on the result thread as on_result(features, context, error);
+                last_compute / last_queue already hold this epoch's times when it runs
+        """
+        self.epoch_samples = epoch_samples
+        self.fs = fs
+        self.slots = slots
+        self.extract = extract
+        self.on_result = on_result
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.ring: Optional[np.ndarray] = None
+        self.process = None
+        self.conn = None
+        self.thread: Optional[threading.Thread] = None
+        self.pending = {}           # epoch id -> (context, submitted at)
+        self._free_slots = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        # Counters
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0            # no free slot: worker still busy with earlier epochs
+        self.errors = 0
+        self.restarts = 0
+        self.lost = 0               # epochs in flight when the worker process died
+        self.last_latency: Optional[float] = None   # submit -> result (s)
+        self.last_compute: Optional[float] = None   # time spent in extract, measured in the worker (s)
+        self.last_queue: Optional[float] = None     # submit -> result minus extract: queue wait, pickling, pipe (s)
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """
+        Create the shared ring and start the worker process (no-op if already running).
+
+        A worker whose process has died is released first, and the free slots and pending map
+        start empty again, so the slots held by its unfinished epochs are not lost for good.
+        """
+        if self.running:
+            return
+        if self.process is not None:
+            lost = len(self.pending)
+            print(f"Feature extraction worker exited (code {self.process.exitcode}); "
+                  f"restarting, {lost} epoch(s) in flight lost")
+            self._release()
+            self.restarts += 1
+            self.lost += lost
+        ctx = mp.get_context('spawn')  # 리더/GPIO 스레드가 있는 프로세스를 fork하지 않습니다.
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * self.epoch_samples * 4)
+        self.ring = np.ndarray((self.slots, self.epoch_samples), dtype=np.float32, buffer=self.shm.buf)
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.shm.name, self.slots, self.epoch_samples, self.extract),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self._free_slots = list(range(self.slots))
+        self.pending = {}
+        self.thread = threading.Thread(target=self._result_loop, daemon=True)
+        self.thread.start()
+        print(f"Feature extraction worker started (pid {self.process.pid}, {self.slots} slots)")
+
+    def submit(self, data, context=None, options=None) -> bool:
+        """
+        Copy one epoch into a free slot and hand it to the worker.
+
+        Args:
+            data: Raw epoch samples
+            context: Returned unchanged to on_result
+            options (dict): Extra keyword arguments for extract (e.g. the governor tier)
+
+        Returns:
+            bool: False if the worker is not running or every slot is still in use
+        """
+        if not self.running:
+            if self.process is None:
+                return False
+            self.start()  # 워커 프로세스가 죽었습니다: 새로 띄우고 슬롯을 초기화합니다.
+        with self._lock:
+            if not self._free_slots:
+                self.dropped += 1
+                return False
+            slot = self._free_slots.pop()
+            self._next_id += 1
+            epoch_id = self._next_id
+            self.pending[epoch_id] = (context, time.perf_counter())
+        n = min(len(data), self.epoch_samples)
+        self.ring[slot, :n] = data[:n]
+        self.submitted += 1
+        self.conn.send((epoch_id, slot, n, self.fs, options or {}))
+        return True
+
+    def _result_loop(self):
+        """(스레드에서 실행됨) 워커가 보낸 결과를 받아 슬롯을 반납하고 콜백을 호출합니다."""
+        while True:
+            try:
+                epoch_id, slot, features, error, compute_time = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                self._free_slots.append(slot)
+                context, submitted_at = self.pending.pop(epoch_id, (None, None))
+            self.completed += 1
+            self.last_compute = compute_time
+            if submitted_at is not None:
+                self.last_latency = time.perf_counter() - submitted_at
+                self.last_queue = max(self.last_latency - compute_time, 0.0)
+            if error:
+                self.errors += 1
+            if self.on_result:
+                try:
+                    self.on_result(features, context, error)
+                except Exception as e:
+                    print(f"Error in extraction result callback: {e}")
+
+    def close(self):
+        """Stop the worker process and release the shared ring."""
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5.0)
+        self._release()
+        print("Feature extraction worker stopped.")
+
+    def _release(self):
+        """Stop the process if it is still alive, then free the pipe, result thread and shared ring."""
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.ring = None
+        self.shm.close()
+        self.shm.unlink()
+        self.process = None
+        self.conn = None
+        self.thread = None
+        with self._lock:
+            self._free_slots = []
+            self.pending = {}
@@ -14,18 +14,23 @@ gamma = [30,49.5]
 Kcomplex = [0.5,1]
 bands = [delta,theta,alpha,sigma,beta,gamma,Kcomplex]
 
+FEATURES_PER_BAND = 7
+
+def band_features(band_data,fs=512):
+    pfd = utils.petrosian_fd(band_data) #petrosian fractal dimension
+    SE = utils.spectral_entropy(band_data,fs)
+    SD = utils.standard_deviation(band_data)
+    HA = utils.hjorth_activity(band_data)
+    HM = utils.hjorth_mobility(band_data)
+    HC = utils.hjorth_complexity(band_data)
+    LRSSV = utils.lrssv(band_data)
+    return [pfd,SE,SD,HA,HM,HC,LRSSV]
+
 def exfeature(data,fs=512):
     features = []
     for band in bands:
         band_data = utils.filter_bandpass(data, band, fs)
-        pfd = utils.petrosian_fd(band_data) #petrosian fractal dimension
-        SE = utils.spectral_entropy(band_data,fs)
-        SD = utils.standard_deviation(band_data)
-        HA = utils.hjorth_activity(band_data)
-        HM = utils.hjorth_mobility(band_data)
-        HC = utils.hjorth_complexity(band_data)
-        LRSSV = utils.lrssv(band_data)
-        features.extend([pfd,SE,SD,HA,HM,HC,LRSSV])
+        features.extend(band_features(band_data,fs))
     spindles = yasa.spindles_detect(data,sf=1000)
     if spindles is not None:
         num_spindle = len(spindles.summary())
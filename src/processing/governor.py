@@ -0,0 +1,160 @@
+"""
+Compute Governor
+Chooses how much feature-extraction work each epoch gets, so extraction keeps up with the stream
+on slow boards (Pi Zero): it measures every epoch's extraction time against a deadline, steps down
+to a cheaper tier when it runs late and back up after a run of epochs with headroom.
+
+Tiers, most to least expensive. Every raw tier keeps the exfeature() layout (7 bands x 7 features
++ spindle flag); values a tier does not compute are set to fill_value (NaN). The full-feature
+model was trained on full-tier features only, so SmartAlarm does not decide on the degraded raw
+tiers (DEGRADED_TIERS): it uses the TGAM light model for those epochs when there is one.
+The governor is off unless a deadline is given (--deadline).
+  full           exfeature()
+  no_spindle     skip yasa spindle detection
+  decimate       no spindles, band features computed at fs/2
+  reduced_bands  as decimate, but only the bands the model relies on most
+  tgam           no raw-signal DSP at all; the TGAM on-chip features and light model are used
+"""
+import numpy as np
+from scipy.signal import decimate
+import src.processing.signal_processing as utils
+from src.processing.feature_extract import exfeature, band_features, bands, FEATURES_PER_BAND
+from src.processing.tgam_features import TIER_FULL, TIER_TGAM
+
+TIER_NO_SPINDLE = 'no_spindle'
+TIER_DECIMATE = 'decimate'
+TIER_REDUCED_BANDS = 'reduced_bands'
+TIERS = (TIER_FULL, TIER_NO_SPINDLE, TIER_DECIMATE, TIER_REDUCED_BANDS, TIER_TGAM)
+RAW_TIERS = TIERS[:-1]
+DEGRADED_TIERS = RAW_TIERS[1:]   # features the full-tier model was not trained on
+
+DEFAULT_DEADLINE_SEC = 15.0   # half an epoch: leaves time for the model and the next epoch
+DEFAULT_KEEP_BANDS = (0, 1, 2, 3)  # delta, theta, alpha, sigma
+
+
+def extract_tier(data, fs=512, tier=TIER_FULL, keep_bands=DEFAULT_KEEP_BANDS, fill_value=np.nan):
+    """
+    Extract epoch features at the given tier.
+
+    Args:
+        data (np.ndarray): Raw epoch
+        fs (int): Sampling frequency
+        tier (str): One of RAW_TIERS
+        keep_bands (iterable): Band indices computed in the reduced_bands tier
+        fill_value (float): Value for features the tier skips
+
+    Returns:
+        list: 7 * len(bands) + 1 values in exfeature() order
+    """
+    if tier == TIER_FULL:
+        return exfeature(data, fs)
+    if tier not in RAW_TIERS:
+        raise ValueError(f"Tier '{tier}' has no raw-signal features")
+
+    x = np.asarray(data, dtype=np.float64)
+    rate, numtaps = fs, 101
+    if tier in (TIER_DECIMATE, TIER_REDUCED_BANDS):
+        # 절반 샘플링에서 같은 전이 대역폭을 유지하도록 FIR 길이도 절반으로 줄입니다.
+        x = decimate(x, 2, ftype='fir', zero_phase=True)
+        rate, numtaps = fs // 2, 51
+
+    features = []
+    for i, band in enumerate(bands):
+        if tier == TIER_REDUCED_BANDS and i not in keep_bands:
+            features.extend([fill_value] * FEATURES_PER_BAND)
+            continue
+        band_data = utils.filter_bandpass(x, band, rate, numtaps=numtaps)
+        features.extend(band_features(band_data, rate))
+    features.append(fill_value)  # spindle detection skipped
+    return features
+
+
+def final_estimator(model):
+    """The last step of a scikit-learn Pipeline (nested pipelines included), or the model itself."""
+    while getattr(model, 'steps', None):
+        model = model.steps[-1][1]
+    return model
+
+
+def bands_by_importance(model, keep=len(DEFAULT_KEEP_BANDS)):
+    """
+    Band indices the model relies on most, from feature_importances_ summed per band.
+
+    The shipped classifier is a Pipeline (scaler + XGBClassifier); the importances are read from
+    its final estimator, whose features are in exfeature() order (the scaler does not reorder them).
+
+    Returns:
+        tuple: `keep` band indices, or DEFAULT_KEEP_BANDS if the model has no usable importances
+    """
+    importances = getattr(final_estimator(model), 'feature_importances_', None)
+    if importances is None or len(importances) < len(bands) * FEATURES_PER_BAND:
+        return DEFAULT_KEEP_BANDS
+    per_band = np.asarray(importances[:len(bands) * FEATURES_PER_BAND]).reshape(len(bands), FEATURES_PER_BAND).sum(axis=1)
+    return tuple(sorted(int(i) for i in np.argsort(per_band)[::-1][:keep]))
+
+
+class ComputeGovernor:
+    """Deadline-driven tier selection for epoch feature extraction."""
+
+    def __init__(self, deadline_sec=DEFAULT_DEADLINE_SEC, tiers=TIERS, headroom=0.5, patience=3,
+                 keep_bands=DEFAULT_KEEP_BANDS):
+        """
+        Args:
+            deadline_sec (float): Extraction time allowed per epoch (s)
+            tiers (iterable): Tiers to use, most expensive first (leave out tgam without a TGAM model)
+            headroom (float): Step up after `patience` epochs faster than headroom * deadline
+            patience (int): Consecutive fast epochs needed before stepping up
+            keep_bands (iterable): Bands computed in the reduced_bands tier (see bands_by_importance)
+        """
+        self.deadline_sec = deadline_sec
+        self.tiers = [tier for tier in TIERS if tier in tiers]
+        self.headroom = headroom
+        self.patience = patience
+        self.keep_bands = tuple(keep_bands)
+        self.level = 0
+        self.costs = {}         # tier -> last measured extraction time (s)
+        self.late_epochs = 0
+        self.changes = 0
+        self._fast_streak = 0
+
+    @property
+    def tier(self):
+        return self.tiers[self.level]
+
+    def options(self):
+        """Keyword arguments for extract_tier() at the current tier."""
+        return {'tier': self.tier, 'keep_bands': self.keep_bands}
+
+    def record(self, tier, elapsed):
+        """
+        Account for one epoch extracted at `tier` in `elapsed` seconds and adjust the tier.
+
+        Returns:
+            str: The tier to use for the next epoch
+        """
+        self.costs[tier] = elapsed
+        if tier != self.tier:
+            return self.tier  # 티어가 바뀌기 전에 제출된 epoch의 결과
+
+        if elapsed > self.deadline_sec:
+            self.late_epochs += 1
+            self._fast_streak = 0
+            if self.level < len(self.tiers) - 1:
+                self._set_level(self.level + 1, f"{elapsed:.1f}s > deadline {self.deadline_sec:.1f}s")
+        elif self.level > 0 and elapsed < self.headroom * self.deadline_sec:
+            self._fast_streak += 1
+            upper_cost = self.costs.get(self.tiers[self.level - 1])
+            # 위 티어가 마지막에 마감을 넘겼다면 더 오래 여유가 있을 때만 다시 시도합니다.
+            needed = self.patience if upper_cost is None or upper_cost <= self.deadline_sec else self.patience * 4
+            if self._fast_streak >= needed:
+                self._set_level(self.level - 1, f"{elapsed:.1f}s with {needed} fast epochs")
+        else:
+            self._fast_streak = 0
+        return self.tier
+
+    def _set_level(self, level, reason):
+        previous = self.tier
+        self.level = level
+        self.changes += 1
+        self._fast_streak = 0
+        print(f"Compute governor: {previous} -> {self.tier} ({reason})")
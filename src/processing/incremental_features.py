@@ -0,0 +1,175 @@
+"""
+Incremental Epoch Features
+Computes the exfeature() band features from 5 s sub-blocks as samples arrive, so closing a 30 s
+epoch only merges partial statistics instead of filtering 15,360 samples seven times at once.
+
+Per band, every block is filtered and reduced to mergeable partial statistics:
+  - filtering: filter_bandpass() applies the FIR forward and backward (filtfilt). That is the same
+    as one pass of the 201-tap zero-phase kernel conv(h, h[::-1]) over the odd-extended epoch, so
+    the kernel is run causally with lfilter state carried between blocks (output delayed by 200
+    samples). The odd extension needs x[1..100] at the start and the last 101 samples at close;
+    the interior of the epoch is not affected by filtfilt's own padding, so the filtered signal
+    matches filter_bandpass() to rounding error.
+  - moments: count, mean and M2 of x, dx and ddx merged with Chan's parallel update (std, Hjorth)
+  - sum of dx^2 (LRSSV) and sign changes of dx (Petrosian FD), carried across block edges
+  - Welch PSD: every complete 256-sample segment (step 128) is averaged as soon as it is filled
+
+Spindle detection (yasa) needs the whole epoch and still runs at close.
+"""
+import numpy as np
+import yasa
+from scipy.signal import firwin, lfilter, welch
+from src.processing.feature_extract import bands
+
+NPERSEG = 256   # scipy.signal.welch defaults used by spectral_entropy()
+STEP = NPERSEG // 2
+
+
+def _merge_moments(n, mean, m2, block):
+    """Merge the count/mean/M2 of `block` into running moments (Chan et al.)."""
+    nb = len(block)
+    if nb == 0:
+        return n, mean, m2
+    mean_b = float(block.mean())
+    m2_b = float(((block - mean_b) ** 2).sum())
+    total = n + nb
+    delta = mean_b - mean
+    return total, mean + delta * nb / total, m2 + m2_b + delta * delta * n * nb / total
+
+
+class _BandAccumulator:
+    """Streaming band-pass filter plus the partial statistics of one band."""
+
+    def __init__(self, band, fs, numtaps=101):
+        nyq = 0.5 * fs
+        taps = firwin(numtaps, [band[0] / nyq, band[1] / nyq], pass_zero=False, window='blackman')
+        self.kernel = np.convolve(taps, taps[::-1])   # filtfilt == one pass of this kernel
+        self.edge = numtaps - 1                       # odd-extension length needed on each side
+        self.fs = fs
+        self.reset()
+
+    def reset(self):
+        self.zi = np.zeros(len(self.kernel) - 1)
+        self.skip = 2 * self.edge     # outputs before sample 0 of the epoch
+        self.x = (0, 0.0, 0.0)        # (n, mean, M2)
+        self.dx = (0, 0.0, 0.0)
+        self.ddx = (0, 0.0, 0.0)
+        self.dx_sumsq = 0.0
+        self.zero_crossings = 0
+        self.last_x = None
+        self.last_dx = None
+        self.psd_sum = None
+        self.segments = 0
+        self.segment_tail = np.empty(0)
+
+    def feed(self, ext):
+        """Filter the next stretch of the (extended) input and accumulate its statistics."""
+        y, self.zi = lfilter(self.kernel, 1.0, ext, zi=self.zi)
+        if self.skip:
+            drop = min(self.skip, len(y))
+            y = y[drop:]
+            self.skip -= drop
+        if len(y):
+            self._accumulate(y)
+
+    def _accumulate(self, y):
+        self.x = _merge_moments(*self.x, y)
+
+        dx = np.diff(y) if self.last_x is None else np.diff(y, prepend=self.last_x)
+        self.last_x = y[-1]
+        if len(dx):
+            self.dx = _merge_moments(*self.dx, dx)
+            self.dx_sumsq += float(np.dot(dx, dx))
+            sign = np.signbit(dx)
+            self.zero_crossings += int(np.count_nonzero(sign[1:] != sign[:-1]))
+            if self.last_dx is not None and np.signbit(self.last_dx) != sign[0]:
+                self.zero_crossings += 1
+            ddx = np.diff(dx) if self.last_dx is None else np.diff(dx, prepend=self.last_dx)
+            self.last_dx = dx[-1]
+            self.ddx = _merge_moments(*self.ddx, ddx)
+
+        # 완성된 Welch 세그먼트만 평균에 더하고 나머지는 다음 블록으로 넘깁니다.
+        tail = np.concatenate((self.segment_tail, y)) if len(self.segment_tail) else y
+        if len(tail) >= NPERSEG:
+            count = (len(tail) - NPERSEG) // STEP + 1
+            _, psd = welch(tail[:(count - 1) * STEP + NPERSEG], self.fs, nperseg=NPERSEG, noverlap=STEP)
+            self.psd_sum = psd * count if self.psd_sum is None else self.psd_sum + psd * count
+            self.segments += count
+            tail = tail[count * STEP:]
+        self.segment_tail = tail
+
+    def features(self):
+        """[pfd, SE, SD, HA, HM, HC, LRSSV] as in exfeature()."""
+        n, _, m2 = self.x
+        n_dx, _, m2_dx = self.dx
+        n_ddx, _, m2_ddx = self.ddx
+        pfd = np.log10(n) / (np.log10(n) + np.log10(n / (n + 0.4 * self.zero_crossings)))
+        psd_norm = self.psd_sum / self.psd_sum.sum()
+        se = -(psd_norm * np.log2(psd_norm)).sum() / np.log2(len(psd_norm))
+        sd = np.sqrt(m2 / (n - 1))
+        ha = m2 / n
+        hm = np.sqrt(m2_dx / n_dx) / np.sqrt(ha)
+        hc = np.sqrt(m2_ddx / n_ddx) / np.sqrt(m2_dx / n_dx) / hm
+        lrssv = np.log10(np.sqrt(self.dx_sumsq))
+        return [pfd, se, sd, ha, hm, hc, lrssv]
+
+
+class IncrementalFeatures:
+    """
+    exfeature() computed block by block over one epoch
+
+    Usage:
+        inc = IncrementalFeatures(fs=512)
+        for block in blocks:          # e.g. 5 s each; the first must hold at least 101 samples
+            inc.add(block)
+        features = inc.finalize(epoch_data)   # merge + spindle detection; resets for the next epoch
+    """
+
+    def __init__(self, fs=512, numtaps=101):
+        self.fs = fs
+        self.bands = [_BandAccumulator(band, fs, numtaps) for band in bands]
+        self.edge = numtaps - 1
+        self.samples = 0
+
+    def reset(self):
+        """Discard the partial statistics (epoch abandoned)."""
+        for band in self.bands:
+            band.reset()
+        self.samples = 0
+
+    def add(self, block):
+        """Filter one sub-block of raw samples and fold it into the partial statistics."""
+        x = np.asarray(block, dtype=np.float64)
+        if self.samples == 0:
+            if len(x) <= self.edge:
+                raise ValueError(f"First block must hold more than {self.edge} samples")
+            # filtfilt의 odd extension: 2*x[0] - x[edge..1]
+            x = np.concatenate((2 * x[0] - x[self.edge:0:-1], x))
+        for band in self.bands:
+            band.feed(x)
+        self.samples += len(block)
+
+    def finalize(self, data):
+        """
+        Close the epoch: flush the filter tails, merge the band statistics and detect spindles.
+
+        Args:
+            data (np.ndarray): The whole raw epoch (the samples passed to add(), in order)
+
+        Returns:
+            list: Same features, in the same order, as exfeature(data, fs)
+        """
+        x = np.asarray(data, dtype=np.float64)
+        # filtfilt의 odd extension: 2*x[-1] - x[-2..-(edge+1)]
+        tail = 2 * x[-1] - x[-2:-(self.edge + 2):-1]
+        features = []
+        for band in self.bands:
+            band.feed(tail)
+            features.extend(band.features())
+            band.reset()
+        self.samples = 0
+
+        spindles = yasa.spindles_detect(data, sf=1000)
+        yesspindle = 1 if spindles is not None and len(spindles.summary()) > 0 else 0
+        features.append(yesspindle)
+        return features
@@ -0,0 +1,98 @@
+"""
+Signal Quality Tracking
+Rolling statistics over the TGAM poor-signal value (0 = good ... 200 = no contact, one per second).
+
+Every update is O(1): the window keeps a running bad count and sum, and the window maximum comes
+from a monotonic deque, so nothing rescans the window. Alongside the sliding window, the same
+updates accumulate per-epoch totals that close_epoch() turns into a quality score for the epoch.
+"""
+from collections import deque
+
+NO_CONTACT = 200  # poor signal value when the electrodes are off the skin
+
+
+class RollingQuality:
+    """Sliding-window and per-epoch poor-signal statistics with O(1) updates."""
+
+    def __init__(self, window=30, bad_threshold=0):
+        """
+        Args:
+            window (int): Window length in poor-signal updates (seconds on TGAM)
+            bad_threshold (int): Values above this count as bad (0: any noise is bad)
+        """
+        self.window = window
+        self.bad_threshold = bad_threshold
+        self.values = deque()
+        self.bad_count = 0
+        self.total = 0
+        self._max_candidates = deque()  # decreasing values; the front is the window max
+        self._epoch = self._new_epoch()
+
+    @staticmethod
+    def _new_epoch():
+        return {'samples': 0, 'bad': 0, 'total': 0, 'max': 0}
+
+    def add(self, quality):
+        """Add one poor-signal value, evicting the oldest once the window is full."""
+        if len(self.values) == self.window:
+            oldest = self.values.popleft()
+            self.total -= oldest
+            if oldest > self.bad_threshold:
+                self.bad_count -= 1
+            if self._max_candidates[0] == oldest:
+                self._max_candidates.popleft()
+        self.values.append(quality)
+        self.total += quality
+        if quality > self.bad_threshold:
+            self.bad_count += 1
+        while self._max_candidates and self._max_candidates[-1] < quality:
+            self._max_candidates.pop()
+        self._max_candidates.append(quality)
+
+        epoch = self._epoch
+        epoch['samples'] += 1
+        epoch['total'] += quality
+        if quality > self.bad_threshold:
+            epoch['bad'] += 1
+        if quality > epoch['max']:
+            epoch['max'] = quality
+
+    @property
+    def count(self):
+        return len(self.values)
+
+    @property
+    def is_full(self):
+        return len(self.values) == self.window
+
+    @property
+    def mean(self):
+        return self.total / len(self.values) if self.values else 0.0
+
+    @property
+    def max(self):
+        return self._max_candidates[0] if self._max_candidates else 0
+
+    def close_epoch(self):
+        """
+        Summarise the updates since the previous call and start a new epoch.
+
+        Returns:
+            dict: samples, bad, bad_fraction, mean, max and score. score is in [0, 1]:
+                  (1 - bad_fraction) * (1 - mean / 200), 1.0 for a clean epoch, 0.0 with no data
+                  or no contact for the whole epoch.
+        """
+        epoch, self._epoch = self._epoch, self._new_epoch()
+        samples = epoch['samples']
+        if samples == 0:
+            return {'samples': 0, 'bad': 0, 'bad_fraction': 1.0, 'mean': None, 'max': None, 'score': 0.0}
+        bad_fraction = epoch['bad'] / samples
+        mean = epoch['total'] / samples
+        return {
+            'samples': samples,
+            'bad': epoch['bad'],
+            'bad_fraction': bad_fraction,
+            'mean': mean,
+            'max': epoch['max'],
+            'score': max(0.0, (1.0 - bad_fraction) * (1.0 - mean / NO_CONTACT)),
+        }
@@ -0,0 +1,148 @@
+"""
+TGAM On-Chip Features
+Band powers (code 0x83) and eSense values computed by the TGAM chip itself, as a cheap feature tier.
+
+Once per second the headset sends a packet with poor signal (0x02), eight EEG band powers
+(0x83, 3 bytes each, big-endian, unitless), attention (0x04) and meditation (0x05); blink
+strength (0x16) arrives on its own when a blink is detected. TGAMSeries turns these into a
+per-second series and aggregates it over an epoch into a short feature vector that a light model
+can use instead of exfeature() when the CPU is constrained or the full pipeline runs late.
+"""
+import math
+from collections import deque
+from src.processing.quality import NO_CONTACT
+
+# Feature tiers
+TIER_FULL = 'full'    # exfeature() on the raw 512 Hz epoch
+TIER_TGAM = 'tgam'    # on-chip band powers and eSense only (no raw-signal DSP)
+FEATURE_TIERS = (TIER_FULL, TIER_TGAM)
+
+EEG_POWER_BANDS = ('delta', 'theta', 'low_alpha', 'high_alpha',
+                   'low_beta', 'high_beta', 'low_gamma', 'mid_gamma')
+
+TGAM_FEATURE_NAMES = (
+    [f'log_{band}' for band in EEG_POWER_BANDS]
+    + [f'rel_{band}' for band in EEG_POWER_BANDS]
+    + ['attention_mean', 'attention_std', 'meditation_mean', 'meditation_std',
+       'poor_signal_mean', 'blinks', 'seconds']
+)
+
+
+def decode_eeg_power(value):
+    """
+    Decode a 0x83 value into the eight band powers.
+
+    Args:
+        value: 24 bytes (bytes, bytearray or memoryview), 3 big-endian bytes per band
+
+    Returns:
+        tuple: Eight ints in EEG_POWER_BANDS order
+    """
+    return tuple((value[i] << 16) | (value[i + 1] << 8) | value[i + 2] for i in range(0, 24, 3))
+
+
+class TGAMSecond:
+    """One row of the per-second series; values missing from that second stay None."""
+    __slots__ = ('timestamp', 'power', 'attention', 'meditation', 'poor_signal', 'blinks')
+
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+        self.power = None
+        self.attention = None
+        self.meditation = None
+        self.poor_signal = None
+        self.blinks = 0
+
+
+class TGAMSeries:
+    """
+    Per-second series of TGAM on-chip values with per-epoch aggregation
+
+    Values that arrive within `merge_window` seconds of each other (one eSense packet, possibly
+    split over two serial reads) go into the same row. Timestamps are the chunk arrival times
+    (time.monotonic()), the same clock as the epoch metadata, so aggregate() can be called with
+    an epoch's start_time/end_time.
+    """
+
+    def __init__(self, max_seconds=120, merge_window=0.5, min_seconds=10):
+        """
+        Args:
+            max_seconds (int): Rows kept (two 30 s epochs by default plus slack)
+            merge_window (float): Values closer than this (s) belong to the same row
+            min_seconds (int): Usable rows an epoch needs before aggregate() returns features
+        """
+        self.rows = deque(maxlen=max_seconds)
+        self.merge_window = merge_window
+        self.min_seconds = min_seconds
+        self._pending_blinks = 0
+
+    def _row(self, timestamp):
+        if self.rows and timestamp - self.rows[-1].timestamp <= self.merge_window:
+            return self.rows[-1]
+        row = TGAMSecond(timestamp)
+        row.blinks, self._pending_blinks = self._pending_blinks, 0
+        self.rows.append(row)
+        return row
+
+    def on_poor_signal(self, value, timestamp):
+        self._row(timestamp).poor_signal = value
+
+    def on_eeg_power(self, powers, timestamp):
+        self._row(timestamp).power = powers
+
+    def on_attention(self, value, timestamp):
+        self._row(timestamp).attention = value
+
+    def on_meditation(self, value, timestamp):
+        self._row(timestamp).meditation = value
+
+    def on_blink(self, value, timestamp):
+        # 깜빡임은 eSense 패킷 사이에 따로 오므로 다음 행에 합산합니다.
+        self._pending_blinks += 1
+
+    def aggregate(self, start_time, end_time):
+        """
+        Aggregate the rows with start_time < timestamp <= end_time into one feature vector.
+
+        Rows flagged as no-contact (poor signal 200) and rows without band powers are skipped for
+        the band and eSense statistics; they still count towards poor_signal_mean and blinks.
+
+        Returns:
+            list: Floats in TGAM_FEATURE_NAMES order, or None if fewer than min_seconds usable rows
+        """
+        if start_time is None or end_time is None:
+            return None
+        rows = [row for row in self.rows if start_time < row.timestamp <= end_time]
+        usable = [row for row in rows
+                  if row.power is not None and (row.poor_signal or 0) < NO_CONTACT]
+        if len(usable) < self.min_seconds:
+            return None
+
+        n_bands = len(EEG_POWER_BANDS)
+        log_power = [0.0] * n_bands
+        rel_power = [0.0] * n_bands
+        for row in usable:
+            total = sum(row.power) or 1
+            for b, power in enumerate(row.power):
+                log_power[b] += math.log10(power + 1)
+                rel_power[b] += power / total
+        n = len(usable)
+
+        attention_mean, attention_std = _mean_std([row.attention for row in usable])
+        meditation_mean, meditation_std = _mean_std([row.meditation for row in usable])
+        poor = [row.poor_signal for row in rows if row.poor_signal is not None]
+        return ([value / n for value in log_power]
+                + [value / n for value in rel_power]
+                + [attention_mean, attention_std, meditation_mean, meditation_std,
+                   sum(poor) / len(poor) if poor else 0.0,
+                   float(sum(row.blinks for row in rows)),
+                   float(n)])
+
+
+def _mean_std(values):
+    """Mean and population standard deviation of the non-None values (0.0, 0.0 if none)."""
+    values = [v for v in values if v is not None]
+    if not values:
+        return 0.0, 0.0
+    mean = sum(values) / len(values)
+    return mean, math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
@@ -0,0 +1,94 @@
+"""
+Sample Timing Reconstruction
+Detects lost samples and sampling-rate drift in the raw EEG stream from chunk arrival times.
+
+TGAM raw packets carry no sequence number or timestamp, so the only timing information is when
+each serial chunk arrived (time.monotonic()). SampleClock compares that against the number of
+samples received at the nominal 512 Hz: Bluetooth jitter and slow clock drift are absorbed by a
+slowly tracked baseline lag, while a sudden jump above gap_threshold is reported as missing samples.
+"""
+
+# 갭 처리 정책
+GAP_INTERPOLATE = 'interpolate'   # 앞뒤 샘플 사이를 선형 보간
+GAP_ZERO_FILL = 'zero_fill'       # 0으로 채움
+GAP_REJECT = 'reject'             # 갭이 포함된 epoch 전체를 폐기
+GAP_POLICIES = (GAP_INTERPOLATE, GAP_ZERO_FILL, GAP_REJECT)
+
+
+class SampleClock:
+    """Reconstructs the sample timeline of one stream from chunk arrival times."""
+
+    def __init__(self, fs=512, gap_threshold=0.5, tau=10.0):
+        """
+        Args:
+            fs (int): Nominal sampling frequency (512 Hz for TGAM)
+            gap_threshold (float): Lag jump (s) above the baseline that counts as lost samples
+            tau (float): Time constant (s) of the baseline lag tracker (absorbs jitter and drift)
+        """
+        self.fs = fs
+        self.gap_threshold = gap_threshold
+        self.tau = tau
+        self.t0 = None              # arrival time of sample 0 (estimated)
+        self.last_arrival = None
+        self.samples = 0            # samples on the timeline (received + reconstructed)
+        self.baseline_lag = 0.0
+        self.gaps = 0
+        self.missing_total = 0
+
+    def on_chunk(self, arrival, n_samples):
+        """
+        Account for a chunk carrying n_samples raw samples.
+
+        Args:
+            arrival (float): time.monotonic() when the chunk was read
+            n_samples (int): Raw samples decoded from the chunk (> 0)
+
+        Returns:
+            int: Samples missing before this chunk (0 if none)
+        """
+        if self.t0 is None:
+            self.t0 = arrival - n_samples / self.fs
+            self.last_arrival = arrival
+            self.samples = n_samples
+            return 0
+
+        lag = arrival - (self.t0 + (self.samples + n_samples) / self.fs)
+        excess = lag - self.baseline_lag
+        missing = 0
+        if excess > self.gap_threshold:
+            missing = int(round(excess * self.fs))
+            self.gaps += 1
+            self.missing_total += missing
+        else:
+            # 지터와 클럭 드리프트는 기준 지연(baseline lag)이 천천히 따라가며 흡수합니다.
+            alpha = min(1.0, (arrival - self.last_arrival) / self.tau)
+            self.baseline_lag += alpha * (lag - self.baseline_lag)
+
+        self.samples += n_samples + missing
+        self.last_arrival = arrival
+        return missing
+
+    @property
+    def rate(self):
+        """Measured sampling rate (Hz) over the whole stream, gaps included."""
+        if self.t0 is None or self.last_arrival <= self.t0:
+            return float(self.fs)
+        return self.samples / (self.last_arrival - self.t0)
+
+    @property
+    def drift_ppm(self):
+        """Deviation of the measured rate from nominal, in parts per million."""
+        return (self.rate / self.fs - 1.0) * 1e6
+
+
+def fill_values(policy, missing, last_value, next_value):
+    """
+    Values to insert for `missing` lost samples under interpolate/zero-fill policies.
+
+    Returns:
+        list: `missing` reconstructed samples (zeros for GAP_ZERO_FILL and GAP_REJECT)
+    """
+    if policy == GAP_INTERPOLATE and last_value is not None:
+        step = (next_value - last_value) / (missing + 1)
+        return [last_value + step * (i + 1) for i in range(missing)]
+    return [0.0] * missing
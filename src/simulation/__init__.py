@@ -0,0 +1 @@
+# Off-device Simulation Module
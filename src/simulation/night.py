@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Whole-Night Simulation
+Runs SmartAlarm through a full night on a virtual clock (src/alarm/clock.py), with a synthetic or
+replayed ThinkGear byte stream and the fake GPIO/OLED backends, so an 8-hour night takes seconds
+to tens of seconds of CPU instead of a night of sleep.
+
+What is real: the alarm loop, the OLED time setter drawing into the fake display, the ThinkGear
+parser, the sinks, epoch assembly, the artifact gate, feature extraction (inline) and the compute
+governor. What is simulated: time, the serial link (SimulatedEEGReader feeds bytes on the clock's
+ticks instead of reading a port) and, unless --model is given, the classifier: ScriptedModel
+returns the hypnogram stage of each epoch, so the run checks the alarm decisions themselves.
+
+Stages follow SmartAlarm: 1 is light sleep (the stage that triggers the alarm in the window).
+The synthetic EEG uses 0 = wake, 1 = light, 2 = deep, 3 = REM for its signal profiles.
+
+Usage:
+    python -m src.simulation.night [--bedtime 23:00 --wake 07:00 --window 30]
+                                   [--hypnogram "15:0,20:1,35:2,15:1,20:3"] [--recording eeg.rec]
+                                   [--expect-reason light_sleep --expect-after 06:40 --expect-before 06:50]
+"""
+
+import os
+os.environ.setdefault('BRAINALARM_HW', 'fake')  # 하드웨어 모듈을 import하기 전에 설정해야 합니다.
+
+import io
+import sys
+import time
+import datetime
+import argparse
+import resource
+import contextlib
+import numpy as np
+from src.alarm.clock import VirtualClock, KST
+from src.alarm.smart_alarm import SmartAlarm, PREROLL_SEC
+from src.hardware.eeg import EEGReader
+from src.hardware.sinks import read_recording
+from src.hardware.thinkgear import CODE_RAW_SIGNAL, CODE_POOR_SIGNAL, CODE_ATTENTION, CODE_MEDITATION, CODE_EEG_POWER
+from src.processing.timing import GAP_INTERPOLATE
+from src.processing.tgam_features import TIER_FULL
+from src.processing.artifact_gate import ARTIFACT_POLICIES, ARTIFACT_REJECT
+from src.processing.governor import DEFAULT_DEADLINE_SEC
+
+FS = 512
+
+STAGE_WAKE, STAGE_LIGHT, STAGE_DEEP, STAGE_REM = 0, 1, 2, 3
+
+# 단계별 합성 신호: (주파수 Hz, 진폭) 성분 + 가우시안 잡음 표준편차 (raw 단위)
+STAGE_PROFILES = {
+    STAGE_WAKE: {'components': ((10.0, 25.0), (20.0, 12.0)), 'noise': 12.0, 'spindles': False},
+    STAGE_LIGHT: {'components': ((6.0, 35.0), (9.0, 10.0)), 'noise': 12.0, 'spindles': True},
+    STAGE_DEEP: {'components': ((1.5, 120.0), (0.8, 60.0)), 'noise': 12.0, 'spindles': False},
+    STAGE_REM: {'components': ((5.0, 30.0), (18.0, 10.0)), 'noise': 12.0, 'spindles': False},
+}
+
+# TGAM EEG power 대역 경계 (Hz): delta, theta, low/high alpha, low/high beta, low/mid gamma
+_POWER_EDGES = (0.5, 4, 8, 10, 13, 18, 30, 41, 50)
+
+
+class Hypnogram:
+    """Sleep stages over the night as (minutes, stage) segments from bedtime."""
+
+    def __init__(self, segments):
+        self.segments = [(float(minutes), int(stage)) for minutes, stage in segments]
+        self._ends = np.cumsum([minutes * 60 for minutes, _ in self.segments])
+
+    def stage_at(self, seconds):
+        """Stage `seconds` after bedtime (the last stage continues past the end)."""
+        index = int(np.searchsorted(self._ends, seconds, side='right'))
+        return self.segments[min(index, len(self.segments) - 1)][1]
+
+    @classmethod
+    def parse(cls, text):
+        """'minutes:stage,minutes:stage,...'"""
+        return cls([tuple(part.split(':')) for part in text.split(',') if part.strip()])
+
+    @classmethod
+    def default(cls, hours=9.0, cycle=((20, STAGE_LIGHT), (35, STAGE_DEEP), (15, STAGE_LIGHT), (20, STAGE_REM))):
+        """15 min awake, then 90-minute light/deep/light/REM cycles."""
+        segments = [(15, STAGE_WAKE)]
+        total = 15
+        while total < hours * 60:
+            for minutes, stage in cycle:
+                segments.append((minutes, stage))
+                total += minutes
+        return cls(segments)
+
+
+def _packet(payload):
+    return bytes([0xAA, 0xAA, len(payload)]) + bytes(payload) + bytes([(~sum(payload)) & 0xFF])
+
+
+def _raw_packets(samples):
+    """One 8-byte raw-value packet per sample, built with numpy."""
+    u = samples.astype(np.int32) & 0xFFFF
+    hi, lo = u >> 8, u & 0xFF
+    packets = np.empty((len(u), 8), dtype=np.uint8)
+    packets[:, 0] = packets[:, 1] = 0xAA
+    packets[:, 2] = 4
+    packets[:, 3] = CODE_RAW_SIGNAL
+    packets[:, 4] = 2
+    packets[:, 5] = hi
+    packets[:, 6] = lo
+    packets[:, 7] = ~(CODE_RAW_SIGNAL + 2 + hi + lo) & 0xFF
+    return packets.tobytes()
+
+
+class SyntheticEEG:
+    """
+    ThinkGear byte stream whose raw signal follows the hypnogram: per chunk_sec, the raw packets of
+    that stretch, and once per second a poor-signal/eSense/EEG-power packet.
+    """
+
+    def __init__(self, hypnogram, origin, chunk_sec=0.25, poor_signal=0, seed=0):
+        """
+        Args:
+            hypnogram (Hypnogram): Stage schedule
+            origin (float): Clock monotonic() at bedtime
+            chunk_sec (float): Stream time per serial chunk
+            poor_signal (int): Poor-signal value reported every second (0 = good contact)
+        """
+        self.hypnogram = hypnogram
+        self.origin = origin
+        self.chunk_sec = chunk_sec
+        self.poor_signal = poor_signal
+        self.rng = np.random.default_rng(seed)
+        self.next_arrival = None
+
+    def _samples(self, start_sec, n, stage):
+        profile = STAGE_PROFILES.get(stage, STAGE_PROFILES[STAGE_WAKE])
+        t = start_sec + np.arange(n) / FS
+        x = self.rng.normal(0.0, profile['noise'], n)
+        for freq, amp in profile['components']:
+            x += amp * np.sin(2 * np.pi * freq * t)
+        if profile['spindles']:
+            # 8초마다 1초짜리 13 Hz 방추파
+            envelope = np.clip(np.sin(np.pi * ((t % 8.0) - 3.0)), 0.0, None) * ((t % 8.0 >= 3.0) & (t % 8.0 < 4.0))
+            x += 30.0 * envelope * np.sin(2 * np.pi * 13.0 * t)
+        return np.clip(np.round(x), -2048, 2047)
+
+    @staticmethod
+    def _power_payload(stage):
+        profile = STAGE_PROFILES.get(stage, STAGE_PROFILES[STAGE_WAKE])
+        powers = [1000] * 8
+        for freq, amp in profile['components']:
+            band = int(np.searchsorted(_POWER_EDGES, freq, side='right')) - 1
+            if 0 <= band < 8:
+                powers[band] += int(amp * amp * 100)
+        payload = [CODE_EEG_POWER, 24]
+        for power in powers:
+            power = min(power, 0xFFFFFF)
+            payload += [(power >> 16) & 0xFF, (power >> 8) & 0xFF, power & 0xFF]
+        return payload
+
+    def read(self, since, until):
+        """(arrival, chunk) pairs for the chunks arriving in (since, until]."""
+        if self.next_arrival is None or self.next_arrival <= since:
+            self.next_arrival = since + self.chunk_sec  # (재)시작: 스트림을 지금부터 이어갑니다.
+        chunks = []
+        n = int(round(self.chunk_sec * FS))
+        while self.next_arrival <= until:
+            arrival = self.next_arrival
+            start_sec = arrival - self.chunk_sec - self.origin
+            stage = self.hypnogram.stage_at(start_sec)
+            data = _raw_packets(self._samples(start_sec, n, stage))
+            if int(arrival - self.origin) != int(start_sec):
+                # 매초 한 번: 신호 품질, eSense, 대역 파워
+                data += _packet([CODE_POOR_SIGNAL, self.poor_signal, CODE_ATTENTION, 50,
+                                 CODE_MEDITATION, 60] + self._power_payload(stage))
+            chunks.append((arrival, data))
+            self.next_arrival += self.chunk_sec
+        return chunks
+
+
+class RecordingSource:
+    """Replays a RecorderSink file (see src/hardware/sinks.py) on the virtual clock, looping."""
+
+    def __init__(self, path):
+        self.path = path
+        self._records = None
+        self._offset = None
+        self._pending = None
+        self.loops = 0
+
+    def _next_record(self):
+        while True:
+            if self._records is None:
+                self._records = read_recording(self.path)
+            record = next(self._records, None)
+            if record is not None:
+                return record
+            self._records = None
+            self.loops += 1
+            if self.loops > 1 and self._offset is None:
+                raise ValueError(f"Recording {self.path} is empty")
+
+    def read(self, since, until):
+        """(arrival, chunk) pairs for the chunks arriving in (since, until], arrivals mapped onto the clock."""
+        chunks = []
+        while True:
+            if self._pending is None:
+                self._pending = self._next_record()
+            arrival, data = self._pending
+            if self._offset is None or arrival + self._offset <= since:
+                # 처음 시작하거나, 재시작이거나, 녹음이 처음으로 되돌아간 경우: since 직후로 맞춥니다.
+                self._offset = since + 0.01 - arrival
+            mapped = arrival + self._offset
+            if mapped > until:
+                return chunks
+            chunks.append((mapped, data))
+            self._pending = None
+
+
+class SimulatedEEGReader(EEGReader):
+    """EEGReader fed from a simulated byte source on the clock's ticks instead of a serial port."""
+
+    def __init__(self, clock, source, **kwargs):
+        kwargs['port'] = 'simulated'
+        super().__init__(**kwargs)
+        self.clock = clock
+        self.source = source
+        self.connects = 0
+        self._fed_until = None
+
+    def connect(self) -> bool:
+        self.connects += 1
+        print(f"Connected to simulated EEG stream ({type(self.source).__name__})")
+        return True
+
+    def disconnect(self):
+        print("Disconnected from simulated EEG stream")
+
+    def start(self, mode: str = 'parsed'):
+        if self.running:
+            print("Monitoring is already running.")
+            return
+        self.set_sink_enabled(self.hexdump_sink, mode == 'raw_hex')
+        self.mode = mode
+        if self.extraction_worker:
+            self.extraction_worker.start()
+        self.link_error = None
+        self.last_byte_time = self._fed_until = self.clock.monotonic()
+        self.running = True
+        self.clock.add_ticker(self._advance)
+        print(f"Simulated EEG stream started in '{mode}' mode")
+
+    def _advance(self, now):
+        """(clock tick) Parse and dispatch the chunks that arrived since the last tick."""
+        for arrival, data in self.source.read(self._fed_until, now):
+            self.last_byte_time = arrival
+            self.parser.parse_chunk(data)
+            self._dispatch_chunk(data, arrival)
+        self._fed_until = now
+
+    def _halt_thread(self):
+        self.running = False
+        self.clock.remove_ticker(self._advance)
+
+
+class ScriptedModel:
+    """Stand-in classifier: the hypnogram stage at the middle of the reader's last epoch."""
+
+    def __init__(self, hypnogram, origin):
+        self.hypnogram = hypnogram
+        self.origin = origin
+        self.reader = None   # set once SmartAlarm has built the reader
+
+    def predict(self, X):
+        meta = self.reader.epoch_metadata or {}
+        start, end = meta.get('start_time'), meta.get('end_time')
+        middle = (start + end) / 2 if start is not None and end is not None else end
+        return np.array([self.hypnogram.stage_at(middle - self.origin)])
+
+
+class _NoWatchdog:
+    """The simulated link never stalls; SmartAlarm only needs the watchdog's interface."""
+    running = False
+    outages = 0
+    last_recovery_sec = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class _NullDisplay:
+    """Display stand-in for measuring the alarm logic without OLED rendering."""
+    interface_mode = 'CLOCK'
+
+    def update_display(self):
+        pass
+
+
+class _CpuMeter:
+    """(clock ticker) Process CPU time spent per simulated hour."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.hours = []
+        self._hour_start = clock.monotonic()
+        self._cpu_start = time.process_time()
+
+    def __call__(self, now):
+        if now - self._hour_start >= 3600:
+            self.close()
+
+    def close(self):
+        cpu = time.process_time()
+        simulated = self.clock.monotonic() - self._hour_start
+        if simulated > 0:
+            self.hours.append({'start': self.clock.start + datetime.timedelta(seconds=self._hour_start - self.clock.origin),
+                               'simulated_sec': simulated, 'cpu_sec': cpu - self._cpu_start})
+        self._hour_start = self.clock.monotonic()
+        self._cpu_start = cpu
+
+
+def _percentiles(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'count': len(values), 'p50': float(p50), 'p90': float(p90), 'p99': float(p99),
+            'max': float(max(values))}
+
+
+def run_night(bedtime, wake_time, window_min=30, hypnogram=None, source=None, model=None,
+              tgam_model=None, preroll_sec=PREROLL_SEC, display=True, deadline=0,
+              artifact_policy=ARTIFACT_REJECT, incremental=False, tick=1.0, quiet=True):
+    """
+    Simulate one night of SmartAlarm.
+
+    Args:
+        bedtime (datetime): KST-aware start of the simulation
+        wake_time (datetime): KST-aware target wake time
+        window_min (int): Wake window before wake_time (minutes)
+        hypnogram (Hypnogram): Stage schedule (default Hypnogram.default())
+        source: Byte source with read(since, until) (default SyntheticEEG of the hypnogram)
+        model: Classifier with predict() (default ScriptedModel of the hypnogram)
+        display (bool): Draw into the fake OLED through OLEDTimeSetter (False: no rendering)
+        tick (float): Virtual seconds per clock step
+        quiet (bool): Discard the alarm's console output
+
+    Returns:
+        dict: alarm_time, alarm_reason, predictions, raw_samples, cpu per simulated hour, peak RSS,
+              epoch-close-to-decision latency and extraction time percentiles (real s)
+    """
+    clock = VirtualClock(bedtime, tick=tick)
+    origin = clock.monotonic()
+    hypnogram = hypnogram or Hypnogram.default((wake_time - bedtime).total_seconds() / 3600 + 1)
+    source = source or SyntheticEEG(hypnogram, origin)
+    scripted = model is None
+    if scripted:
+        model = ScriptedModel(hypnogram, origin)
+    args = argparse.Namespace(port='simulated', baudrate=57600, gap_policy=GAP_INTERPOLATE,
+                              feature_tier=TIER_FULL, artifact_policy=artifact_policy,
+                              isolate_extraction=False, incremental=incremental, deadline=deadline)
+    start_time = wake_time - datetime.timedelta(minutes=window_min)
+    alarms = []
+
+    output = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        if display:
+            from src.display.oled_time_setter2 import OLEDTimeSetter
+            oled = OLEDTimeSetter(wake_time, clock=clock)
+        else:
+            oled = _NullDisplay()
+        alarm = SmartAlarm(model, start_time, wake_time, window_min, args, oled,
+                           preroll_sec=preroll_sec, tgam_model=tgam_model, clock=clock,
+                           eeg_reader_factory=lambda **kwargs: SimulatedEEGReader(clock, source, **kwargs),
+                           watchdog=_NoWatchdog(), alarm_action=lambda: alarms.append(clock.now()))
+        if scripted:
+            model.reader = alarm.eeg_reader
+        meter = _CpuMeter(clock)
+        clock.add_ticker(meter)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        alarm.start()
+        alarm.join()
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        meter.close()
+
+    stats = alarm.eeg_reader.get_stats('simulation')
+    hours = [h for h in meter.hours if h['simulated_sec'] >= 60]
+    return {
+        'alarm_time': alarm.alarm_time,
+        'alarm_reason': alarm.alarm_reason,
+        'alarms': len(alarms),
+        'start_time': start_time,
+        'wake_time': wake_time,
+        'predictions': alarm.predictions,
+        'raw_samples': stats['raw_samples'],
+        'simulated_sec': clock.elapsed,
+        'wall_sec': wall,
+        'cpu_sec': cpu,
+        'cpu_per_hour': hours,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'decision_latency': _percentiles(p['decision_sec'] for p in alarm.predictions),
+        'extract_time': _percentiles(p['extract_sec'] for p in alarm.predictions),
+        'frames': oled.frames.snapshot() if display else None,
+        'log': output.getvalue() if quiet else None,
+    }
+
+
+def check_expectations(report, after=None, before=None, reason=None):
+    """
+    Compare the simulated alarm with expectations.
+
+    Args:
+        after, before (datetime): The alarm must fire in [after, before]
+        reason (str): Expected alarm_reason ('light_sleep' or 'wake_time')
+
+    Returns:
+        list: Failure messages (empty when every expectation holds)
+    """
+    failures = []
+    fired = report['alarm_time']
+    if fired is None:
+        return ["alarm never fired"]
+    if report['alarms'] != 1:
+        failures.append(f"alarm fired {report['alarms']} times")
+    if after is not None and fired < after:
+        failures.append(f"alarm at {fired:%H:%M:%S}, expected after {after:%H:%M:%S}")
+    if before is not None and fired > before:
+        failures.append(f"alarm at {fired:%H:%M:%S}, expected before {before:%H:%M:%S}")
+    if reason is not None and report['alarm_reason'] != reason:
+        failures.append(f"alarm reason {report['alarm_reason']}, expected {reason}")
+    return failures
+
+
+def print_report(report):
+    fired = report['alarm_time']
+    alarm = f"{fired:%H:%M:%S} ({report['alarm_reason']})" if fired else 'never'
+    print("=" * 60)
+    print(f"Window {report['start_time']:%H:%M} - {report['wake_time']:%H:%M}, alarm: {alarm}")
+    print(f"Simulated {report['simulated_sec'] / 3600:.2f} h in {report['wall_sec']:.1f} s wall, "
+          f"{report['cpu_sec']:.1f} s CPU ({report['simulated_sec'] / max(report['wall_sec'], 1e-9):.0f}x real time)")
+    print(f"Predictions: {len(report['predictions'])}, peak RSS {report['peak_rss_mb']:.0f} MB")
+    if report['frames'] is not None:
+        print(f"Display frames: {report['frames']['rendered']} rendered, "
+              f"{report['frames']['transmitted']} sent to the panel")
+    print("CPU per simulated hour:")
+    for hour in report['cpu_per_hour']:
+        print(f"  {hour['start']:%H:%M}  {hour['cpu_sec']:7.2f} s CPU / {hour['simulated_sec'] / 3600:.2f} h "
+              f"= {hour['cpu_sec'] / hour['simulated_sec'] * 3600:7.2f} s/h")
+    for name, label, unit in (('decision_latency', 'Epoch close -> decision', 'real s'),
+                              ('extract_time', 'Feature extraction', 'real s')):
+        p = report[name]
+        if p:
+            print(f"{label} ({unit}, n={p['count']}): p50 {p['p50']:.3f}  p90 {p['p90']:.3f}  "
+                  f"p99 {p['p99']:.3f}  max {p['max']:.3f}")
+
+
+def _at(base, hhmm):
+    """The first KST datetime at or after `base` showing hh:mm."""
+    hour, minute = (int(v) for v in hhmm.split(':'))
+    candidate = base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return candidate if candidate >= base else candidate + datetime.timedelta(days=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate a whole night of the smart alarm on a virtual clock')
+    parser.add_argument('--date', default='2024-01-01', help='Date of bedtime (default: 2024-01-01)')
+    parser.add_argument('--bedtime', default='23:00', help='Simulation start, KST (default: 23:00)')
+    parser.add_argument('--wake', default='07:00', help='Target wake time, KST (default: 07:00)')
+    parser.add_argument('--window', type=int, default=30, help='Wake window in minutes (default: 30)')
+    parser.add_argument('--preroll', type=int, default=PREROLL_SEC, help=f'Pre-roll seconds (default: {PREROLL_SEC})')
+    parser.add_argument('--hypnogram', help="'minutes:stage,...' from bedtime (default: 90-minute cycles)")
+    parser.add_argument('--recording', help='Replay a RecorderSink file instead of the synthetic EEG')
+    parser.add_argument('--model', help='joblib classifier to use instead of the scripted hypnogram model')
+    parser.add_argument('--tgam-model', help='joblib TGAM light model')
+    parser.add_argument('--artifact-policy', choices=ARTIFACT_POLICIES, default=ARTIFACT_REJECT)
+    parser.add_argument('--deadline', type=float, default=0,
+                        help=f'Governor deadline, e.g. {DEFAULT_DEADLINE_SEC:.0f} (default: 0 = off)')
+    parser.add_argument('--incremental', action='store_true', help='Incremental epoch features')
+    parser.add_argument('--no-display', action='store_true', help='Skip OLED rendering')
+    parser.add_argument('--tick', type=float, default=1.0, help='Virtual seconds per clock step (default: 1)')
+    parser.add_argument('--verbose', action='store_true', help="Show the alarm's console output")
+    parser.add_argument('--expect-reason', choices=('light_sleep', 'wake_time'))
+    parser.add_argument('--expect-after', help='HH:MM the alarm must not fire before')
+    parser.add_argument('--expect-before', help='HH:MM the alarm must fire by')
+    args = parser.parse_args()
+
+    day = datetime.datetime.strptime(args.date, '%Y-%m-%d')
+    bedtime = KST.localize(day.replace(hour=int(args.bedtime.split(':')[0]), minute=int(args.bedtime.split(':')[1])))
+    wake_time = _at(bedtime, args.wake)
+    model = tgam_model = None
+    if args.model or args.tgam_model:
+        import joblib
+        model = joblib.load(args.model) if args.model else None
+        tgam_model = joblib.load(args.tgam_model) if args.tgam_model else None
+
+    report = run_night(bedtime, wake_time, args.window,
+                       hypnogram=Hypnogram.parse(args.hypnogram) if args.hypnogram else None,
+                       source=RecordingSource(args.recording) if args.recording else None,
+                       model=model, tgam_model=tgam_model, preroll_sec=args.preroll,
+                       display=not args.no_display, deadline=args.deadline,
+                       artifact_policy=args.artifact_policy, incremental=args.incremental,
+                       tick=args.tick, quiet=not args.verbose)
+    print_report(report)
+
+    failures = check_expectations(
+        report,
+        after=_at(bedtime, args.expect_after) if args.expect_after else None,
+        before=_at(bedtime, args.expect_before) if args.expect_before else None,
+        reason=args.expect_reason)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures and (args.expect_after or args.expect_before or args.expect_reason):
+        print("OK: alarm fired as expected")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
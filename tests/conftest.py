@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: the fake hardware backend and imports from the repository root.
+
+Run from the repository root:
+    python -m pytest -q
+"""
+import os
+import sys
+
+os.environ.setdefault('BRAINALARM_HW', 'fake')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,70 @@
+import os
+from src.hardware.acquisition import AcquisitionManager
+
+
+def _manager_with_fake_port(connect_results):
+    manager = AcquisitionManager(['/dev/test0'], workers=1)
+    device = manager.devices['test0']
+    read_fd, write_fd = os.pipe()
+    results = iter(connect_results)
+    device.connect = lambda: next(results)
+    device.fileno = lambda: read_fd
+    device.disconnect = lambda: None
+    return manager, device, (read_fd, write_fd)
+
+
+def test_failed_open_is_retried_with_backoff():
+    manager, device, fds = _manager_with_fake_port([False, False, True])
+    try:
+        assert manager.open_all() == 0
+        assert device.retry_at is not None and device.backoff.attempts == 1
+
+        device.retry_at = 0
+        manager._reconnect_due()
+        assert device.backoff.attempts == 2
+        assert not manager.selector.get_map()
+
+        device.retry_at = 0
+        manager._reconnect_due()
+        assert device.retry_at is None
+        assert device.reconnects == 1
+        assert manager.selector.get_key(fds[0]).data is device
+        # 데이터가 오기 전에는 간격을 초기화하지 않습니다.
+        manager._reconnect_due()
+        assert device.backoff.attempts == 2
+        device.stats.bytes += 64
+        manager._reconnect_due()
+        assert device.backoff.attempts == 0
+    finally:
+        manager.selector.close()
+        for fd in fds:
+            os.close(fd)
+
+
+def test_read_error_removes_device_and_schedules_reopen():
+    manager, device, fds = _manager_with_fake_port([True, True])
+    try:
+        assert manager.open_all() == 1
+        device._samples_in_epoch = 100
+        manager._remove_device(fds[0], device, OSError('link lost'))
+        assert not manager.selector.get_map()
+        assert device.read_errors == 1 and device.retry_at is not None
+
+        device.retry_at = 0
+        manager._reconnect_due()
+        assert manager.selector.get_key(fds[0]).data is device
+        assert device._samples_in_epoch == 0
+        assert manager.stats()['test0']['reconnects'] == 1
+    finally:
+        manager.selector.close()
+        for fd in fds:
+            os.close(fd)
+
+
+def test_extraction_pool_uses_spawn():
+    manager = AcquisitionManager([], workers=1)
+    manager.start()
+    try:
+        assert manager.pool._mp_context.get_start_method() == 'spawn'
+    finally:
+        manager.stop()
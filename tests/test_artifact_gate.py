@@ -0,0 +1,56 @@
+import numpy as np
+from src.processing.artifact_gate import check_epoch
+
+FS = 512
+
+
+def _eeg(seconds=30, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * FS) / FS
+    return 40 * np.sin(2 * np.pi * 10 * t) + 20 * np.sin(2 * np.pi * 3 * t) + rng.normal(0, 8, len(t))
+
+
+def test_clean_epoch_passes():
+    result = check_epoch(_eeg(), FS)
+    assert result['passed'], result['reasons']
+
+
+def test_zero_filled_gap_is_not_a_flatline_when_marked_reconstructed():
+    data = _eeg()
+    gap = slice(10 * FS, 11 * FS)       # zero_fill로 채운 1초
+    data[gap] = 0.0
+    assert check_epoch(data, FS)['reasons'] == ['flatline']
+
+    mask = np.zeros(len(data), dtype=bool)
+    mask[gap] = True
+    result = check_epoch(data, FS, reconstructed=mask)
+    assert result['passed'], result['reasons']
+    assert result['max_flat_sec'] < 0.01
+
+
+def test_real_flatline_is_caught_next_to_reconstructed_samples():
+    data = _eeg()
+    data[5 * FS:6 * FS] = 0.0
+    data[20 * FS:21 * FS] = 37.0        # 실제로 멈춘 증폭기
+    mask = np.zeros(len(data), dtype=bool)
+    mask[5 * FS:6 * FS] = True
+    result = check_epoch(data, FS, reconstructed=mask)
+    assert result['reasons'] == ['flatline']
+    assert abs(result['max_flat_sec'] - 1.0) < 0.01
+
+
+def test_clipping_amplitude_and_hf_checks():
+    data = _eeg()
+    data[:FS // 2] = 2047               # 1.7% 포화
+    assert 'clipping' in check_epoch(data, FS, thresholds={'max_flat_sec': 1.0})['reasons']
+
+    pop = _eeg()
+    pop[100] = 2500
+    pop[101] = -1000
+    assert check_epoch(pop, FS)['reasons'] == ['amplitude_high']
+
+    assert 'amplitude_low' in check_epoch(_eeg() * 0.05, FS)['reasons']
+
+    t = np.arange(30 * FS) / FS
+    mains = _eeg() + 200 * np.sin(2 * np.pi * 60 * t)
+    assert check_epoch(mains, FS)['reasons'] == ['hf_power']
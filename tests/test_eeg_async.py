@@ -0,0 +1,48 @@
+import asyncio
+import gc
+from src.hardware import eeg_async
+from src.hardware.thinkgear import CODE_RAW_SIGNAL
+
+
+async def _feed_epochs(queue, epochs, size):
+    for value in range(epochs * size):
+        await queue.put((CODE_RAW_SIGNAL, value, 0.0))
+
+
+def _run_consumer(epochs, on_epoch, fs=4, epoch_duration=2):
+    async def scenario():
+        queue = asyncio.Queue()
+        consumer = asyncio.ensure_future(eeg_async.epoch_consumer(queue, on_epoch, fs=fs,
+                                                                  epoch_duration=epoch_duration))
+        await _feed_epochs(queue, epochs, fs * epoch_duration)
+        for _ in range(50):
+            gc.collect()   # 참조를 잃은 태스크는 여기서 수거됩니다
+            await asyncio.sleep(0.01)
+        consumer.cancel()
+    asyncio.run(scenario())
+
+
+def test_epoch_consumer_extracts_every_epoch(monkeypatch):
+    monkeypatch.setattr(eeg_async, 'exfeature', lambda data, fs: [float(data[0]), len(data)])
+    results = []
+    _run_consumer(3, results.append)
+    assert sorted(results) == [[0.0, 8], [8.0, 8], [16.0, 8]]
+
+
+def test_epoch_consumer_reports_extraction_errors(monkeypatch, capsys):
+    def broken(data, fs):
+        raise RuntimeError('filter failed')
+    monkeypatch.setattr(eeg_async, 'exfeature', broken)
+    _run_consumer(1, lambda features: None)
+    assert 'filter failed' in capsys.readouterr().out
+
+
+def test_epoch_consumer_awaits_coroutine_callbacks(monkeypatch):
+    monkeypatch.setattr(eeg_async, 'exfeature', lambda data, fs: [len(data)])
+    results = []
+
+    async def on_epoch(features):
+        await asyncio.sleep(0)
+        results.append(features)
+    _run_consumer(2, on_epoch)
+    assert results == [[8], [8]]
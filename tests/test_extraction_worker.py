@@ -0,0 +1,68 @@
+import time
+import threading
+import numpy as np
+import pytest
+from multiprocessing import shared_memory
+from src.processing.extraction_worker import ExtractionWorker
+
+
+def first_and_length(data, fs, delay=0.0):
+    time.sleep(delay)
+    return [float(data[0]), len(data)]
+
+
+class _Results:
+    def __init__(self):
+        self.items = []
+        self.event = threading.Event()
+
+    def __call__(self, features, context, error):
+        self.items.append((features, context, error))
+        self.event.set()
+
+    def wait(self):
+        assert self.event.wait(30.0)
+        self.event.clear()
+
+
+def _kill(worker):
+    worker.process.kill()
+    worker.process.join()
+    worker.thread.join(timeout=5.0)
+
+
+def test_submit_restarts_a_dead_worker_and_releases_its_ring():
+    results = _Results()
+    worker = ExtractionWorker(16, fs=4, slots=2, extract=first_and_length, on_result=results)
+    worker.start()
+    try:
+        old_shm = worker.shm.name
+        _kill(worker)
+        assert worker.submit(np.arange(16), context='a')
+        assert worker.restarts == 1
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=old_shm)
+        results.wait()
+        assert results.items == [([0.0, 16], 'a', None)]
+    finally:
+        worker.close()
+
+
+def test_restart_frees_slots_held_by_lost_epochs():
+    results = _Results()
+    worker = ExtractionWorker(16, fs=4, slots=2, extract=first_and_length, on_result=results)
+    worker.start()
+    try:
+        assert worker.submit(np.arange(16), 'a', {'delay': 60.0})
+        assert worker.submit(np.arange(16), 'b', {'delay': 60.0})
+        assert not worker.submit(np.arange(16), 'c')   # 두 슬롯 모두 사용 중
+        _kill(worker)
+        worker.start()
+        assert worker.lost == 2
+        assert worker.pending == {}
+        assert sorted(worker._free_slots) == [0, 1]
+        assert worker.submit(np.ones(16), 'd')
+        results.wait()
+        assert results.items == [([1.0, 16], 'd', None)]
+    finally:
+        worker.close()
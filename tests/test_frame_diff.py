@@ -0,0 +1,33 @@
+from PIL import Image, ImageDraw
+from src.display.frame_diff import FrameDiffer
+
+
+def _frame(text):
+    image = Image.new('1', (128, 64))
+    ImageDraw.Draw(image).text((10, 10), text, fill=255)
+    return image
+
+
+def test_identical_frames_are_not_sent_again():
+    frames = FrameDiffer()
+    assert frames.changed(_frame('06:30'))
+    assert not frames.changed(_frame('06:30'))
+    assert not frames.changed(_frame('06:30'))
+    assert frames.changed(_frame('06:31'))
+    assert frames.snapshot() == {'rendered': 4, 'transmitted': 2, 'skipped': 2}
+
+
+def test_a_single_pixel_change_is_sent():
+    frames = FrameDiffer()
+    image = _frame('06:30')
+    assert frames.changed(image)
+    image.putpixel((127, 63), 1)
+    assert frames.changed(image)
+
+
+def test_invalidate_sends_the_next_frame():
+    frames = FrameDiffer()
+    assert frames.changed(_frame('06:30'))
+    frames.invalidate()
+    assert frames.changed(_frame('06:30'))
+    assert frames.skipped == 0
@@ -0,0 +1,44 @@
+import os
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from src.display.glyphs import GlyphFont, CLOCK_CHARS
+from src.display.resources import FONT_REGULAR, FONT_BOLD
+
+pytestmark = pytest.mark.skipif(not (os.path.exists(FONT_REGULAR) and os.path.exists(FONT_BOLD)),
+                                reason='DejaVu fonts not installed')
+
+# oled_time_setter2의 글꼴들
+FONTS = [(FONT_BOLD, 20), (FONT_REGULAR, 13), (FONT_BOLD, 18), (FONT_BOLD, 10)]
+TEXTS = ['12:34', '07:05', '10:59', '00:00', 'AM', 'PM', '11:11 PM']
+
+
+def _reference(font, text, xy):
+    image = Image.new('1', (128, 64))
+    draw = ImageDraw.Draw(image)
+    draw.text(xy, text, font=font, fill=255)
+    return image, draw.textbbox((0, 0), text, font=font)
+
+
+@pytest.mark.parametrize('path, size', FONTS)
+def test_cached_glyphs_match_draw_text(path, size):
+    font = ImageFont.truetype(path, size)
+    glyphs = GlyphFont(font, chars=CLOCK_CHARS + ' ')
+    for text in TEXTS:
+        for xy in ((0, 0), (37, 15), (101, 40)):
+            expected, bbox = _reference(font, text, xy)
+            image = Image.new('1', (128, 64))
+            glyphs.draw_text(ImageDraw.Draw(image), xy, text, fill=255)
+            assert image.tobytes() == expected.tobytes(), (path, size, text, xy)
+            assert glyphs.textbbox(text) == bbox
+    assert glyphs.misses == 0
+
+
+def test_uncached_text_falls_back_to_draw_text():
+    font = ImageFont.truetype(FONT_REGULAR, 13)
+    glyphs = GlyphFont(font)
+    expected, bbox = _reference(font, 'Wake Window', (5, 5))
+    image = Image.new('1', (128, 64))
+    glyphs.draw_text(ImageDraw.Draw(image), (5, 5), 'Wake Window', fill=255)
+    assert image.tobytes() == expected.tobytes()
+    assert glyphs.textbbox('Wake Window') == bbox
+    assert glyphs.misses == 1 and glyphs.hits == 0
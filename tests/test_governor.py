@@ -0,0 +1,76 @@
+import os
+import numpy as np
+import pytest
+from src.processing.feature_extract import bands, FEATURES_PER_BAND
+from src.processing.governor import (ComputeGovernor, bands_by_importance, final_estimator, DEFAULT_KEEP_BANDS,
+                                     TIER_NO_SPINDLE, TIER_DECIMATE, RAW_TIERS)
+from src.processing.tgam_features import TIER_FULL
+
+N_FEATURES = len(bands) * FEATURES_PER_BAND + 1
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'new', 'models', 'sleep_stage_classifier.joblib')
+
+
+def _pipeline_trained_on_bands(informative):
+    """scaler + tree pipeline whose label depends only on the first feature of the given bands."""
+    pipeline_mod = pytest.importorskip('sklearn.pipeline')
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, N_FEATURES))
+    y = (sum(X[:, band * FEATURES_PER_BAND] for band in informative) > 0).astype(int)
+    model = pipeline_mod.Pipeline([('scale', StandardScaler()),
+                                   ('clf', RandomForestClassifier(n_estimators=20, random_state=0))])
+    return model.fit(X, y)
+
+
+def test_bands_by_importance_unwraps_pipeline():
+    model = _pipeline_trained_on_bands((2, 4, 5, 6))
+    assert not hasattr(model, 'feature_importances_')
+    assert hasattr(final_estimator(model), 'feature_importances_')
+    assert bands_by_importance(model) == (2, 4, 5, 6)
+
+
+def test_bands_by_importance_without_importances():
+    assert bands_by_importance(object()) == DEFAULT_KEEP_BANDS
+
+
+def test_shipped_model_importances_are_used():
+    pytest.importorskip('xgboost')
+    joblib = pytest.importorskip('joblib')
+    model = joblib.load(MODEL_PATH)
+    importances = final_estimator(model).feature_importances_
+    per_band = np.asarray(importances[:len(bands) * FEATURES_PER_BAND]).reshape(len(bands), -1).sum(axis=1)
+    assert bands_by_importance(model) == tuple(sorted(np.argsort(per_band)[::-1][:len(DEFAULT_KEEP_BANDS)]))
+
+
+def test_governor_steps_down_when_late_and_back_up_after_headroom():
+    governor = ComputeGovernor(deadline_sec=10, tiers=RAW_TIERS, patience=2)
+    assert governor.tier == TIER_FULL
+    assert governor.record(TIER_FULL, 12.0) == TIER_NO_SPINDLE
+    assert governor.record(TIER_NO_SPINDLE, 11.0) == TIER_DECIMATE
+    assert governor.late_epochs == 2
+    # no_spindle은 마지막에 마감을 넘겼으므로 patience의 4배만큼 여유 있는 epoch이 필요합니다.
+    for _ in range(7):
+        assert governor.record(TIER_DECIMATE, 1.0) == TIER_DECIMATE
+    assert governor.record(TIER_DECIMATE, 1.0) == TIER_NO_SPINDLE
+
+
+def test_governor_steps_up_after_patience_when_upper_tier_was_on_time():
+    governor = ComputeGovernor(deadline_sec=10, tiers=RAW_TIERS, patience=2)
+    governor.record(TIER_FULL, 12.0)
+    governor.record(TIER_NO_SPINDLE, 9.0)        # 마감 안, 여유는 없음
+    governor._set_level(2, 'test')
+    assert governor.record(TIER_DECIMATE, 1.0) == TIER_DECIMATE
+    assert governor.record(TIER_DECIMATE, 1.0) == TIER_NO_SPINDLE
+
+
+def test_governor_ignores_results_of_an_older_tier():
+    governor = ComputeGovernor(deadline_sec=10, tiers=RAW_TIERS)
+    governor.record(TIER_FULL, 20.0)
+    assert governor.record(TIER_FULL, 20.0) == TIER_NO_SPINDLE
+    assert governor.level == 1
+
+
+def test_governor_tier_options():
+    governor = ComputeGovernor(deadline_sec=10, tiers=RAW_TIERS, keep_bands=(0, 3))
+    assert governor.options() == {'tier': TIER_FULL, 'keep_bands': (0, 3)}
@@ -0,0 +1,58 @@
+import time
+from src.hardware.backend import GPIO
+from src.hardware.gpio_input import InputManager, BUTTON_PRESS, BUTTON_RELEASE, ENCODER_STEP
+
+BUTTON_PIN = 40
+CLK_PIN, DT_PIN = 41, 42
+
+
+def _events(inputs, count, timeout=2.0):
+    events = []
+    deadline = time.monotonic() + timeout
+    while len(events) < count and time.monotonic() < deadline:
+        event = inputs.get(timeout=0.05)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def test_tap_shorter_than_debounce_still_reports_release():
+    inputs = InputManager()
+    inputs.add_button('set', BUTTON_PIN, debounce_ms=50)
+    try:
+        GPIO.set_input(BUTTON_PIN, GPIO.LOW)
+        GPIO.set_input(BUTTON_PIN, GPIO.HIGH)     # debounce 시간 안의 떼기: 일단 무시됩니다
+        events = _events(inputs, 2)
+        assert [event.kind for event in events] == [BUTTON_PRESS, BUTTON_RELEASE]
+        assert inputs.bounces == 1
+        assert 0 <= events[1].value < 0.05
+    finally:
+        inputs.close()
+        GPIO.set_input(BUTTON_PIN, GPIO.HIGH)
+
+
+def test_chatter_inside_debounce_is_one_press():
+    inputs = InputManager()
+    inputs.add_button('set', BUTTON_PIN, debounce_ms=50)
+    try:
+        for level in (GPIO.LOW, GPIO.HIGH, GPIO.LOW, GPIO.HIGH, GPIO.LOW):
+            GPIO.set_input(BUTTON_PIN, level)
+        events = _events(inputs, 2, timeout=0.3)
+        # 최종 레벨이 눌림이므로 debounce 뒤에 다시 읽어도 떼기는 보내지 않습니다.
+        assert [event.kind for event in events] == [BUTTON_PRESS]
+        assert inputs.bounces == 4
+    finally:
+        inputs.close()
+        GPIO.set_input(BUTTON_PIN, GPIO.HIGH)
+
+
+def test_encoder_turns_become_one_step_per_detent():
+    inputs = InputManager()
+    inputs.add_encoder('knob', CLK_PIN, DT_PIN)
+    try:
+        GPIO.turn(CLK_PIN, DT_PIN, 3, step_sec=0)
+        GPIO.turn(CLK_PIN, DT_PIN, -2, step_sec=0)
+        events = inputs.drain()
+        assert [(event.kind, event.value) for event in events] == [(ENCODER_STEP, 1)] * 3 + [(ENCODER_STEP, -1)] * 2
+    finally:
+        inputs.close()
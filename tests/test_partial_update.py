@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from src.hardware.backend import FakeSSD1306, FakeLumaDevice
+from src.hardware.ssd1306 import pack_pages
+from src.display.partial_update import PartialUpdater, dirty_windows, _AdafruitBus, _LumaBus
+
+
+def _pages(*boxes):
+    image = Image.new('1', (128, 64))
+    draw = ImageDraw.Draw(image)
+    for box in boxes:
+        draw.rectangle(box, fill=255)
+    return pack_pages(image)
+
+
+@pytest.mark.parametrize('cost', [_AdafruitBus.cost, _LumaBus.cost])
+def test_one_changed_page_gives_its_column_span(cost):
+    blank = _pages()
+    assert dirty_windows(blank, blank, cost) == []
+    # y 16..23은 페이지 2입니다
+    assert dirty_windows(blank, _pages((10, 17, 20, 18)), cost) == [(2, 2, 10, 20)]
+
+
+@pytest.mark.parametrize('cost', [_AdafruitBus.cost, _LumaBus.cost])
+def test_neighbouring_pages_merge_and_distant_ones_do_not(cost):
+    blank = _pages()
+    # 페이지 2-3에 걸친 숫자: 한 창이 두 창보다 쌉니다
+    assert dirty_windows(blank, _pages((40, 20, 60, 27)), cost) == [(2, 3, 40, 60)]
+    # 왼쪽 위 구석과 오른쪽 아래 구석: 합치면 화면 전체를 보내게 되므로 따로 보냅니다
+    windows = dirty_windows(blank, _pages((0, 0, 3, 3), (124, 60, 127, 63)), cost)
+    assert windows == [(0, 0, 0, 3), (7, 7, 124, 127)]
+
+
+@pytest.mark.parametrize('make_device', [FakeSSD1306, FakeLumaDevice])
+def test_panel_shows_every_frame_and_bus_bytes_match(make_device):
+    device = make_device()
+    panel = PartialUpdater(device)
+    frames = [[(10, 10, 50, 30)], [(10, 10, 50, 30), (100, 50, 104, 54)], [(10, 10, 50, 30)],
+              [(0, 0, 127, 63)], [(0, 0, 127, 63)]]
+    sent = []
+    for boxes in frames:
+        image = Image.new('1', (128, 64))
+        draw = ImageDraw.Draw(image)
+        for box in boxes:
+            draw.rectangle(box, fill=255)
+        before = device.bytes_sent
+        sent.append(panel.show(image))
+        assert device.bytes_sent - before == sent[-1]
+        assert np.array_equal(np.array(device.panel_image), np.array(image))
+    assert sent[-1] == 0                                 # 바뀐 것이 없으면 보내지 않습니다
+    assert 0 < sent[1] < sent[0] and 0 < sent[2] < sent[0]
+    assert panel.snapshot()['full_frames'] == 2          # 첫 프레임과 화면 전체가 바뀐 프레임
+    assert panel.snapshot()['partial_frames'] == 2
@@ -0,0 +1,52 @@
+import pytest
+from src.hardware.quadrature import QuadratureDecoder, RotationAccelerator
+
+# 시계 방향 한 디텐트: 11 -> 01 -> 00 -> 10 -> 11
+CW = [(0, 1), (0, 0), (1, 0), (1, 1)]
+CCW = [(1, 0), (0, 0), (0, 1), (1, 1)]
+
+
+def _feed(decoder, states):
+    return [step for step in (decoder.update(a, b) for a, b in states) if step]
+
+
+def test_full_cycles_count_one_step_each():
+    decoder = QuadratureDecoder()
+    assert _feed(decoder, CW * 3 + CCW * 2) == [1, 1, 1, -1, -1]
+    assert decoder.detents == 5 and decoder.errors == 0
+
+
+def test_contact_bounce_cancels_out():
+    decoder = QuadratureDecoder()
+    bouncy = [(0, 1), (1, 1), (0, 1), (0, 0), (0, 1), (0, 0), (1, 0), (1, 1)]
+    assert _feed(decoder, bouncy) == [1]
+
+
+def test_missed_edge_keeps_the_direction_under_way():
+    decoder = QuadratureDecoder()
+    # 00 -> 11 사이의 10 엣지를 놓쳤습니다: 두 비트가 동시에 바뀐 무효 전이
+    assert _feed(decoder, [(0, 1), (0, 0), (1, 1)]) == [1]
+    assert decoder.errors == 1
+
+
+def test_half_turn_and_back_is_no_step():
+    decoder = QuadratureDecoder()
+    assert _feed(decoder, [(0, 1), (0, 0), (0, 1), (1, 1)]) == []
+
+
+def test_half_cycle_encoder_steps_at_both_rest_states():
+    decoder = QuadratureDecoder(steps_per_detent=2)
+    assert _feed(decoder, CW * 2) == [1, 1, 1, 1]
+
+
+def test_invalid_steps_per_detent():
+    with pytest.raises(ValueError):
+        QuadratureDecoder(steps_per_detent=3)
+
+
+def test_accelerator_scales_fast_spins_and_resets_on_pause():
+    accel = RotationAccelerator(base_step=5)
+    assert [accel.step(1, t) for t in (0.0, 0.5, 1.0)] == [5, 5, 5]
+    assert [accel.step(1, 1.0 + 0.03 * i) for i in range(1, 5)][-1] == 30
+    assert accel.step(-1, 1.2) == -5          # 방향이 바뀌면 다시 기본 간격
+    assert accel.step(-1, 2.0) == -5          # idle_sec보다 긴 멈춤 뒤
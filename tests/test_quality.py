@@ -0,0 +1,39 @@
+import random
+import pytest
+from src.processing.quality import RollingQuality, NO_CONTACT
+
+
+def test_window_statistics_match_a_rescan():
+    random.seed(3)
+    rolling = RollingQuality(window=30, bad_threshold=25)
+    values = []
+    for _ in range(500):
+        value = random.choice([0, 0, 0, 26, 51, 200, random.randint(0, 200)])
+        rolling.add(value)
+        values.append(value)
+        window = values[-30:]
+        assert rolling.count == len(window)
+        assert rolling.bad_count == sum(v > 25 for v in window)
+        assert rolling.mean == pytest.approx(sum(window) / len(window))
+        assert rolling.max == max(window)
+    assert rolling.is_full
+
+
+def test_close_epoch_scores_each_epoch_separately():
+    rolling = RollingQuality(window=5)
+    for value in [0] * 30:
+        rolling.add(value)
+    clean = rolling.close_epoch()
+    assert clean['samples'] == 30 and clean['score'] == 1.0
+
+    for value in [0] * 20 + [50] * 10:
+        rolling.add(value)
+    mixed = rolling.close_epoch()
+    assert mixed['bad'] == 10 and mixed['max'] == 50
+    assert mixed['score'] == pytest.approx((1 - 10 / 30) * (1 - (500 / 30) / NO_CONTACT))
+
+    for _ in range(30):
+        rolling.add(NO_CONTACT)
+    assert rolling.close_epoch()['score'] == 0.0
+    empty = rolling.close_epoch()
+    assert empty['samples'] == 0 and empty['score'] == 0.0
@@ -0,0 +1,43 @@
+import datetime
+from src.alarm.clock import VirtualClock, KST
+from src.display.render_service import RenderService
+
+
+def _clock():
+    return VirtualClock(KST.localize(datetime.datetime(2026, 1, 1, 23, 0)), tick=1.0)
+
+
+def test_clock_driven_service_draws_on_ticks_at_the_frame_interval():
+    clock = _clock()
+    drawn = []
+    service = RenderService(lambda state: drawn.append((clock.elapsed, state)), fps=1 / 60,
+                            refresh_sec=60.0, clock=clock)
+    service.start()
+    service.publish('CLOCK')
+    assert drawn == []              # 시계가 움직일 때 그립니다
+    clock.sleep(1)
+    assert drawn == [(1.0, 'CLOCK')]
+    for _ in range(12):             # 5초마다 게시해도 프레임은 1분에 한 번
+        service.publish('CLOCK')
+        clock.sleep(5)
+    assert [t for t, _ in drawn] == [1.0, 61.0]
+    clock.sleep(3600)               # 게시가 없어도 refresh_sec마다 다시 그립니다
+    assert len(drawn) == 62
+    assert service.refreshes == 60
+    service.stop()
+    clock.sleep(600)
+    assert len(drawn) == 62
+    assert service.snapshot()['rendered'] == 62
+
+
+def test_stop_flushes_the_pending_state_in_clock_mode():
+    clock = _clock()
+    drawn = []
+    service = RenderService(drawn.append, fps=1 / 60, clock=clock)
+    service.start()
+    service.publish('TIME')
+    clock.sleep(1)
+    service.publish('CLOCK')
+    service.stop()
+    assert drawn == ['TIME', 'CLOCK']
+    assert clock.tickers == []
@@ -0,0 +1,34 @@
+from src.hardware import stats as stats_module
+from src.hardware.stats import AcquisitionStats
+
+
+class _Time:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_named_windows_keep_their_own_averaging_interval(monkeypatch):
+    fake = _Time()
+    monkeypatch.setattr(stats_module, 'time', fake)
+    stats = AcquisitionStats()
+
+    fake.now = 110.0
+    stats.raw_samples = 5120
+    assert stats.snapshot('log')['samples_per_sec'] == 512
+
+    fake.now = 112.0
+    stats.raw_samples = 6144
+    # 'log' 창은 110초부터, 'cli' 창은 처음 읽으므로 생성 시점부터 평균냅니다.
+    assert stats.snapshot('log')['samples_per_sec'] == 512
+    cli = stats.snapshot('cli')
+    assert cli['samples_per_sec'] == 6144 / 12
+    assert cli['raw_samples'] == 6144
+
+    fake.now = 113.0
+    stats.raw_samples = 6400
+    assert stats.snapshot('cli')['samples_per_sec'] == 256
+    assert stats.snapshot('log')['samples_per_sec'] == 256
+    assert stats.snapshot()['sample_rate_ratio'] == 6400 / 13 / 512
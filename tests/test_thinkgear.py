@@ -0,0 +1,61 @@
+import asyncio
+from src.hardware.thinkgear import ThinkGearParser, ParserType, CODE_RAW_SIGNAL, CODE_ATTENTION
+from src.hardware.eeg import EEGReader
+from src.hardware.acquisition import DeviceStream
+from src.hardware.eeg_async import AsyncEEGReader
+
+
+def make_packet(payload):
+    return bytes([0xAA, 0xAA, len(payload)]) + bytes(payload) + bytes([(~sum(payload)) & 0xFF])
+
+
+RAW_2 = make_packet([CODE_RAW_SIGNAL, 2, 0xFF, 0xFE])                 # -2
+RAW_3 = make_packet([CODE_RAW_SIGNAL, 3, 0x01, 0x02, 0x03, CODE_ATTENTION, 40])
+RAW_1 = make_packet([CODE_RAW_SIGNAL, 1, 0x05])
+STREAM = RAW_2 + RAW_3 + RAW_1 + RAW_2
+
+
+def test_parser_passes_non_two_byte_raw_values_as_views():
+    calls = []
+    parser = ThinkGearParser(ParserType.PACKETS,
+                             lambda level, code, n, value: calls.append((code, n, value if isinstance(value, int)
+                                                                         else bytes(value))))
+    assert parser.parse_chunk(STREAM) == 4
+    assert calls == [(CODE_RAW_SIGNAL, 2, 0xFFFE),
+                     (CODE_RAW_SIGNAL, 3, b'\x01\x02\x03'), (CODE_ATTENTION, 1, 40),
+                     (CODE_RAW_SIGNAL, 1, b'\x05'),
+                     (CODE_RAW_SIGNAL, 2, 0xFFFE)]
+
+
+def test_eeg_reader_counts_and_skips_malformed_raw_values():
+    reader = EEGReader(port='test')
+    events = []
+    reader.subscribe(events.append, codes=[CODE_RAW_SIGNAL])
+    reader.parser.parse_chunk(STREAM)
+    assert reader._chunk_samples == [-2, -2]
+    assert [event.value for event in events] == [-2, -2]
+    assert reader.attention == 40
+    assert reader.stats.malformed_raw == 2
+    assert reader.get_stats('test')['malformed_raw'] == 2
+
+
+def test_device_stream_counts_and_skips_malformed_raw_values():
+    device = DeviceStream('a', 'test')
+    device.parser.parse_chunk(STREAM)
+    assert device.stats.raw_samples == 2
+    assert device.stats.malformed_raw == 2
+    assert list(device.ring.latest(2)) == [-2, -2]
+
+
+def test_async_reader_counts_and_skips_malformed_raw_values():
+    async def scenario():
+        reader = AsyncEEGReader(port='test')
+        queue = reader.subscribe(codes=[CODE_RAW_SIGNAL])
+        reader.parser.parse_chunk(STREAM)
+        events = []
+        while not queue.empty():
+            events.append(queue.get_nowait())
+        return reader, events
+    reader, events = asyncio.run(scenario())
+    assert [value for code, value, arrival in events] == [-2, -2]
+    assert reader.stats.malformed_raw == 2
@@ -0,0 +1,84 @@
+import pytest
+from src.hardware.eeg import EpochFeatureExtractor
+from src.processing.artifact_gate import ARTIFACT_OFF
+from src.processing.timing import SampleClock, GAP_INTERPOLATE, GAP_ZERO_FILL, GAP_REJECT
+
+FS = 64
+CHUNK = 8
+
+
+def _extractor(policy):
+    # 2초 epoch (128 샘플), 1초(64 샘플)까지만 채웁니다.
+    return EpochFeatureExtractor(fs=FS, epoch_duration=2, gap_policy=policy, max_fill_sec=1.0,
+                                 extract_features=False, artifact_policy=ARTIFACT_OFF)
+
+
+def _feed(extractor, start, seconds, value=100.0):
+    """Chunks of CHUNK samples arriving on time for `seconds`; returns the metadata of closed epochs."""
+    closed = []
+    for i in range(int(seconds * FS / CHUNK)):
+        arrival = start + (i + 1) * CHUNK / FS
+        _, ready = extractor.add_chunk([value] * CHUNK, arrival)
+        if ready:
+            closed.append(extractor.metadata)
+    return closed
+
+
+def test_steady_stream_closes_ok_epochs():
+    extractor = _extractor(GAP_INTERPOLATE)
+    closed = _feed(extractor, 0.0, 4.0)
+    assert [meta['status'] for meta in closed] == ['ok', 'ok']
+    assert all(meta['filled'] == 0 and meta['gaps'] == 0 for meta in closed)
+
+
+@pytest.mark.parametrize('policy, status', [(GAP_INTERPOLATE, 'filled'), (GAP_ZERO_FILL, 'filled'),
+                                            (GAP_REJECT, 'rejected')])
+def test_short_gap_is_filled_or_rejected_by_policy(policy, status):
+    extractor = _extractor(policy)
+    _feed(extractor, 0.0, 0.5, value=0.0)
+    # 0.75초(48 샘플) 갭 뒤에 다음 청크가 도착합니다.
+    extractor.add_chunk([96.0] * CHUNK, 0.5 + 0.75 + CHUNK / FS)
+    filled = list(extractor.buffer)[32:32 + 48]
+    if policy == GAP_INTERPOLATE:
+        assert filled[0] == pytest.approx(96.0 / 49) and filled[-1] == pytest.approx(96.0 * 48 / 49)
+    else:
+        assert filled == [0.0] * 48
+    closed = _feed(extractor, 0.5 + 0.75 + CHUNK / FS, 1.0)
+    assert len(closed) == 1
+    assert closed[0]['status'] == status
+    assert closed[0]['filled'] == 48 and closed[0]['gaps'] == 1
+
+
+def test_gap_too_long_to_fill_restarts_the_epoch():
+    extractor = _extractor(GAP_INTERPOLATE)
+    _feed(extractor, 0.0, 1.0)
+    # 1.5초(96 샘플) 갭 > max_fill_sec: 앞의 64 샘플은 버리고 갭 뒤에서 새 epoch을 시작합니다.
+    resume = 1.0 + 1.5
+    extractor.add_chunk([100.0] * CHUNK, resume + CHUNK / FS)
+    assert len(extractor.buffer) == CHUNK
+    closed = _feed(extractor, resume + CHUNK / FS, 2.0 - CHUNK / FS)
+    assert len(closed) == 1
+    meta = closed[0]
+    assert meta['status'] == 'ok'
+    assert meta['discarded'] == 64 and meta['filled'] == 0
+    assert meta['end_time'] - meta['start_time'] == pytest.approx(2.0 - CHUNK / FS)
+
+
+def test_reject_policy_keeps_long_gaps_shorter_than_an_epoch_and_rejects():
+    extractor = _extractor(GAP_REJECT)
+    _feed(extractor, 0.0, 0.25)
+    extractor.add_chunk([100.0] * CHUNK, 0.25 + 1.5 + CHUNK / FS)
+    assert extractor._meta['rejected'] and extractor._meta['discarded'] == 0
+    # 한 epoch보다 긴 갭은 정책과 관계없이 새로 시작합니다.
+    extractor.add_chunk([100.0] * CHUNK, 0.25 + 1.5 + CHUNK / FS + 3.0)
+    assert not extractor._meta['rejected']
+    assert extractor._meta['discarded'] > 0
+
+
+def test_clock_drift_is_absorbed_without_gaps():
+    clock = SampleClock(fs=512)
+    slow = 1.0 + 1000e-6    # 장치가 1000 ppm 느리게 샘플링합니다
+    for i in range(1, 512 * 60 // 64 + 1):
+        assert clock.on_chunk(i * 64 / 512 * slow, 64) == 0
+    assert clock.gaps == 0
+    assert clock.drift_ppm == pytest.approx(-1000, abs=20)
@@ -0,0 +1,95 @@
+import time as real_time
+from src.hardware import watchdog as watchdog_module
+from src.hardware.watchdog import Backoff, SerialWatchdog
+
+
+class _Time:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    strftime = staticmethod(real_time.strftime)
+
+
+class _Thread:
+    def is_alive(self):
+        return True
+
+
+class _Reader:
+    """EEGReader stand-in: a successful reconnect restarts the reader, which stamps last_byte_time."""
+
+    def __init__(self, results, clock):
+        self.thread = _Thread()
+        self.link_error = None
+        self.last_byte_time = 1.0
+        self.results = list(results)
+        self.clock = clock
+        self.reconnects = 0
+
+    def reconnect(self):
+        self.reconnects += 1
+        ok = self.results.pop(0) if self.results else True
+        if ok:
+            self.last_byte_time = self.clock.now
+        return ok
+
+
+def _watchdog(monkeypatch, results):
+    fake = _Time()
+    monkeypatch.setattr(watchdog_module, 'time', fake)
+    reader = _Reader(results, fake)
+    dog = SerialWatchdog(reader, stall_timeout_ms=2000)
+    dog.running = True
+    return dog, reader, fake
+
+
+def test_backoff_doubles_up_to_the_cap_and_resets():
+    backoff = Backoff(base=0.5, factor=2.0, max_delay=3.0)
+    assert [backoff.next() for _ in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    backoff.reset()
+    assert backoff.next() == 0.5
+
+
+def test_failed_reconnects_wait_out_the_backoff(monkeypatch):
+    dog, reader, fake = _watchdog(monkeypatch, [False, False, True])
+    fake.now = 5.0
+    reason = dog._check_link()
+    assert reason and 'no bytes' in reason
+    dog._recover(reason)
+    assert reader.reconnects == 3
+    assert fake.now == 5.0 + 0.5 + 1.0
+    assert dog.outages == 1
+
+    fake.now = reader.last_byte_time = 7.0
+    assert dog._check_link() is None
+    dog._confirm_recovery()
+    assert dog.last_recovery_sec == 6.0   # 마지막 정상 바이트(1초)부터
+    assert dog.backoff.attempts == 0
+
+
+def test_silent_reconnected_port_backs_off_between_reopens(monkeypatch):
+    dog, reader, fake = _watchdog(monkeypatch, [])
+    fake.now = 3.0
+    dog._recover(dog._check_link())
+    assert reader.reconnects == 1
+
+    reopen_times = []
+    while fake.now < 20.0:
+        fake.now += 0.25
+        reason = dog._check_link()
+        if reason:
+            before = reader.reconnects
+            dog._recover(reason)
+            if reader.reconnects != before:
+                reopen_times.append(fake.now)
+    # 데이터 없이 열리기만 한 포트는 정지 판정(2초 초과) 뒤 0.5, 1, 2초를 더 기다렸다가 다시 엽니다.
+    gaps = [b - a for a, b in zip([3.0] + reopen_times, reopen_times)]
+    assert gaps[:3] == [2.25 + 0.5, 2.25 + 1.0, 2.25 + 2.0]
+    assert dog.outages == 1
+    assert dog.last_recovery_sec is None